@@ -2,26 +2,22 @@
 
 import sys
 
-from langgraph.graph import StateGraph, MessagesState
+from langgraph.graph import StateGraph
 from langgraph.graph import START
 #from langgraph.graph import END
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_core.messages import HumanMessage
 #from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_core.tools import tool
 from langchain_ollama import ChatOllama
 
-from pyfunc_agent.tools import add_numbers
 from pyfunc_agent.agent_attributes import AgentState
+from pyfunc_agent.events import configure_logging
+from pyfunc_agent.registry import REGISTRY
 
 
-# --- TOOL WRAPPER ---
-@tool
-def add_tool(a: float, b: float) -> str:
-    """The tool wrapper for the agent."""
-    print(f"[add_tool] called with a={a}, b={b}.")
-    return add_numbers(a, b)
+# --- TOOL WRAPPER (generated from pyfunc_agent.tools.add_numbers) ---
+add_tool = REGISTRY.get("add_tool")
 
 
 # --- LLM SETUP ---
@@ -43,14 +39,14 @@ def agent_node(state: AgentState) -> AgentState:
 
     response = llm.invoke(messages)
 
-    return {"messages": messages + [response]}
+    return {"messages": [response]}
 
 
 # --- LANGGRAPH WORKFLOW ---
 # Use the ToolNode to handle tool calls dynamically
 tool_node = ToolNode([add_tool])
 
-builder = StateGraph(MessagesState)
+builder = StateGraph(AgentState)
 
 # Add nodes
 builder.add_node("agent", RunnableLambda(agent_node))
@@ -81,6 +77,9 @@ if __name__ == "__main__":
 
     user_input = " ".join(sys.argv[1:])
 
+    # Tool calls are logged as JSON lines on stderr
+    listener = configure_logging()
+
     # Set up a system prompt to make LLM aware of tool and format it's responses
     # accordingly
     # system = SystemMessage(
@@ -102,6 +101,7 @@ if __name__ == "__main__":
     }
 
     result = graph.invoke(input_state)
+    listener.stop()
 
     print("RESULT:")
     print(result)
@@ -3,6 +3,12 @@
 import streamlit as st
 
 from pyfunc_agent.simple_agents import MultiToolMathAgent
+from pyfunc_agent.streamlit_ui import (
+    live_turn,
+    session_agent,
+    session_history,
+    worker_pool,
+)
 
 # ------------------------------------------------------------------------------
 # 1) INITIAL SETUP
@@ -13,16 +19,22 @@ st.set_page_config(
 )
 st.title("Modularized Agent")
 
-# 1.1) Instantiate the agent once (cached in session_state)
-if "agent" not in st.session_state:
-    st.session_state.agent = MultiToolMathAgent(
-        prompt_name="calc_bot.yaml",
-        model_name="mix_77/gemma3-qat-tools:12b",
-    )
+# 1.1) One worker pool per server process; every browser session shares its graph
+pool = worker_pool()
+
+# 1.2) Instantiate the agent once per session (cached in session_state)
+agent = session_agent(
+    MultiToolMathAgent,
+    prompt_name="calc_bot.yaml",
+    model_name="mix_77/gemma3-qat-tools:12b",
+)
+
+# 1.3) Keep the finished exchanges, each rendered once, shown a page at a time
+history = session_history()
 
-# 1.2) Keep a simple `(prompt, reply)` history list
-if "history" not in st.session_state:
-    st.session_state.history: list[tuple[str, str]] = []
+# 1.4) Turn running in the background, if any
+if "turn" not in st.session_state:
+    st.session_state.turn = None
 
 
 # ------------------------------------------------------------------------------
@@ -31,33 +43,37 @@ if "history" not in st.session_state:
 def send_callback() -> None:
     """Enter call.
 
-    Called when the user hits Enter. Sends the new prompt to the agent,
-    appends (prompt, reply) to history, and clears the input box.
+    Called when the user hits Enter. Starts the agent on the new prompt in the
+    background, so the page keeps responding while it runs, and clears the input box.
     """
     prompt = st.session_state.user_input.strip()
-    if not prompt:
+    if not prompt or st.session_state.turn is not None:
         return
 
-    # 2.1) Call our agent’s .chat() method
-    reply = st.session_state.agent.chat(prompt)
+    # 2.1) Hand the prompt to a worker; the page streams the reply as it comes
+    st.session_state.turn = pool.submit(agent, prompt)
 
-    # 2.2) Store the pair
-    st.session_state.history.append((prompt, reply))
-
-    # 2.3) Clear the input box
+    # 2.2) Clear the input box
     st.session_state.user_input = ""
 
 
 # ------------------------------------------------------------------------------
 # 3) RENDER FULL HISTORY + INPUT BOX
 # ------------------------------------------------------------------------------
-# 3.1) Show each (You: …, Agent: …) exchange
-for user_msg, bot_msg in st.session_state.history:
-    st.markdown(f"**You:** {user_msg}")
-    st.markdown(f"**Agent:** {bot_msg}")
-    st.write("---")
+# 3.1) Move a finished turn into the history
+turn = st.session_state.turn
+if turn is not None and turn.poll():
+    history.add_turn(turn)
+    st.session_state.turn = None
+
+# 3.2) Show the latest (You: …, Agent: …) exchanges; older ones on request
+history.render()
+
+# 3.3) Stream the running turn; only this part of the page reruns until it is done
+if st.session_state.turn is not None:
+    live_turn(st.session_state.turn)
 
-# 3.2) The TextInput stays beneath the latest conversation
+# 3.4) The TextInput stays beneath the latest conversation
 st.text_input(
     "Your question for Agent:",
     key="user_input",
@@ -2,54 +2,21 @@
 
 import sys
 
-from langgraph.graph import StateGraph, MessagesState
+from langgraph.graph import StateGraph
 from langgraph.graph import START
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from langchain_core.runnables import RunnableLambda
-from langchain_core.tools import tool
 from langchain_ollama import ChatOllama
 
-from pyfunc_agent.tools import add_numbers, square_root
-from pyfunc_agent.tools import exponential, ln, multiply_numbers
 from pyfunc_agent.agent_attributes import AgentState
+from pyfunc_agent.events import configure_logging
+from pyfunc_agent.registry import REGISTRY
 
 
-# --- TOOL WRAPPERS ---
-@tool
-def add_tool(a: float, b: float) -> float:
-    """The addition tool wrapper for the agent."""
-    print(f"[add_tool] called with a={a}, b={b}.")
-    return add_numbers(a, b)
-
-
-@tool
-def multiply_tool(a: float, b: float) -> float:
-    """The multiplication tool wrapper for the agent."""
-    print(f"[multiply_tool] called with a={a}, b={b}.")
-    return multiply_numbers(a, b)
-
-
-@tool
-def sqrt_tool(a: float) -> float:
-    """The square root calculation tool for the agent."""
-    print(f"[sqrt_tool] called with a={a}.")
-    return square_root(a)
-
-
-@tool
-def exp_tool(a: float) -> float:
-    """The exponentiation calculation tool wrapper for the agent."""
-    print(f"[exp_tool] called with a={a}.")
-    return exponential(a)
-
-
-@tool
-def ln_tool(a: float) -> float:
-    """The natural logarithm calculation tool wrapper for the agent."""
-    print(f"[ln_tool] called with a={a}.")
-    return ln(a)
+# --- TOOL WRAPPERS (generated from pyfunc_agent.tools) ---
+tools = REGISTRY.select("scalar")
 
 
 # --- LLM SETUP ---
@@ -61,15 +28,7 @@ llm = ChatOllama(
 )
 
 # Bind tool
-llm = llm.bind_tools(
-    [
-        add_tool,
-        multiply_tool,
-        sqrt_tool,
-        exp_tool,
-        ln_tool
-    ]
-)
+llm = llm.bind_tools(tools)
 
 
 # --- AGENT NODE ---
@@ -79,22 +38,14 @@ def agent_node(state: AgentState) -> AgentState:
 
     response = llm.invoke(messages)
 
-    return {"messages": messages + [response]}
+    return {"messages": [response]}
 
 
 # --- LANGGRAPH WORKFLOW ---
 # Use the ToolNode to handle tool calls dynamically
-tool_node = ToolNode(
-    [
-        add_tool,
-        multiply_tool,
-        sqrt_tool,
-        exp_tool,
-        ln_tool
-    ]
-)
+tool_node = ToolNode(tools)
 
-builder = StateGraph(MessagesState)
+builder = StateGraph(AgentState)
 
 # Add nodes
 builder.add_node("agent", RunnableLambda(agent_node))
@@ -119,6 +70,9 @@ if __name__ == "__main__":
 
     user_input = " ".join(sys.argv[1:])
 
+    # Tool calls are logged as JSON lines on stderr
+    listener = configure_logging()
+
     # Set up a system prompt to make LLM aware of tool and format it's responses
     # accordingly
     system = SystemMessage(
@@ -145,6 +99,7 @@ if __name__ == "__main__":
     }
 
     result = graph.invoke(input_state)
+    listener.stop()
 
     print("RESULT:")
     print(result)
@@ -3,6 +3,13 @@
 import streamlit as st
 
 from pyfunc_agent.simple_agents import ReActMathAgent
+from pyfunc_agent.streamlit_ui import (
+    live_turn,
+    render_react_trace,
+    session_agent,
+    session_history,
+    worker_pool,
+)
 
 
 st.set_page_config(
@@ -11,34 +18,44 @@ st.set_page_config(
     )
 st.title("CalcBot (ReAct)")
 
-if "react_agent" not in st.session_state:
-    st.session_state.react_agent = ReActMathAgent(
-        prompt_name="react_bot.yaml",
-        model_name="mix_77/gemma3-qat-tools:12b",
-    )
+# One worker pool per server process, shared by every browser session
+pool = worker_pool()
+
+react_agent = session_agent(
+    ReActMathAgent,
+    key="react_agent",
+    prompt_name="react_bot.yaml",
+    model_name="mix_77/gemma3-qat-tools:12b",
+)
 
-if "history" not in st.session_state:
-    st.session_state.history: list[tuple[str, str]] = []
+# Finished traces, each rendered once, shown a page at a time
+history = session_history()
+
+if "turn" not in st.session_state:
+    st.session_state.turn = None
 
 def send_callback() -> None:
     """Enter-button call."""
     prompt = st.session_state.user_input.strip()
-    if not prompt:
+    if not prompt or st.session_state.turn is not None:
       return
 
-    # Get full trace for this response
-    trace = st.session_state.react_agent.chat(prompt)
-
-    # Store trace as single string
-    joined_trace = "\n\n".join(trace)
-    st.session_state.history.append((prompt, joined_trace))
+    # Run the agent in the background; the page streams its trace meanwhile
+    st.session_state.turn = pool.submit(react_agent, prompt)
     st.session_state.user_input = ""
 
-# Render full history
-for user_msg, bot_chain_msg in st.session_state.history:
-    st.markdown(f"**You:** {user_msg}")
-    st.markdown(f"```\n{bot_chain_msg}\n```")
-    st.write("---")
+# Keep a finished trace in the history
+turn = st.session_state.turn
+if turn is not None and turn.poll():
+    history.add_turn(turn, trace=True)
+    st.session_state.turn = None
+
+# Render the latest traces; older ones on request
+history.render()
+
+# The trace being streamed; only this part of the page reruns until it is done
+if st.session_state.turn is not None:
+    live_turn(st.session_state.turn, render=render_react_trace)
 
 st.text_input(
     "Ask CalcBot (ReAct)…",
@@ -7,97 +7,60 @@ Run with `>> streamlit run streamlit_agent03.py`
 import streamlit as st
 import sys
 
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_ollama import ChatOllama
-from langgraph.graph import StateGraph, MessagesState, START
+from langgraph.graph import StateGraph, START
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_core.runnables import RunnableLambda
-from langchain_core.tools import tool
 
-# Import exactly the same functions & AgentState type as in multitool_agent02.py
-from pyfunc_agent.tools import add_numbers, multiply_numbers
-from pyfunc_agent.tools import square_root, exponential, ln
+# Import exactly the same tools & AgentState type as in multitool_agent02.py
 from pyfunc_agent.agent_attributes import AgentState
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.streaming import stream_graph_events
+from pyfunc_agent.streamlit_ui import (
+    live_turn,
+    render_reply,
+    session_history,
+    worker_pool,
+)
 
 
 # --------------------------------------------------------------------------------
-# 1) Re‐declare every @tool exactly as in multitool_agent02.py
-# --------------------------------------------------------------------------------
-
-@tool
-def add_tool(a: float, b: float) -> float:
-    """Returns a + b."""
-    print(f"[add_tool] called with a={a}, b={b}.")
-    return add_numbers(a, b)
-
-@tool
-def multiply_tool(a: float, b: float) -> float:
-    """Returns a * b."""
-    print(f"[multiply_tool] called with a={a}, b={b}.")
-    return multiply_numbers(a, b)
-
-@tool
-def sqrt_tool(a: float) -> float:
-    """Returns sqrt(a)."""
-    print(f"[sqrt_tool] called with a={a}.")
-    return square_root(a)
-
-@tool
-def exp_tool(a: float) -> float:
-    """Returns exp(a)."""
-    print(f"[exp_tool] called with a={a}.")
-    return exponential(a)
-
-@tool
-def ln_tool(a: float) -> float:
-    """Returns ln(a)."""
-    print(f"[ln_tool] called with a={a}.")
-    return ln(a)
-
-
-# --------------------------------------------------------------------------------
-# 2) Instantiate the same ChatOllama + bind all five tools
+# 1-3) Build the tools, model and graph of multitool_agent02.py once per server
+#      process; Streamlit reruns this script on every interaction of every session
 # --------------------------------------------------------------------------------
 
-llm = ChatOllama(
-    model="mix_77/gemma3-qat-tools:12b",
-    temperature=0.0,
-)
-llm = llm.bind_tools([
-    add_tool,
-    multiply_tool,
-    sqrt_tool,
-    exp_tool,
-    ln_tool
-])
-
-# --------------------------------------------------------------------------------
-# 3) Build the identical LangGraph graph from multitool_agent02.py
-# --------------------------------------------------------------------------------
+@st.cache_resource
+def build_graph() -> CompiledStateGraph:
+    """Build the identical LangGraph graph from multitool_agent02.py."""
+    # 1) Take the same registry-generated tools as multitool_agent02.py
+    tools = REGISTRY.select("scalar")
 
-def agent_node(state: AgentState) -> AgentState:
-    """Agent definition function."""
-    messages = state["messages"]
-    response = llm.invoke(messages)
+    # 2) Instantiate the same ChatOllama + bind all five tools
+    llm = ChatOllama(
+        model="mix_77/gemma3-qat-tools:12b",
+        temperature=0.0,
+    )
+    llm = llm.bind_tools(tools)
 
-    return {"messages": messages + [response]}
+    # 3) Build the graph
+    def agent_node(state: AgentState) -> AgentState:
+        """Agent definition function."""
+        messages = state["messages"]
+        response = llm.invoke(messages)
 
+        return {"messages": [response]}
 
-tool_node = ToolNode([
-    add_tool,
-    multiply_tool,
-    sqrt_tool,
-    exp_tool,
-    ln_tool
-])
+    tool_node = ToolNode(tools)
 
-builder = StateGraph(MessagesState)
-builder.add_node("agent", RunnableLambda(agent_node))
-builder.add_node("tools", tool_node)
-builder.add_edge(START, "agent")
-builder.add_conditional_edges("agent", tools_condition)
-builder.add_edge("tools", "agent")
-graph = builder.compile()
+    builder = StateGraph(AgentState)
+    builder.add_node("agent", RunnableLambda(agent_node))
+    builder.add_node("tools", tool_node)
+    builder.add_edge(START, "agent")
+    builder.add_conditional_edges("agent", tools_condition)
+    builder.add_edge("tools", "agent")
+    return builder.compile()
 
 
 # --------------------------------------------------------------------------------
@@ -107,6 +70,10 @@ graph = builder.compile()
 st.set_page_config(page_title="Fizban Math Agent (Latest Only)", layout="wide")
 st.title("🔮 Fizban’s Multitool Math Agent (Latest Only)")
 
+# Shared by every browser session: one compiled graph, one pool of agent workers
+graph = build_graph()
+pool = worker_pool()
+
 # Initialize conversation history in session_state
 if "messages" not in st.session_state:
     system_prompt = SystemMessage(
@@ -131,61 +98,74 @@ if "messages" not in st.session_state:
 if "user_input" not in st.session_state:
     st.session_state.user_input = ""
 
+# ... and one for the turn running in the background, if any
+if "turn" not in st.session_state:
+    st.session_state.turn = None
+
 # Define a callback that runs **before** Streamlit re-renders the page,
 # whenever the text_input "user_input" is changed (i.e. when the user hits Enter).
 def submit_callback():
     """Run a callback."""
     prompt = st.session_state["user_input"].strip()
-    if prompt:
-        # 1) Append the new human question
-        st.session_state.messages.append(HumanMessage(content=prompt))
+    # While a turn is running, keep the new question in the input box for later
+    if not prompt or st.session_state.turn is not None:
+        return
+
+    # 1) Add the new human question to the graph input; the history takes it
+    #    with the answer once the turn is over
+    messages = [*st.session_state.messages, HumanMessage(content=prompt)]
+
+    # 2) Start the LangGraph agent (tool call → tool output → final answer) on a
+    #    worker thread, so the page keeps responding while it runs
+    input_state = {"messages": messages}
+    st.session_state.turn = pool.submit_stream(
+        lambda: stream_graph_events(graph, input_state), prompt
+    )
 
-        # 2) Invoke the LangGraph agent (tool call → tool output → final answer)
-        input_state = {"messages": st.session_state.messages}
-        result_state: AgentState = graph.invoke(input_state)
+    # 3) Clear the text_input for the next question
+    st.session_state.user_input = ""
 
-        # 3) Overwrite session_state.messages with the updated list
-        st.session_state.messages = result_state["messages"]
 
-    # 4) Clear the text_input for the next question
-    st.session_state.user_input = ""
+# When the turn is over, overwrite session_state.messages with the updated list
+turn = st.session_state.turn
+if turn is not None and turn.poll():
+    if turn.final is not None:
+        st.session_state.messages = turn.final.messages
+    else:
+        st.error(f"Fizban failed: {turn.error}")
+    st.session_state.turn = None
 
 
 # --------------------------------------------------------------------------------
-# 5) Helper to render the **full** history in our LangGraph messages list
+# 5) Helper to render the history in our LangGraph messages list
 # --------------------------------------------------------------------------------
 def render_full_history():
-    """Render every message in st.session_state.messages in chronological order."""
-    for msg in st.session_state.messages:
-        if isinstance(msg, SystemMessage):
-            st.markdown(f"**System:** {msg.content}")
-        elif isinstance(msg, HumanMessage):
-            st.markdown(f"**You:** {msg.content}")
-        elif isinstance(msg, AIMessage):
-            fc = msg.additional_kwargs.get("function_call")
-            if fc:
-                name = fc["name"]
-                args = fc["arguments"]
-                tool_call_msg = ', '.join(f'{k}={v}' for k, v in args.items())
-                st.markdown(f"**Fizban (tool call):** `{name}({tool_call_msg})`")
-            else:
-                st.markdown(f"**Fizban:** {msg.content}")
-        else:
-            st.markdown(f"**{type(msg).__name__}:** {msg.content}")
-
-        st.markdown("---")
+    """Render st.session_state.messages in chronological order.
+
+    Only messages added since the last rerun are formatted; the latest turns are
+    drawn, older ones and the system prompt on request.
+    """
+    history = session_history()
+    history.sync(st.session_state.messages, speaker="Fizban")
+    history.render()
 
 # --------------------------------------------------------------------------------
 # 6) Build the page: Show the **full conversation** and then the input bar
 # --------------------------------------------------------------------------------
-st.subheader("Full Conversation")
+st.subheader("Conversation")
 render_full_history()
 st.markdown("---")
 
+# Stream the running turn; only this part of the page reruns until it is done
+if st.session_state.turn is not None:
+    live_turn(
+        st.session_state.turn, render=lambda turn: render_reply(turn, "Fizban")
+    )
+
 # This text_input stays directly below the latest answer. When the user hits Enter,
-# submit_callback() runs (appending a HumanMessage, invoking the agent, clearing the
-# input), and then Streamlit re-runs the entire script—so render_latest() will show the
-# newly updated slice.
+# submit_callback() runs (starting the agent on a new HumanMessage, clearing the
+# input), and then Streamlit re-runs the entire script—so live_turn() streams the
+# reply until the agent is done and the full history shows it.
 st.text_input(
     "Your question for Fizban:",
     key="user_input",
@@ -3,4 +3,64 @@
 The goal of this framework is to make it easy to set up agentic systems that call
 python functions.
 
+The names below can be imported from `pyfunc_agent` directly. Their modules load on
+first access, so `import pyfunc_agent` costs nothing until an agent is used.
+
 """
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "BaseMathAgent": "pyfunc_agent.simple_agents",
+    "MultiToolMathAgent": "pyfunc_agent.simple_agents",
+    "ReActMathAgent": "pyfunc_agent.simple_agents",
+    "AgentFactory": "pyfunc_agent.runtime",
+    "AgentRuntime": "pyfunc_agent.runtime",
+    "REGISTRY": "pyfunc_agent.registry",
+    "ToolRegistry": "pyfunc_agent.registry",
+    "register": "pyfunc_agent.registry",
+    "ToolExecutor": "pyfunc_agent.tool_executor",
+    "LLMResponseCache": "pyfunc_agent.llm_cache",
+    "configure_logging": "pyfunc_agent.events",
+    "METRICS": "pyfunc_agent.metrics",
+    "TurnTrace": "pyfunc_agent.metrics",
+    "serve_metrics": "pyfunc_agent.metrics",
+    "PROMPTS": "pyfunc_agent.utils",
+    "PromptRegistry": "pyfunc_agent.utils",
+    "memoize": "pyfunc_agent.caching",
+    "cache_stats": "pyfunc_agent.caching",
+    "TurnBudget": "pyfunc_agent.budgets",
+    "ContextPolicy": "pyfunc_agent.context",
+    "LastTurnsPolicy": "pyfunc_agent.context",
+    "TokenBudgetPolicy": "pyfunc_agent.context",
+    "SummaryPolicy": "pyfunc_agent.context",
+    "SessionManager": "pyfunc_agent.sessions",
+    "MemoryConversationStore": "pyfunc_agent.sessions",
+    "SQLiteConversationStore": "pyfunc_agent.sessions",
+    "BatchResult": "pyfunc_agent.batch",
+    "AgentWorkerPool": "pyfunc_agent.streamlit_ui",
+    "KeywordToolSelector": "pyfunc_agent.tool_selection",
+    "EmbeddingToolSelector": "pyfunc_agent.tool_selection",
+    "evaluate": "pyfunc_agent.expressions",
+    "ModelRouter": "pyfunc_agent.routing",
+    "ArithmeticRoute": "pyfunc_agent.routing",
+    "ModelRoute": "pyfunc_agent.routing",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import the module defining `name` on first access."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazily exported names with the module's own."""
+    return sorted(set(globals()) | set(__all__))
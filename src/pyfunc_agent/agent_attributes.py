@@ -1,10 +1,44 @@
 """Classes and functions for agent attributes."""
 
-from typing import TypedDict
+import uuid
+from typing import Annotated, TypedDict
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, RemoveMessage
+
+
+def append_messages(
+        left: list[BaseMessage],
+        right: list[BaseMessage] | BaseMessage
+    ) -> list[BaseMessage]:
+    """Reducer that appends a node's new messages to the history.
+
+    `add_messages` re-coerces and re-indexes the whole history by ID on every update,
+    a Python-level pass over every message. Our nodes only ever emit *new* messages,
+    so the common case is a plain list concatenation: still O(history) per step, but
+    a single C-level copy of references with no per-message Python work. The list
+    must not be extended in place: LangGraph hands the same list object to more than
+    one version of the channel within a run, so an in-place append shows up twice.
+    Updates that carry a `RemoveMessage` fall back to `add_messages`.
+    """
+    if not isinstance(right, list):
+        right = [right]
+
+    # Graph input: adopt the caller's history as-is instead of walking it.
+    if not left:
+        return right
+
+    if any(isinstance(m, RemoveMessage) for m in right):
+        from langgraph.graph.message import add_messages
+
+        return add_messages(left, right)
+
+    for m in right:
+        if m.id is None:
+            m.id = str(uuid.uuid4())
+
+    return left + right
 
 
 class AgentState(TypedDict):
     """Type for agent message."""
-    messages: list[BaseMessage]
+    messages: Annotated[list[BaseMessage], append_messages]
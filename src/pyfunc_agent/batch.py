@@ -0,0 +1,62 @@
+"""Batch queries.
+
+Helpers behind the agents' `batch_chat` / `abatch_chat`: many independent prompts
+run through one compiled graph with `batch` / `abatch`, each in its own state
+(system prompt plus one question), with bounded concurrency. Every item reports its
+answer, wall time and error, if any; one failing prompt never fails the batch.
+
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from pyfunc_agent.agent_attributes import AgentState
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of one prompt of a batch."""
+
+    index: int
+    """Position of the prompt in the input."""
+    prompt: str
+    answer: str | list[str] | None
+    """What `chat` would have returned; None if the item failed."""
+    seconds: float
+    """Wall time of this item, including time waiting on the model server."""
+    error: BaseException | None = None
+    messages: list[BaseMessage] = field(default_factory=list, repr=False)
+    """The item's full state: system prompt, question and the turn's messages."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item finished without an error."""
+        return self.error is None
+
+
+Timed = tuple[AgentState | None, float, BaseException | None]
+
+
+def timed(graph: Runnable) -> RunnableLambda:
+    """Return `graph` wrapped to yield `(state, seconds, error)` instead of raising."""
+
+    def invoke(state: AgentState, config: RunnableConfig) -> Timed:
+        start = time.perf_counter()
+        try:
+            result = graph.invoke(state, config)
+        except Exception as e:
+            return None, time.perf_counter() - start, e
+        return result, time.perf_counter() - start, None
+
+    async def ainvoke(state: AgentState, config: RunnableConfig) -> Timed:
+        start = time.perf_counter()
+        try:
+            result = await graph.ainvoke(state, config)
+        except Exception as e:
+            return None, time.perf_counter() - start, e
+        return result, time.perf_counter() - start, None
+
+    return RunnableLambda(invoke, afunc=ainvoke, name="timed_graph")
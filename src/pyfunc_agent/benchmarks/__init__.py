@@ -0,0 +1,10 @@
+"""Offline benchmarks for agents.
+
+Benchmarks drive the agent classes with a scripted fake chat model so they run
+without a live Ollama server. Run a benchmark as a module, e.g.
+`python -m pyfunc_agent.benchmarks.history_overhead`.
+
+`python -m pyfunc_agent.benchmarks.suite` runs the headline measurements together
+and compares them with a stored baseline.
+
+"""
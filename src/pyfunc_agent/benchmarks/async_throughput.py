@@ -0,0 +1,81 @@
+"""Conversations per second, sync versus async agent path.
+
+Runs the same number of single-turn conversations through `MultiToolMathAgent`
+against a local fake Ollama server: once sequentially with `chat()`, once
+concurrently on one event loop with `achat()`. Each conversation costs two model
+round trips of `--latency` seconds, so the sync path is bound by latency while the
+async path overlaps the waits.
+
+Run with `>> python -m pyfunc_agent.benchmarks.async_throughput`
+
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from langchain_ollama import ChatOllama
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.benchmarks.fake_ollama import FakeOllamaServer
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+
+def make_agents(n: int, base_url: str) -> list[MultiToolMathAgent]:
+    """Build one agent (one conversation) per session against the fake server."""
+    return [
+        MultiToolMathAgent(
+            prompt_name="calc_bot.yaml",
+            llm=ChatOllama(model="fake", base_url=base_url, temperature=0.0),
+        )
+        for _ in range(n)
+    ]
+
+
+def run_sync(agents: list[MultiToolMathAgent]) -> float:
+    """Return conversations/sec running every agent's turn one after another."""
+    start = time.perf_counter()
+    for i, agent in enumerate(agents):
+        agent.chat(f"What is 4 plus {i}?")
+    return len(agents) / (time.perf_counter() - start)
+
+
+async def run_async(agents: list[MultiToolMathAgent], concurrency: int) -> float:
+    """Return conversations/sec running every agent's turn on one event loop."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i: int, agent: MultiToolMathAgent) -> str:
+        async with limit:
+            return await agent.achat(f"What is 4 plus {i}?")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i, agent) for i, agent in enumerate(agents)))
+    return len(agents) / (time.perf_counter() - start)
+
+
+def main() -> int:
+    """Run both paths and print conversations/sec."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with FakeOllamaServer(ScriptedChatModel(latency=args.latency)) as server:
+        sync_rate = run_sync(make_agents(args.conversations, server.base_url))
+        async_rate = asyncio.run(
+            run_async(
+                make_agents(args.conversations, server.base_url),
+                args.concurrency,
+            )
+        )
+
+    print(f"sync  chat():  {sync_rate:8.1f} conversations/sec")
+    print(f"async achat(): {async_rate:8.1f} conversations/sec")
+    print(f"speedup:       {async_rate / sync_rate:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Prompts per second, `chat` loop versus `batch_chat`.
+
+Pushes the same independent questions through one `MultiToolMathAgent` against a
+local fake Ollama server: once with `chat()` in a loop (the old offline-job
+pattern), once with `batch_chat()` and once with `abatch_chat()`. Each prompt costs
+two model round trips of `--latency` seconds, so the loop is bound by latency while
+the batch paths overlap up to `--max-concurrency` prompts.
+
+Run with `>> python -m pyfunc_agent.benchmarks.batch_throughput`
+
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from langchain_ollama import ChatOllama
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.benchmarks.fake_ollama import FakeOllamaServer
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+
+def main() -> int:
+    """Run the loop and both batch paths and print prompts/sec."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=100)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    prompts = [f"What is 4 plus {i}?" for i in range(args.prompts)]
+    with FakeOllamaServer(ScriptedChatModel(latency=args.latency)) as server:
+        agent = MultiToolMathAgent(
+            prompt_name="calc_bot.yaml",
+            llm=ChatOllama(model="fake", base_url=server.base_url, temperature=0.0),
+        )
+        rates = {}
+        start = time.perf_counter()
+        for prompt in prompts:
+            agent.chat(prompt)
+        rates["chat() loop"] = len(prompts) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = agent.batch_chat(prompts, max_concurrency=args.max_concurrency)
+        rates["batch_chat()"] = len(prompts) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results += asyncio.run(
+            agent.abatch_chat(prompts, max_concurrency=args.max_concurrency)
+        )
+        rates["abatch_chat()"] = len(prompts) / (time.perf_counter() - start)
+
+    for name, rate in rates.items():
+        print(f"{name:>14}: {rate:8.1f} prompts/sec")
+    print(f"{'speedup':>14}: {rates['batch_chat()'] / rates['chat() loop']:8.1f}x")
+    failed = [r for r in results if not r.ok]
+    print(f"{'errors':>14}: {len(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
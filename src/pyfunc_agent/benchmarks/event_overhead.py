@@ -0,0 +1,69 @@
+"""Per-call cost of tool-call events.
+
+Calls the registered `add_tool` wrapper `--calls` times with events disabled, with
+events written as JSON lines to a discarded stream, and with the old unconditional
+`print()` to a discarded stream, and compares each with calling the plain function.
+
+Run with `>> python -m pyfunc_agent.benchmarks.event_overhead`
+
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from collections.abc import Callable
+
+from pyfunc_agent.events import configure_logging, disable_logging
+from pyfunc_agent.registry import REGISTRY
+
+
+def per_call_us(call: Callable[[], object], calls: int) -> float:
+    """Return microseconds per call of `call`."""
+    call()
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> int:
+    """Run the benchmark and print per-call overhead."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    spec = REGISTRY.spec("add_tool")
+    tool = REGISTRY.get("add_tool")
+    kwargs = {"a": 4.0, "b": 5.2}
+
+    def plain() -> object:
+        return spec.func(**kwargs)
+
+    def printed() -> object:
+        print(f"[{spec.name}] called with a=4.0, b=5.2.")
+        return spec.func(**kwargs)
+
+    def wrapped() -> object:
+        return tool.func(**kwargs)
+
+    results = {"plain function": per_call_us(plain, args.calls)}
+    disable_logging()
+    results["events disabled"] = per_call_us(wrapped, args.calls)
+    with open(os.devnull, "w") as devnull:
+        listener = configure_logging(stream=devnull)
+        results["events enabled"] = per_call_us(wrapped, args.calls)
+        listener.stop()
+        disable_logging()
+        with contextlib.redirect_stdout(devnull):
+            results["print()"] = per_call_us(printed, args.calls)
+
+    base = results["plain function"]
+    for name, us in results.items():
+        print(f"{name:>16}: {us:7.2f} us/call ({us - base:+6.2f} us)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Scripted fake chat model for offline benchmarks."""
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+)
+from langchain_core.messages.ai import UsageMetadata
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+
+
+def _usage(input_tokens: int, output_tokens: int) -> UsageMetadata:
+    return UsageMetadata(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake chat model that replays a fixed tool-call script on every turn.
+
+    The response depends only on the conversation passed in, never on hidden
+    counters, so one instance can safely serve many sessions. Each turn (everything
+    after the latest `HumanMessage`) emits the hops in `tool_calls` in order, then
+    finishes with `answer`. Responses carry token usage estimated from the text
+    (4 characters per token), so token metrics work offline too.
+    """
+
+    tool_calls: list[list[dict[str, Any]]] = [
+        [{"name": "add_tool", "args": {"a": 4.0, "b": 5.2}}]
+    ]
+    """One entry per hop; each hop is a list of `{"name": ..., "args": ...}` calls."""
+    answer: str = "The answer is 9.2."
+    """Content of the final AIMessage of each turn."""
+    latency: float | list[float] = 0.0
+    """Seconds to sleep per call, standing in for model server latency.
+
+    A list gives the latency of each hop of a turn; the last entry repeats.
+    """
+
+    def bind_tools(self, tools: list[Any], **kwargs: object) -> Runnable:
+        """Accept the agent's tools; the script already names the tools to call."""
+        return self
+
+    @staticmethod
+    def _hop(messages: list[BaseMessage]) -> int:
+        """Return how many tool-calling hops the current turn has had."""
+        hop = 0
+        for msg in reversed(messages):
+            if isinstance(msg, HumanMessage):
+                break
+            if isinstance(msg, AIMessage) and msg.tool_calls:
+                hop += 1
+        return hop
+
+    def _latency(self, messages: list[BaseMessage]) -> float:
+        """Return the latency of the current hop."""
+        if isinstance(self.latency, (int, float)):
+            return self.latency
+        if not self.latency:
+            return 0.0
+        return self.latency[min(self._hop(messages), len(self.latency) - 1)]
+
+    def _next_message(self, messages: list[BaseMessage]) -> AIMessage:
+        """Return the scripted response for the current hop of the turn."""
+        hop = self._hop(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 1
+        if hop < len(self.tool_calls):
+            calls = [
+                {
+                    "name": call["name"],
+                    "args": dict(call["args"]),
+                    "id": f"call_{uuid.uuid4().hex}",
+                }
+                for call in self.tool_calls[hop]
+            ]
+            return AIMessage(
+                content="",
+                tool_calls=calls,
+                usage_metadata=_usage(prompt_tokens, 8 * len(calls)),
+            )
+
+        return AIMessage(
+            content=self.answer,
+            usage_metadata=_usage(prompt_tokens, len(self.answer) // 4 + 1),
+        )
+
+    def _generate(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: CallbackManagerForLLMRun | None = None,
+            **kwargs: object,
+        ) -> ChatResult:
+        """Sleep for `latency` and return the scripted message."""
+        latency = self._latency(messages)
+        if latency:
+            time.sleep(latency)
+        generation = ChatGeneration(message=self._next_message(messages))
+        return ChatResult(generations=[generation])
+
+    async def _agenerate(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: AsyncCallbackManagerForLLMRun | None = None,
+            **kwargs: object,
+        ) -> ChatResult:
+        """Async version of `_generate` that sleeps without blocking the loop."""
+        latency = self._latency(messages)
+        if latency:
+            await asyncio.sleep(latency)
+        generation = ChatGeneration(message=self._next_message(messages))
+        return ChatResult(generations=[generation])
+
+    def _stream(
+            self,
+            messages: list[BaseMessage],
+            stop: list[str] | None = None,
+            run_manager: CallbackManagerForLLMRun | None = None,
+            **kwargs: object,
+        ) -> Iterator[ChatGenerationChunk]:
+        """Sleep for `latency`, then stream the scripted message word by word."""
+        latency = self._latency(messages)
+        if latency:
+            time.sleep(latency)
+        message = self._next_message(messages)
+
+        if message.tool_calls:
+            chunks = [
+                {
+                    "name": call["name"],
+                    "args": json.dumps(call["args"]),
+                    "id": call["id"],
+                    "index": i,
+                }
+                for i, call in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content="", tool_call_chunks=chunks)
+            )
+            return
+
+        for token in re.split(r"(\s+)", message.content):
+            if token:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    @property
+    def _llm_type(self) -> str:
+        """Return type of chat model."""
+        return "scripted-fake-chat-model"
@@ -0,0 +1,209 @@
+"""Local fake Ollama server for offline benchmarks.
+
+Serves Ollama's streaming `/api/chat` endpoint from a background thread and answers
+every request from a `ScriptedChatModel` script, so a real `ChatOllama` client (sync
+or async) can be benchmarked without a model. Each request is handled on its own
+thread, so concurrent clients overlap their `latency` sleeps like they would against
+a server with spare parallel capacity.
+
+By default `prompt_eval_count` counts the whole request. With `prompt_cache`, the
+server mimics Ollama's KV cache instead: it keeps the prompt of its last request
+plus the reply, and counts only the tokens after the longest prefix of whole
+messages (and the tool schemas) a new request shares with it. With `record`, every
+request body is kept in `requests`, to check what a client sends.
+
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+
+
+def _prompt_key(message: dict[str, Any]) -> str:
+    """Return a chat message as the model sees it, whatever the key order."""
+    calls = [
+        [call["function"]["name"], call["function"]["arguments"]]
+        for call in message.get("tool_calls") or []
+    ]
+    return json.dumps(
+        [message.get("role"), message.get("content", ""), calls], sort_keys=True
+    )
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _to_messages(payload: list[dict[str, Any]]) -> list[BaseMessage]:
+    """Convert Ollama chat messages into LangChain messages for the script."""
+    messages: list[BaseMessage] = []
+    for i, msg in enumerate(payload):
+        role = msg.get("role")
+        content = msg.get("content", "")
+        if role == "user":
+            messages.append(HumanMessage(content=content))
+        elif role == "assistant":
+            calls = [
+                {
+                    "name": call["function"]["name"],
+                    "args": call["function"]["arguments"],
+                    "id": f"{i}_{j}",
+                }
+                for j, call in enumerate(msg.get("tool_calls") or [])
+            ]
+            messages.append(AIMessage(content=content, tool_calls=calls))
+        elif role == "tool":
+            messages.append(ToolMessage(content=content, tool_call_id=str(i)))
+        else:
+            messages.append(SystemMessage(content=content))
+    return messages
+
+
+class _Server(ThreadingHTTPServer):
+    """Threaded server with a listen backlog deep enough for concurrent benchmarks."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class FakeOllamaServer:
+    """Threaded HTTP server speaking enough of the Ollama API for `ChatOllama`."""
+
+    def __init__(
+            self,
+            script: ScriptedChatModel | None = None,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            prompt_cache: bool = False,
+            record: bool = False,
+        ) -> None:
+        """Bind the server; port 0 picks a free port."""
+        self.script = script or ScriptedChatModel()
+        self.requests: list[dict[str, Any]] = []
+        """Every request body, oldest first, when recording."""
+        script = self.script
+        server = self
+        # The prompt of the last request and its reply, as (key, tokens) pairs
+        cached: list[tuple[str, int]] = []
+        lock = threading.Lock()
+
+        def prompt_eval_count(request: dict[str, Any], reply: dict[str, Any]) -> int:
+            """Return the prompt tokens not served from the cache, and update it."""
+            prompt = [json.dumps(request.get("tools") or [], sort_keys=True)]
+            prompt += [_prompt_key(m) for m in request.get("messages", [])]
+            with lock:
+                shared = 0
+                for (key, _), new in zip(cached, prompt):
+                    if key != new:
+                        break
+                    shared += 1
+                cached[:] = [
+                    *cached[:shared],
+                    *((key, _tokens(key)) for key in prompt[shared:]),
+                ]
+                evaluated = sum(tokens for _, tokens in cached[shared:])
+                reply_key = _prompt_key(reply)
+                cached.append((reply_key, _tokens(reply_key)))
+            return max(evaluated, 1)
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; do not delay the body
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:
+                """Answer `/api/chat` with a scripted NDJSON stream."""
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                request = json.loads(body or b"{}")
+                if self.path != "/api/chat":
+                    self.send_error(404)
+                    return
+                if record:
+                    with lock:
+                        server.requests.append(request)
+
+                start = time.perf_counter()
+                messages = _to_messages(request.get("messages", []))
+                latency = script._latency(messages)
+                if latency:
+                    time.sleep(latency)
+                reply = script._next_message(messages)
+                # Durations in nanoseconds, split like a real server's would be
+                elapsed = int((time.perf_counter() - start) * 1e9) + 1
+
+                message: dict[str, Any] = {"role": "assistant", "content": reply.content}
+                if reply.tool_calls:
+                    message["tool_calls"] = [
+                        {"function": {"name": c["name"], "arguments": c["args"]}}
+                        for c in reply.tool_calls
+                    ]
+                evaluated = (
+                    prompt_eval_count(request, message)
+                    if prompt_cache
+                    else len(body) // 4
+                )
+                lines = [
+                    {"model": request.get("model"), "message": message, "done": False},
+                    {
+                        "model": request.get("model"),
+                        "message": {"role": "assistant", "content": ""},
+                        "done": True,
+                        "done_reason": "stop",
+                        "prompt_eval_count": evaluated,
+                        "eval_count": len(reply.content) // 4 + 1,
+                        "total_duration": elapsed,
+                        "load_duration": 0,
+                        "prompt_eval_duration": elapsed // 4,
+                        "eval_duration": elapsed - elapsed // 4,
+                    },
+                ]
+                data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                """Keep request logs out of benchmark output."""
+
+        self._server = _Server((host, port), Handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to pass to `ChatOllama(base_url=...)`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve requests from a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        """Start the server for a `with` block."""
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        """Stop the server at the end of a `with` block."""
+        self.stop()
@@ -0,0 +1,111 @@
+"""Per-turn overhead versus history length.
+
+Each turn runs one agent -> tools -> agent round trip against a zero-latency fake
+model. Time spent inside the model call (which has to read the whole history no
+matter what the graph does) is measured separately and subtracted, leaving the
+agent/graph overhead. The reducer still copies the history's list of references
+once per step, so the overhead is not strictly flat, but with no per-message Python
+work it should grow only slowly with the prior history; the benchmark exits non-zero
+if the slowest size is more than `--max-ratio` times the fastest.
+
+Run with `>> python -m pyfunc_agent.benchmarks.history_overhead`
+
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.simple_agents import MultiToolMathAgent, ReActMathAgent
+
+SIZES = (10, 100, 1_000, 10_000)
+
+
+def synthetic_history(n: int) -> list[BaseMessage]:
+    """Return `n` alternating Human/AI messages to pre-load an agent with."""
+    history: list[BaseMessage] = []
+    for i in range(n):
+        if i % 2 == 0:
+            history.append(HumanMessage(content=f"Question {i}: add {i} and 1."))
+        else:
+            history.append(AIMessage(content=f"The answer is {i}."))
+    return history
+
+
+class TimedLLM:
+    """Wrap a bound chat model and accumulate the wall time spent in `invoke`."""
+
+    def __init__(self, llm: Runnable) -> None:
+        """Wrap `llm`."""
+        self.llm = llm
+        self.seconds = 0.0
+
+    def invoke(self, messages: list[BaseMessage], **kwargs: object) -> BaseMessage:
+        """Invoke the wrapped model, timing the call."""
+        start = time.perf_counter()
+        try:
+            return self.llm.invoke(messages, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+
+def time_turns(
+        agent: MultiToolMathAgent | ReActMathAgent,
+        turns: int,
+        warmup: int = 3
+    ) -> float:
+    """Return the median per-turn overhead in seconds, excluding model time."""
+    timed = TimedLLM(agent.llm)
+    agent.runtime.llm = timed
+    samples: list[float] = []
+    for i in range(warmup + turns):
+        timed.seconds = 0.0
+        start = time.perf_counter()
+        agent.chat(f"What is 4 plus {i}?")
+        elapsed = time.perf_counter() - start - timed.seconds
+        if i >= warmup:
+            samples.append(elapsed)
+    return statistics.median(samples)
+
+
+def run(sizes: tuple[int, ...], turns: int) -> dict[str, dict[int, float]]:
+    """Measure the median per-turn overhead for each agent class and history size."""
+    results: dict[str, dict[int, float]] = {}
+    for agent_cls in (MultiToolMathAgent, ReActMathAgent):
+        results[agent_cls.__name__] = {}
+        for n in sizes:
+            agent = agent_cls(prompt_name="calc_bot.yaml", llm=ScriptedChatModel())
+            agent.messages.extend(synthetic_history(n))
+            results[agent_cls.__name__][n] = time_turns(agent, turns)
+    return results
+
+
+def main() -> int:
+    """Run the benchmark, print a table and check the flatness budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    args = parser.parse_args()
+
+    results = run(tuple(args.sizes), args.turns)
+
+    ok = True
+    for name, per_size in results.items():
+        print(f"{name}")
+        for n, seconds in per_size.items():
+            print(f"  {n:>7} prior messages: {seconds * 1e3:8.3f} ms/turn")
+        ratio = max(per_size.values()) / min(per_size.values())
+        print(f"  max/min ratio: {ratio:.2f} (budget {args.max_ratio:.2f})")
+        ok = ok and ratio <= args.max_ratio
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Cold import time of the package, with a budget.
+
+Imports each module in a fresh interpreter under `python -X importtime` and takes
+the median cumulative time over `--repeat` runs. Fails (exit status 1) when a module
+takes longer than its budget, or when importing it loads a heavy dependency that
+should only load on first use (the model client, the graph library, the UI and
+torch).
+
+Run with `>> python -m pyfunc_agent.benchmarks.import_time`
+
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Module -> import budget in milliseconds
+BUDGETS_MS = {
+    "pyfunc_agent": 20.0,
+    "pyfunc_agent.tools": 300.0,
+    "pyfunc_agent.simple_agents": 1200.0,
+}
+# Modules that importing any of the above must not load
+DEFERRED = ("langchain_ollama", "langgraph", "torch", "streamlit")
+
+
+def import_time_ms(module: str) -> float:
+    """Return the cumulative import time of `module` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are "import time: self [us] | cumulative | name"; find the top level
+    for line in result.stderr.splitlines():
+        _, _, fields = line.partition("import time:")
+        parts = [p.strip() for p in fields.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e3
+    raise RuntimeError(f"No import time reported for {module}.")
+
+
+def loaded_modules(module: str) -> set[str]:
+    """Return the top-level packages loaded by importing `module`."""
+    code = f"import sys, {module}; print(*sys.modules, sep='\\n')"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+def main() -> int:
+    """Measure every budgeted module and report regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, e.g. on slow CI machines.",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in BUDGETS_MS.items():
+        budget *= args.scale
+        ms = statistics.median(import_time_ms(module) for _ in range(args.repeat))
+        eager = sorted(set(DEFERRED) & loaded_modules(module))
+        status = "ok" if ms <= budget and not eager else "FAIL"
+        print(f"{module:>28}: {ms:8.1f} ms (budget {budget:7.1f} ms) {status}")
+        if ms > budget:
+            failures.append(f"{module} took {ms:.1f} ms, over {budget:.1f} ms")
+        if eager:
+            failures.append(f"{module} eagerly imports {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"regression: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Prompt-prefix reuse across the turns of a session.
+
+Runs `--turns` turns of one `MultiToolMathAgent` session through a real
+`ChatOllama` client against a local fake Ollama server that mimics Ollama's KV
+cache: it evaluates only the prompt after the prefix a request shares with the
+previous one. Once with the whole history and once with a `LastTurnsPolicy`, it
+prints the prompt tokens evaluated on the first and last turn and the share of
+each prompt served from the cache, as estimated by the agent's metrics.
+
+It also checks that the client sends a byte-stable prefix: every request repeats
+the previous request's messages byte for byte, with the same tools and options.
+
+Run with `>> python -m pyfunc_agent.benchmarks.prefix_reuse`
+
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from typing import Any
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.benchmarks.fake_ollama import FakeOllamaServer
+from pyfunc_agent.context import ContextPolicy, LastTurnsPolicy
+from pyfunc_agent.metrics import TurnTrace
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+PROMPT = "calc_bot.yaml"
+# Request fields that must not change within a session
+FIXED_FIELDS = ("model", "tools", "options", "keep_alive", "format")
+
+
+def run(
+        turns: int,
+        policy: ContextPolicy | None,
+    ) -> tuple[list[TurnTrace], list[dict[str, Any]]]:
+    """Return the trace of each turn and every request the server received."""
+    with FakeOllamaServer(ScriptedChatModel(), prompt_cache=True, record=True) as server:
+        agent = MultiToolMathAgent(
+            prompt_name=PROMPT,
+            context_policy=policy,
+            model_options={"base_url": server.base_url},
+        )
+        traces = []
+        for i in range(turns):
+            _, trace = agent.chat(f"What is 4 plus {i}?", return_trace=True)
+            traces.append(trace)
+        return traces, server.requests
+
+
+def unstable_requests(requests: list[dict[str, Any]]) -> list[int]:
+    """Return the indices of requests that do not extend the previous one."""
+    unstable = []
+    for i in range(1, len(requests)):
+        before, after = requests[i - 1], requests[i]
+        n = len(before["messages"])
+        same_fields = all(before.get(f) == after.get(f) for f in FIXED_FIELDS)
+        same_prefix = json.dumps(after["messages"][:n]) == json.dumps(
+            before["messages"]
+        )
+        if not (same_fields and same_prefix):
+            unstable.append(i)
+    return unstable
+
+
+def main() -> int:
+    """Run both variants, print their prompt reuse and check the prefix."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    variants: dict[str, ContextPolicy | None] = {
+        "whole history": None,
+        "last 2 turns": LastTurnsPolicy(2),
+    }
+    stable = True
+    for name, policy in variants.items():
+        traces, requests = run(args.turns, policy)
+        reuse = [
+            call.estimated_prompt_reuse
+            for trace in traces[1:]
+            for call in trace.llm_calls
+            if call.estimated_prompt_reuse is not None
+        ]
+        print(
+            f"{name}: {traces[0].prompt_tokens} prompt tokens evaluated on turn 1, "
+            f"{traces[-1].prompt_tokens} on turn {len(traces)}; "
+            f"~{statistics.mean(reuse):.1%} of later prompts reused (estimate)"
+        )
+        if policy is None:
+            unstable = unstable_requests(requests)
+            stable = not unstable
+            print(f"  byte-stable prefix over {len(requests)} requests: {stable}")
+            if unstable:
+                print(f"  requests changing the prefix: {unstable[:10]}")
+    return 0 if stable else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
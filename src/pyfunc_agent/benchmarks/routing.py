@@ -0,0 +1,118 @@
+"""Turn latency with and without a model router in front of the large model.
+
+Asks a mix of plainly arithmetic and worded questions of a `MultiToolMathAgent`
+whose own ("large") model is a fake answering each call after `--large-latency`
+seconds. With a `ModelRouter`, arithmetic questions take the rules-based fast path
+and the rest go to a fake small model answering after `--small-latency` seconds:
+once a small model whose responses pass the router's checks, once one that calls
+its tool with invalid arguments, so every worded turn escalates to the large
+model. Prints the median time of arithmetic and worded turns and the routes taken
+per variant, and checks that each turn was answered by the route expected.
+
+Run with `>> python -m pyfunc_agent.benchmarks.routing`
+
+"""
+
+import argparse
+import statistics
+import sys
+from collections import Counter
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.metrics import TurnTrace
+from pyfunc_agent.routing import ArithmeticRoute, ModelRoute, ModelRouter
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+PROMPT = "calc_bot.yaml"
+ARITHMETIC = ["Add 4 and 5.2", "What is sqrt(625) + 3?", "What is 10 divided by 4?"]
+WORDED = [
+    "I had 4 apples and bought 5.2 more. How many now?",
+    "Is 9.2 bigger than the sum of my two numbers?",
+]
+LARGE_ANSWER = "The large model says 9.2."
+SMALL_ANSWER = "The small model says 9.2."
+ADD = {"name": "add_tool", "args": {"a": 4.0, "b": 5.2}}
+BAD_ADD = {"name": "add_tool", "args": {"a": "four"}}
+
+
+def run(
+        agent: MultiToolMathAgent,
+        turns: int,
+    ) -> list[tuple[str, str, TurnTrace]]:
+    """Ask every question `turns` times; return each question, reply and trace."""
+    traces = []
+    for question in (ARITHMETIC + WORDED) * turns:
+        _, trace = agent.chat(question, return_trace=True)
+        traces.append((question, agent.messages[-1].content, trace))
+    return traces
+
+
+def median_ms(traces: list[tuple[str, str, TurnTrace]], questions: list[str]) -> float:
+    """Return the median turn time of `questions`, in milliseconds."""
+    return statistics.median(
+        trace.seconds * 1e3 for question, _, trace in traces if question in questions
+    )
+
+
+def answered_by(trace: TurnTrace) -> str:
+    """Return the route of the turn's final answer."""
+    answered = [route for route, outcome, _ in trace.routes if outcome == "answered"]
+    return answered[-1] if answered else "default"
+
+
+def main() -> int:
+    """Run the variants and print their median turn time and routes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--large-latency", type=float, default=0.1)
+    parser.add_argument("--small-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    large = ScriptedChatModel(
+        tool_calls=[[ADD]], answer=LARGE_ANSWER, latency=args.large_latency
+    )
+
+    def small(calls: list[dict]) -> ModelRoute:
+        llm = ScriptedChatModel(
+            tool_calls=[calls], answer=SMALL_ANSWER, latency=args.small_latency
+        )
+        return ModelRoute(llm=llm, name="small")
+
+    variants = {
+        "large model only": (None, "default"),
+        "router, valid small model": (
+            ModelRouter([ArithmeticRoute(), small([ADD])]),
+            "small",
+        ),
+        "router, failing small model": (
+            ModelRouter([ArithmeticRoute(), small([BAD_ADD])]),
+            "default",
+        ),
+    }
+
+    ok = True
+    for name, (router, worded_route) in variants.items():
+        agent = MultiToolMathAgent(prompt_name=PROMPT, llm=large, router=router)
+        traces = run(agent, args.turns)
+        routes = Counter(answered_by(trace) for _, _, trace in traces)
+        print(
+            f"{name}: arithmetic {median_ms(traces, ARITHMETIC):6.1f} ms/turn, "
+            f"worded {median_ms(traces, WORDED):6.1f} ms/turn (medians)"
+        )
+        print(f"  answered by {dict(routes)}")
+
+        for question, reply, trace in traces:
+            if router is not None and question in ARITHMETIC:
+                expected = "arithmetic"
+            else:
+                expected = worded_route
+            got = answered_by(trace)
+            answers = {"default": LARGE_ANSWER, "small": SMALL_ANSWER}
+            if got != expected or reply != answers.get(got, reply):
+                print(f"  unexpected: {question!r} answered by {got}: {reply!r}")
+                ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Cost of starting a new agent session.
+
+Compares building every agent from scratch (model client, tool schemas, graph
+compile, prompt load) with `AgentFactory.create`, which reuses one shared runtime and
+only allocates the per-session message history. Reports the time and the memory
+retained per session.
+
+Run with `>> python -m pyfunc_agent.benchmarks.session_creation`
+
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.runtime import AgentFactory
+from pyfunc_agent.simple_agents import BaseMathAgent, MultiToolMathAgent
+
+PROMPT = "calc_bot.yaml"
+
+
+def measure(make: Callable[[], BaseMathAgent], sessions: int) -> tuple[float, float]:
+    """Return seconds and retained bytes per session for `sessions` calls of `make`."""
+    make()  # warm imports and caches
+
+    start = time.perf_counter()
+    for _ in range(sessions):
+        make()
+    seconds = (time.perf_counter() - start) / sessions
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    agents = [make() for _ in range(sessions)]
+    retained = (tracemalloc.get_traced_memory()[0] - before) / sessions
+    tracemalloc.stop()
+    del agents
+    return seconds, retained
+
+
+def main() -> int:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    llm = ScriptedChatModel()
+    factory = AgentFactory()
+
+    def fresh() -> BaseMathAgent:
+        agent = MultiToolMathAgent(prompt_name=PROMPT, llm=llm)
+        agent.graph  # the runtime builds its graph on first use
+        return agent
+
+    def shared() -> BaseMathAgent:
+        return factory.create(MultiToolMathAgent, prompt_name=PROMPT, llm=llm)
+
+    results = {
+        "fresh runtime": measure(fresh, args.sessions),
+        "AgentFactory": measure(shared, args.sessions),
+    }
+    for name, (seconds, retained) in results.items():
+        print(
+            f"{name:>14}: {seconds * 1e6:10.1f} us/session "
+            f"{retained / 1024:10.1f} KiB/session"
+        )
+    speedup = results["fresh runtime"][0] / results["AgentFactory"][0]
+    print(f"speedup: {speedup:.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
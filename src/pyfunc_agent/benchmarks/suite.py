@@ -0,0 +1,250 @@
+"""Offline benchmark suite with a stored baseline.
+
+Runs every headline measurement against the scripted fake model, so no Ollama
+server is needed:
+
+- turns/sec of `MultiToolMathAgent` and `ReActMathAgent` (one tool hop per turn);
+- per-turn agent overhead at a short and a long history;
+- time and memory per new session, built fresh and through `AgentFactory`;
+- cold import time of the package;
+- turns/sec of the example graphs in `examples/`, whose `ChatOllama` clients are
+  pointed at a local fake Ollama server (skipped when the examples are not on disk).
+
+Results are compared with `baseline.json` next to this file; a result worse than
+the baseline by more than `--tolerance` is a regression and the suite exits 1.
+Baselines are machine specific: record one on the machine you compare on with
+`--update-baseline`.
+
+Run with `>> python -m pyfunc_agent.benchmarks.suite`
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import runpy
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import HumanMessage
+
+from pyfunc_agent.benchmarks import history_overhead, import_time, session_creation
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.benchmarks.fake_ollama import FakeOllamaServer
+from pyfunc_agent.runtime import AgentFactory
+from pyfunc_agent.simple_agents import BaseMathAgent, MultiToolMathAgent, ReActMathAgent
+
+BASELINE = Path(__file__).with_name("baseline.json")
+EXAMPLES_DIR = Path(__file__).resolve().parents[3] / "examples"
+EXAMPLES = ("adding_agent01.py", "multitool_agent02.py")
+PROMPT = "calc_bot.yaml"
+
+
+@dataclass
+class Measurement:
+    """One benchmark result."""
+
+    value: float
+    unit: str
+    higher_is_better: bool
+    noise: float = 0.0
+    """Absolute change (in `unit`) too small to count as a regression."""
+
+    def regressed(self, baseline: "Measurement", tolerance: float) -> bool:
+        """Return whether this is worse than `baseline` by more than `tolerance`.
+
+        The change must also exceed `noise`, so tiny timings do not flap.
+        """
+        worse_by = baseline.value - self.value
+        if not self.higher_is_better:
+            worse_by = -worse_by
+        return worse_by > max(abs(baseline.value) * tolerance, self.noise)
+
+
+# ------------------------------------------------------------------------------
+#  MEASUREMENTS
+# ------------------------------------------------------------------------------
+def turns_per_second(agent: BaseMathAgent, turns: int) -> float:
+    """Return chat turns per second for `agent`, after a short warmup."""
+    for i in range(3):
+        agent.chat(f"What is 4 plus {i}?")
+    start = time.perf_counter()
+    for i in range(turns):
+        agent.chat(f"What is 4 plus {i}?")
+    return turns / (time.perf_counter() - start)
+
+
+def graph_turns_per_second(graph: Any, turns: int) -> float:  # noqa: ANN401
+    """Return single-question invocations per second of a compiled graph."""
+    graph.invoke({"messages": [HumanMessage(content="Add 4 and 5.2")]})
+    start = time.perf_counter()
+    for i in range(turns):
+        graph.invoke({"messages": [HumanMessage(content=f"Add 4 and {i}")]})
+    return turns / (time.perf_counter() - start)
+
+
+def agent_results(turns: int) -> dict[str, Measurement]:
+    """Measure turns/sec of both agent classes."""
+    results = {}
+    for agent_cls in (MultiToolMathAgent, ReActMathAgent):
+        agent = agent_cls(prompt_name=PROMPT, llm=ScriptedChatModel())
+        rate = turns_per_second(agent, turns)
+        results[f"{agent_cls.__name__}.turns_per_sec"] = Measurement(
+            rate, "turns/s", True
+        )
+    return results
+
+
+def history_results(turns: int, long_history: int) -> dict[str, Measurement]:
+    """Measure per-turn overhead at a short and a long history."""
+    per_agent = history_overhead.run((10, long_history), turns)
+    return {
+        f"{name}.overhead_ms.history_{n}": Measurement(seconds * 1e3, "ms", False)
+        for name, per_size in per_agent.items()
+        for n, seconds in per_size.items()
+    }
+
+
+def session_results(sessions: int) -> dict[str, Measurement]:
+    """Measure time and retained memory per new session."""
+    llm = ScriptedChatModel()
+    factory = AgentFactory()
+
+    def fresh() -> BaseMathAgent:
+        agent = MultiToolMathAgent(prompt_name=PROMPT, llm=llm)
+        agent.graph  # the runtime builds its graph on first use
+        return agent
+
+    def shared() -> BaseMathAgent:
+        return factory.create(MultiToolMathAgent, prompt_name=PROMPT, llm=llm)
+
+    results = {}
+    for name, make in (("fresh", fresh), ("factory", shared)):
+        seconds, retained = session_creation.measure(make, sessions)
+        results[f"session.{name}.us"] = Measurement(
+            seconds * 1e6, "us", False, noise=10.0
+        )
+        results[f"session.{name}.kib"] = Measurement(
+            retained / 1024, "KiB", False, noise=1.0
+        )
+    return results
+
+
+def startup_results(repeat: int) -> dict[str, Measurement]:
+    """Measure cold import times in fresh interpreters."""
+    results = {}
+    for module in ("pyfunc_agent", "pyfunc_agent.simple_agents"):
+        ms = statistics.median(
+            import_time.import_time_ms(module) for _ in range(repeat)
+        )
+        results[f"import.{module}.ms"] = Measurement(ms, "ms", False, noise=10.0)
+    return results
+
+
+def example_results(turns: int) -> dict[str, Measurement]:
+    """Measure the example graphs against a local fake Ollama server."""
+    if not EXAMPLES_DIR.is_dir():
+        return {}
+    results = {}
+    with FakeOllamaServer(ScriptedChatModel()) as server:
+        previous = os.environ.get("OLLAMA_HOST")
+        # The examples build `ChatOllama()` at import; point it at the fake server
+        os.environ["OLLAMA_HOST"] = server.base_url
+        try:
+            for name in EXAMPLES:
+                namespace = runpy.run_path(str(EXAMPLES_DIR / name))
+                rate = graph_turns_per_second(namespace["graph"], turns)
+                results[f"examples.{Path(name).stem}.turns_per_sec"] = Measurement(
+                    rate, "turns/s", True
+                )
+        finally:
+            if previous is None:
+                del os.environ["OLLAMA_HOST"]
+            else:
+                os.environ["OLLAMA_HOST"] = previous
+    return results
+
+
+# ------------------------------------------------------------------------------
+#  BASELINE
+# ------------------------------------------------------------------------------
+def load(path: Path) -> dict[str, Measurement]:
+    """Read results written by `save`."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {name: Measurement(**m) for name, m in data["results"].items()}
+
+
+def save(path: Path, results: dict[str, Measurement]) -> None:
+    """Write results with the machine and Python they were measured on."""
+    data = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": {name: asdict(m) for name, m in results.items()},
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def main() -> int:
+    """Run the suite, print the results and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--output", type=Path, help="Also write the results here.")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed fractional slowdown before a result counts as a regression.",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Fewer iterations, for a smoke run."
+    )
+    args = parser.parse_args()
+
+    scale = 0.2 if args.quick else 1.0
+    steps: list[Callable[[], dict[str, Measurement]]] = [
+        lambda: agent_results(int(200 * scale)),
+        lambda: history_results(int(30 * scale), 5000),
+        lambda: session_results(int(200 * scale)),
+        lambda: startup_results(3),
+        lambda: example_results(int(200 * scale)),
+    ]
+    results: dict[str, Measurement] = {}
+    for step in steps:
+        results.update(step())
+
+    if args.output is not None:
+        save(args.output, results)
+    if args.update_baseline:
+        save(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+
+    baseline = load(args.baseline) if args.baseline.exists() else {}
+    regressions = []
+    for name, m in results.items():
+        line = f"{name:<52} {m.value:10.2f} {m.unit:<8}"
+        base = baseline.get(name)
+        if base is not None:
+            change = m.value / base.value - 1 if base.value else 0.0
+            line += f" ({change:+7.1%} vs baseline)"
+            if m.regressed(base, args.tolerance):
+                line += " REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if not baseline:
+        print(f"no baseline at {args.baseline}; record one with --update-baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
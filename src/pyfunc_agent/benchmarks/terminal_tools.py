@@ -0,0 +1,74 @@
+"""ReAct turn latency with and without the terminal `finish_tool` short cut.
+
+Runs `--turns` ReAct turns (`sqrt_tool`, then `finish_tool`) against a fake model
+answering each call after `--latency` seconds. With the registered, terminal
+`finish_tool` the turn ends on the finish call; with an ordinary tool of the same
+name the model is called once more to restate the answer. Prints the median turn
+time and the model calls per turn, and checks that both give the same trace.
+
+Run with `>> python -m pyfunc_agent.benchmarks.terminal_tools`
+
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from langchain_core.tools import StructuredTool
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.simple_agents import ReActMathAgent
+
+PROMPT = "calc_bot.yaml"
+SCRIPT = [
+    [{"name": "sqrt_tool", "args": {"a": 256}}],
+    [{"name": "finish_tool", "args": {"answer": "16.0"}}],
+]
+
+
+def run(agent: ReActMathAgent, turns: int) -> tuple[float, float, list[str]]:
+    """Return the median turn seconds, model calls per turn and the last trace."""
+    seconds = []
+    hops = []
+    steps: list[str] = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        steps, trace = agent.chat("What is the square root of 256?", return_trace=True)
+        seconds.append(time.perf_counter() - start)
+        hops.append(trace.hops)
+    return statistics.median(seconds), statistics.mean(hops), steps
+
+
+def main() -> int:
+    """Run the benchmark and print the median turn time of both variants."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # The model restates the finish argument when it gets another call
+    llm = ScriptedChatModel(tool_calls=SCRIPT, answer="16.0", latency=args.latency)
+    spec = REGISTRY.spec("finish_tool")
+    plain_finish = StructuredTool.from_function(
+        func=spec.func, name=spec.name, description=spec.description
+    )
+    variants = {
+        "terminal finish_tool": ("math", "finish_tool"),
+        "ordinary finish_tool": ("math", plain_finish),
+    }
+
+    traces = {}
+    for name, tools in variants.items():
+        agent = ReActMathAgent(prompt_name=PROMPT, llm=llm, tools=tools)
+        median, hops, traces[name] = run(agent, args.turns)
+        print(f"{name}: {median * 1e3:7.1f} ms/turn median, {hops:.1f} model calls")
+
+    same = len(set(map(tuple, traces.values()))) == 1
+    print(f"same chat() trace: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
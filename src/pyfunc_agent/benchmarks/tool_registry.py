@@ -0,0 +1,74 @@
+"""Tool registration and binding cost.
+
+Registers `--functions` generated functions in a fresh `ToolRegistry` (the cost of
+importing a module full of registered tools), then binds the built-in math tools to
+a `ChatOllama` client `--binds` times: once from the tool objects, which regenerates
+every JSON schema per bind, and once from the registry's cached schemas.
+
+Run with `>> python -m pyfunc_agent.benchmarks.tool_registry`
+
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+
+from langchain_ollama import ChatOllama
+
+from pyfunc_agent.registry import REGISTRY, ToolRegistry
+
+
+def make_function(i: int) -> Callable[[float, float], float]:
+    """Return a distinct two-argument function to register."""
+
+    def func(a: float, b: float) -> float:
+        """Return a weighted sum of a and b."""
+        return a + i * b
+
+    func.__name__ = f"weighted_sum_{i}"
+    return func
+
+
+def main() -> int:
+    """Run the benchmark and print per-function and per-bind times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--functions", type=int, default=500)
+    parser.add_argument("--binds", type=int, default=50)
+    args = parser.parse_args()
+
+    registry = ToolRegistry()
+    functions = [make_function(i) for i in range(args.functions)]
+    start = time.perf_counter()
+    for func in functions:
+        registry.add(func, tags=("generated",))
+    register_us = (time.perf_counter() - start) / args.functions * 1e6
+
+    start = time.perf_counter()
+    registry.select("generated")
+    build_us = (time.perf_counter() - start) / args.functions * 1e6
+
+    llm = ChatOllama(model="fake")
+    tools = REGISTRY.select("math")
+    REGISTRY.schemas(tools)  # warm the schema cache
+
+    start = time.perf_counter()
+    for _ in range(args.binds):
+        llm.bind_tools(tools)
+    uncached_ms = (time.perf_counter() - start) / args.binds * 1e3
+
+    start = time.perf_counter()
+    for _ in range(args.binds):
+        llm.bind_tools(REGISTRY.schemas(tools))
+    cached_ms = (time.perf_counter() - start) / args.binds * 1e3
+
+    print(f"register:            {register_us:8.2f} us/function")
+    print(f"first select/build:  {build_us:8.2f} us/function")
+    print(f"bind {len(tools)} tools:")
+    print(f"  from tool objects: {uncached_ms:8.3f} ms/bind")
+    print(f"  cached schemas:    {cached_ms:8.3f} ms/bind")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
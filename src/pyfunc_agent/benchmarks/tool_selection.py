@@ -0,0 +1,125 @@
+"""Prompt tokens with every tool bound versus per-turn tool selection.
+
+Registers a synthetic catalog of `--catalog` unit-conversion tools next to the
+math tools, then asks the same questions through a `MultiToolMathAgent` bound to
+all of them against a local fake Ollama server: once binding every tool, once with
+a `KeywordToolSelector` and once with an `EmbeddingToolSelector` (offline hashing
+embedder). Prompt tokens are the server's `prompt_eval_count`, which it derives
+from the request size, so they include the tool schemas actually sent.
+
+Run with `>> python -m pyfunc_agent.benchmarks.tool_selection`
+
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from collections.abc import Callable
+
+from langchain_core.messages import AIMessage
+from langchain_ollama import ChatOllama
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.benchmarks.fake_ollama import FakeOllamaServer
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+from pyfunc_agent.tool_selection import (
+    EmbeddingToolSelector,
+    KeywordToolSelector,
+    ToolSelector,
+)
+
+UNITS = [
+    "meters", "feet", "inches", "miles", "kilometers", "yards", "grams", "pounds",
+    "ounces", "liters", "gallons", "celsius", "fahrenheit", "kelvin", "seconds",
+    "hours", "days", "joules", "calories", "watts",
+]
+QUESTIONS = [
+    "What is the square root of 625?",
+    "Add 4.0 and 5.2.",
+    "What is the natural log of 5?",
+    "What is the mean of [1, 2, 3, 4]?",
+    "Compute the dot product of [1, 2] and [3, 4].",
+    "Convert 12 miles to kilometers.",
+]
+
+
+def register_catalog(n: int) -> None:
+    """Register `n` conversion tools tagged `catalog`."""
+    pairs = itertools.islice(itertools.permutations(UNITS, 2), n)
+    for i, (src, dst) in enumerate(pairs):
+
+        def convert(value: float, factor: float = 1.0 + i) -> float:
+            return value * factor
+
+        REGISTRY.add(
+            convert,
+            name=f"{src}_to_{dst}",
+            description=f"Convert a value in {src} to {dst}.",
+            tags=("catalog",),
+        )
+
+
+def prompt_tokens(
+        base_url: str,
+        selector: ToolSelector | None,
+    ) -> tuple[float, float]:
+    """Return mean prompt tokens per model call and seconds per question."""
+    agent = MultiToolMathAgent(
+        prompt_name="calc_bot.yaml",
+        llm=ChatOllama(model="fake", base_url=base_url, temperature=0.0),
+        tools=["math", "catalog"],
+        tool_selector=selector,
+    )
+    start = time.perf_counter()
+    for question in QUESTIONS:
+        agent.chat(question)
+    seconds = (time.perf_counter() - start) / len(QUESTIONS)
+    usage = [
+        m.usage_metadata["input_tokens"]
+        for m in agent.messages
+        if isinstance(m, AIMessage) and m.usage_metadata
+    ]
+    return sum(usage) / len(usage), seconds
+
+
+def main() -> int:
+    """Run the benchmark and print prompt tokens per call."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--catalog", type=int, default=200)
+    parser.add_argument("-k", type=int, default=4)
+    args = parser.parse_args()
+
+    register_catalog(args.catalog)
+    selectors: dict[str, Callable[[], ToolSelector | None]] = {
+        "all tools": lambda: None,
+        "keyword top-k": lambda: KeywordToolSelector(k=args.k),
+        "embedding top-k": lambda: EmbeddingToolSelector(k=args.k),
+    }
+
+    results = {}
+    with FakeOllamaServer(ScriptedChatModel()) as server:
+        for name, make in selectors.items():
+            selector = make()
+            tokens, seconds = prompt_tokens(server.base_url, selector)
+            results[name] = (tokens, seconds, selector)
+
+    baseline = results["all tools"][0]
+    for name, (tokens, seconds, selector) in results.items():
+        print(
+            f"{name:>16}: {tokens:9.0f} prompt tokens/call "
+            f"({1 - tokens / baseline:6.1%} saved) {seconds * 1e3:7.1f} ms/question"
+        )
+        if selector is not None:
+            stats = selector.stats
+            print(
+                f"{'':>16}  {stats.tools_bound / stats.calls:.1f} tools bound/call, "
+                f"{stats.fallbacks} fallbacks, "
+                f"{stats.prompt_tokens_saved} schema tokens saved"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
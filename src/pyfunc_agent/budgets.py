@@ -0,0 +1,167 @@
+"""Per-turn budgets for the agent/tools loop.
+
+The agent graph loops `agent -> tools -> agent` for as long as the model asks for
+tools. A `TurnBudget` bounds one turn of that loop:
+
+- `max_hops`: tool-calling model responses per turn;
+- `max_seconds`: wall time of the turn;
+- `max_tokens`: prompt plus completion tokens over the turn's model calls (answers
+  served by an `LLMResponseCache` cost none);
+- `max_repeats`: model responses that only repeat tool calls already made in the
+  turn. The first repeats of a pure or memoized tool (see `pyfunc_agent.registry`)
+  are answered from the earlier results without running the tool again; once there
+  are more, the model is looping and the turn stops.
+
+The checks run in the tools node, before another hop is spent. Instead of running
+on until LangGraph's recursion limit raises, a turn over budget has its pending tool
+calls answered with a "not run" ToolMessage and ends with an AIMessage saying which
+budget ran out, so the history stays valid for the next turn.
+
+Everything is computed from the messages of the current turn (everything after the
+latest `HumanMessage`) plus the turn's start time in the run config, so a budget
+holds no state and one instance can serve any number of sessions.
+
+Agents run under `DEFAULT_TURN_BUDGET` unless given another budget, so a turn is
+cut off after 8 tool hops by default; `TurnBudget(max_hops=None, max_repeats=None,
+reuse_results=False)` lifts every limit.
+
+"""
+
+import json
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolCall,
+    ToolMessage,
+)
+
+from pyfunc_agent.llm_cache import is_cache_hit
+
+STOP_TEMPLATE = "I stopped before finishing: {reason}."
+NOT_RUN_TEMPLATE = "Not run: {reason}."
+REASONS = {
+    "max_hops": "the turn took more than {max_hops} tool hops",
+    "max_repeats": "the same tool calls kept being repeated",
+    "max_tokens": "the turn used its {max_tokens} tokens",
+    "max_seconds": "the turn ran for its {max_seconds:g} seconds",
+}
+
+
+@dataclass(frozen=True)
+class TurnBudget:
+    """Limits on one turn of the agent/tools loop; None means unlimited."""
+
+    max_hops: int | None = 8
+    max_seconds: float | None = None
+    max_tokens: int | None = None
+    max_repeats: int | None = 2
+    reuse_results: bool = True
+    """Answer a repeated pure or memoized tool call from the turn's earlier result."""
+
+    @property
+    def recursion_limit(self) -> int | None:
+        """A LangGraph recursion limit the hop budget always stops short of."""
+        if self.max_hops is None:
+            return None
+        # agent and tools steps per hop, the last agent step and the stop step
+        return 2 * self.max_hops + 4
+
+    def exceeded(self, turn: Sequence[BaseMessage], started: float | None) -> str | None:
+        """Return the budget `turn` has run out of (e.g. "max_hops"), if any.
+
+        `started` is the turn's `time.monotonic()` start, if known.
+        """
+        hops = 0
+        tokens = 0
+        repeats = 0
+        seen: set[tuple[str, str]] = set()
+        for msg in turn:
+            if not isinstance(msg, AIMessage):
+                continue
+            usage = msg.usage_metadata
+            if usage and not is_cache_hit(msg):
+                tokens += usage.get("total_tokens", 0)
+            if msg.tool_calls:
+                hops += 1
+                keys = {call_key(call) for call in msg.tool_calls}
+                if keys <= seen:
+                    repeats += 1
+                seen |= keys
+
+        if self.max_hops is not None and hops > self.max_hops:
+            return "max_hops"
+        if self.max_repeats is not None and repeats > self.max_repeats:
+            return "max_repeats"
+        if self.max_tokens is not None and tokens >= self.max_tokens:
+            return "max_tokens"
+        if (
+            self.max_seconds is not None
+            and started is not None
+            and time.monotonic() - started >= self.max_seconds
+        ):
+            return "max_seconds"
+        return None
+
+    def reason(self, budget: str) -> str:
+        """Describe running out of `budget` for the user."""
+        return REASONS[budget].format(**asdict(self))
+
+
+DEFAULT_TURN_BUDGET = TurnBudget()
+
+
+def current_turn(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """Return the messages after the latest HumanMessage."""
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], HumanMessage):
+            return messages[i + 1:]
+    return messages
+
+
+def call_key(call: ToolCall) -> tuple[str, str]:
+    """Return a key identifying a tool call by its name and arguments."""
+    return call["name"], json.dumps(call["args"], sort_keys=True, default=str)
+
+
+def earlier_results(turn: Sequence[BaseMessage]) -> dict[tuple[str, str], ToolMessage]:
+    """Return the successful results of the tool calls made before the last hop."""
+    calls: dict[str, tuple[str, str]] = {}
+    results: dict[tuple[str, str], ToolMessage] = {}
+    for msg in turn[:-1]:
+        if isinstance(msg, AIMessage):
+            for call in msg.tool_calls:
+                calls[call["id"]] = call_key(call)
+        elif isinstance(msg, ToolMessage) and msg.status == "success":
+            key = calls.get(msg.tool_call_id)
+            if key is not None:
+                results.setdefault(key, msg)
+    return results
+
+
+def reused_result(call: ToolCall, earlier: ToolMessage) -> ToolMessage:
+    """Answer `call` with the content of an identical earlier call."""
+    return ToolMessage(
+        content=earlier.content,
+        name=call["name"],
+        tool_call_id=call["id"],
+        artifact=earlier.artifact,
+    )
+
+
+def stop_turn(request: AIMessage, reason: str) -> list[BaseMessage]:
+    """Return the messages ending a turn cut off by its budget."""
+    not_run = [
+        ToolMessage(
+            content=NOT_RUN_TEMPLATE.format(reason=reason),
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+        for call in request.tool_calls
+    ]
+    return [*not_run, AIMessage(content=STOP_TEMPLATE.format(reason=reason))]
@@ -0,0 +1,285 @@
+"""Result caches for agents.
+
+Key/value stores with LRU and TTL eviction, and a `memoize` decorator that pure
+tool functions can opt into. Memoized functions are keyed on canonicalized
+arguments that keep their types, so `2`, `2.0` and `"2"` are separate entries, and
+keep per-function hit/miss counters that `cache_stats()` reports. Cached lists and
+dicts are copied in and out, so a caller mutating a result cannot change the entry.
+
+`MemoryStore` lives in the process; `SQLiteStore` keeps entries in a file so they
+survive restarts and can be shared between worker processes.
+
+"""
+
+import copy
+import functools
+import inspect
+import json
+import math
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MISSING = object()
+
+
+# ------------------------------------------------------------------------------
+#  STORES
+# ------------------------------------------------------------------------------
+class MemoryStore:
+    """In-process store with LRU eviction, a size cap and an optional TTL."""
+
+    def __init__(self, max_size: int | None = 1024, ttl: float | None = None) -> None:
+        """Set the entry cap (None for unbounded) and time-to-live in seconds."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        """Return the value for `key`, or `MISSING`."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Store `value`, evicting the least recently used entries over the cap."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Drop `key` if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries (expired ones included)."""
+        return len(self._data)
+
+
+class SQLiteStore:
+    """On-disk store in a SQLite file, with LRU eviction and an optional TTL.
+
+    Values are pickled, so only use files you trust.
+    """
+
+    def __init__(
+            self,
+            path: str | Path,
+            max_size: int | None = None,
+            ttl: float | None = None,
+            table: str = "cache",
+        ) -> None:
+        """Open (or create) the cache table in the SQLite file at `path`."""
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB, stored_at REAL, used_at REAL)"
+            )
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        """Return the value for `key`, or `MISSING`."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return MISSING
+            self._conn.execute(
+                f"UPDATE {self.table} SET used_at = ? WHERE key = ?", (now, key)
+            )
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:  # noqa: ANN401
+        """Store `value`, evicting the least recently used entries over the cap."""
+        now = time.time()
+        blob = pickle.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?)",
+                (key, blob, now, now),
+            )
+            if self.max_size is not None:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY used_at DESC "
+                    "LIMIT -1 OFFSET ?)",
+                    (self.max_size,),
+                )
+
+    def delete(self, key: str) -> None:
+        """Drop `key` if present."""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        """Return the number of stored entries (expired ones included)."""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+# ------------------------------------------------------------------------------
+#  MEMOIZATION
+# ------------------------------------------------------------------------------
+@dataclass
+class CacheStats:
+    """Hit/miss counters for one cached function."""
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+_STATS: dict[str, CacheStats] = {}
+_CACHES: dict[str, "MemoryStore | SQLiteStore"] = {}
+
+
+def register_stats(name: str) -> CacheStats:
+    """Return the counters reported under `name` by `cache_stats()`."""
+    return _STATS.setdefault(name, CacheStats())
+
+
+def canonicalize(value: Any) -> Any:  # noqa: ANN401
+    """Return a JSON-able canonical form of an argument value.
+
+    The form keeps the value's type: ints stay exact ints and floats floats, so `2`,
+    `2.0` and `"2"` differ; strings, non-finite floats and mappings are tagged with
+    their type. Sequences (including NumPy arrays) become lists and mappings sorted
+    lists of pairs. Raises TypeError for values with no canonical form.
+    """
+    if isinstance(value, (bool, int)) or value is None:
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return ["float", repr(value)]
+        return value
+    if isinstance(value, str):
+        return ["str", value]
+    if hasattr(value, "tolist"):
+        # NumPy scalars and arrays
+        return canonicalize(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, dict):
+        return ["dict", sorted((str(k), canonicalize(v)) for k, v in value.items())]
+    raise TypeError(f"Cannot canonicalize {type(value).__name__} for caching.")
+
+
+def _copied(value: Any) -> Any:  # noqa: ANN401
+    """Return a copy of a mutable container result, other values as they are."""
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
+
+
+def memoize(
+        store: MemoryStore | SQLiteStore | None = None,
+        *,
+        name: str | None = None,
+        max_size: int | None = 1024,
+        ttl: float | None = None,
+    ) -> Callable[[F], F]:
+    """Decorator caching a pure function's results on canonicalized arguments.
+
+    Without a `store`, each function gets its own `MemoryStore(max_size, ttl)`.
+    Several functions may share one store (e.g. one `SQLiteStore` file); keys are
+    prefixed with the function name. Calls whose arguments cannot be canonicalized
+    run uncached.
+
+    The wrapper exposes `.cache` (the store) and `.stats` (a `CacheStats`).
+    """
+
+    def decorator(func: F) -> F:
+        key_name = name or f"{func.__module__}.{func.__qualname__}"
+        cache = store if store is not None else MemoryStore(max_size, ttl)
+        stats = register_stats(key_name)
+        _CACHES[key_name] = cache
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                key = json.dumps(
+                    [key_name, canonicalize(bound.arguments)], separators=(",", ":")
+                )
+            except TypeError:
+                stats.misses += 1
+                return func(*args, **kwargs)
+
+            value = cache.get(key)
+            if value is not MISSING:
+                stats.hits += 1
+                return _copied(value)
+
+            stats.misses += 1
+            value = func(*args, **kwargs)
+            cache.set(key, _copied(value))
+            return value
+
+        wrapper.cache = cache
+        wrapper.stats = stats
+        return wrapper
+
+    return decorator
+
+
+def cache_stats() -> dict[str, dict[str, float]]:
+    """Return hits, misses and hit rate for every memoized function."""
+    return {
+        name: {**asdict(stats), "hit_rate": stats.hit_rate}
+        for name, stats in _STATS.items()
+    }
+
+
+def clear_caches() -> None:
+    """Empty every memoized function's store and reset the counters."""
+    for name, cache in _CACHES.items():
+        cache.clear()
+        _STATS[name].hits = 0
+        _STATS[name].misses = 0
@@ -0,0 +1,312 @@
+"""Context policies for agents.
+
+A context policy decides which part of the conversation history is sent to the LLM
+on each hop. The full history stays in the graph state and on the agent; only the
+model's view is bounded.
+
+Policies only ever cut at turn boundaries (a turn starts at a `HumanMessage`), so the
+system prompt, the current turn and every tool-call/ToolMessage pair inside a kept
+turn are always sent together. Policies are incremental: each call only looks at the
+messages appended since the previous call, so per-hop cost does not grow with the
+length of the session. A policy instance tracks one conversation, so give each agent
+its own. The async agent node calls a policy through `acall`, so a policy that calls
+a model (like `SummaryPolicy`) does not block the event loop.
+
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+class ContextPolicy(ABC):
+    """Base class for context policies.
+
+    Subclasses implement `_trim` (and optionally `_add`, and `_atrim` if trimming
+    does I/O) in terms of `_evict_oldest_turn`, which drops the oldest kept turn from
+    the model's view.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty window."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget everything seen so far, e.g. when the history is replaced."""
+        # Number of history messages already accounted for
+        self._seen = 0
+        # History indices of the HumanMessages that start each kept turn
+        self._turns: deque[int] = deque()
+        # History index of the first kept message after the system prompt
+        self._start = 0
+
+    def __call__(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the messages to send to the model for this hop."""
+        self._update(messages)
+        self._trim(messages)
+        return self._view(messages)
+
+    async def acall(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Async version of calling the policy."""
+        self._update(messages)
+        await self._atrim(messages)
+        return self._view(messages)
+
+    def _update(self, messages: list[BaseMessage]) -> None:
+        """Account for the messages appended since the previous call."""
+        if len(messages) < self._seen:
+            self.reset()
+
+        for i in range(self._seen, len(messages)):
+            msg = messages[i]
+            if isinstance(msg, HumanMessage):
+                self._turns.append(i)
+            self._add(msg)
+        self._seen = len(messages)
+
+    def _add(self, msg: BaseMessage) -> None:
+        """Account for a newly appended message."""
+
+    @abstractmethod
+    def _trim(self, messages: list[BaseMessage]) -> None:
+        """Evict old turns until the window is within the policy's limit."""
+
+    async def _atrim(self, messages: list[BaseMessage]) -> None:
+        """Async version of `_trim`."""
+        self._trim(messages)
+
+    def _evict_oldest_turn(self) -> None:
+        """Drop the oldest kept turn. The current turn is never evicted."""
+        self._turns.popleft()
+        self._start = self._turns[0]
+
+    def _head(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the leading system prompt, which is always kept."""
+        if messages and isinstance(messages[0], SystemMessage):
+            return [messages[0]]
+        return []
+
+    def _view(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the system prompt followed by the kept turns."""
+        if self._start == 0:
+            return messages
+        return self._head(messages) + messages[self._start:]
+
+
+class LastTurnsPolicy(ContextPolicy):
+    """Keep the system prompt and the last `max_turns` turns."""
+
+    def __init__(self, max_turns: int = 10) -> None:
+        """Set the number of turns to keep."""
+        if max_turns < 1:
+            raise ValueError("max_turns must be at least 1.")
+        self.max_turns = max_turns
+        super().__init__()
+
+    def _trim(self, messages: list[BaseMessage]) -> None:
+        """Evict turns beyond the newest `max_turns`."""
+        while len(self._turns) > self.max_turns:
+            self._evict_oldest_turn()
+
+
+class TokenBudgetPolicy(ContextPolicy):
+    """Keep as many recent turns as fit in `max_tokens`.
+
+    A running token count is kept per turn, so each message is counted exactly once.
+    The system prompt and the current turn are always sent, even if they alone exceed
+    the budget.
+    """
+
+    def __init__(
+            self,
+            max_tokens: int = 4096,
+            token_counter: Callable[[BaseMessage], int] | None = None,
+        ) -> None:
+        """Set the token budget and the per-message token counter.
+
+        The default counter is LangChain's `count_tokens_approximately`, which needs
+        no tokenizer.
+        """
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or (
+            lambda msg: count_tokens_approximately([msg])
+        )
+        super().__init__()
+
+    def reset(self) -> None:
+        """Forget everything seen so far, including the running token counts."""
+        super().reset()
+        self._fixed_tokens = 0
+        self._turn_tokens: deque[int] = deque()
+        self.tokens = 0
+
+    def _add(self, msg: BaseMessage) -> None:
+        """Add the message's tokens to its turn."""
+        n = self.token_counter(msg)
+        if isinstance(msg, HumanMessage):
+            self._turn_tokens.append(0)
+        if self._turn_tokens:
+            self._turn_tokens[-1] += n
+        else:
+            self._fixed_tokens += n
+        self.tokens += n
+
+    def _trim(self, messages: list[BaseMessage]) -> None:
+        """Evict the oldest turns while over budget."""
+        while len(self._turns) > 1 and self.tokens > self.max_tokens:
+            self._evict_oldest_turn()
+            self.tokens -= self._turn_tokens.popleft()
+
+
+class SummaryPolicy(ContextPolicy):
+    """Keep recent turns verbatim and fold older turns into a running summary.
+
+    Once more than `max_turns` turns are in the window, the oldest turns are folded
+    into the summary until `keep_turns` remain. Each fold is one call to `llm` that
+    sees only the previous summary and the evicted turns, never the whole history.
+    If that call fails, no turn is evicted and the fold is tried again next hop.
+    """
+
+    def __init__(
+            self,
+            llm: "BaseChatModel",
+            max_turns: int = 20,
+            keep_turns: int = 10,
+        ) -> None:
+        """Set the summarizing model and the window size.
+
+        `llm` should be a plain chat model without tools bound.
+        """
+        if not 1 <= keep_turns <= max_turns:
+            raise ValueError("Need 1 <= keep_turns <= max_turns.")
+        self.llm = llm
+        self.max_turns = max_turns
+        self.keep_turns = keep_turns
+        super().__init__()
+
+    def reset(self) -> None:
+        """Forget everything seen so far, including the summary."""
+        super().reset()
+        self.summary = ""
+        self._summary_message: SystemMessage | None = None
+
+    def _trim(self, messages: list[BaseMessage]) -> None:
+        """Summarize the oldest turns once the window is full."""
+        evicted = self._evictable(messages)
+        if evicted:
+            response = self.llm.invoke(self._summary_request(evicted))
+            self._evict()
+            self._set_summary(str(response.content))
+
+    async def _atrim(self, messages: list[BaseMessage]) -> None:
+        """Async version of `_trim`: awaits the summarizing model."""
+        evicted = self._evictable(messages)
+        if evicted:
+            response = await self.llm.ainvoke(self._summary_request(evicted))
+            self._evict()
+            self._set_summary(str(response.content))
+
+    def _evictable(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the turns to fold into the summary once the window is full.
+
+        Nothing is evicted yet: if the summarizer fails, the turns stay in the view.
+        """
+        if len(self._turns) <= self.max_turns:
+            return []
+        end = self._turns[len(self._turns) - self.keep_turns]
+        return messages[self._turns[0]:end]
+
+    def _evict(self) -> None:
+        """Evict the oldest turns until `keep_turns` remain."""
+        while len(self._turns) > self.keep_turns:
+            self._evict_oldest_turn()
+
+    def _set_summary(self, summary: str) -> None:
+        """Adopt `summary` as the running summary."""
+        self.summary = summary
+        self._summary_message = SystemMessage(
+            content=f"Summary of the earlier conversation:\n{self.summary}"
+        )
+
+    def _summary_request(self, evicted: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the request extending the running summary with `evicted`."""
+        lines = []
+        for msg in evicted:
+            if isinstance(msg, AIMessage) and msg.tool_calls:
+                calls = ", ".join(
+                    f"{call['name']}({call['args']})" for call in msg.tool_calls
+                )
+                lines.append(f"AI tool calls: {calls}")
+            else:
+                lines.append(f"{type(msg).__name__}: {msg.content}")
+
+        return [
+            SystemMessage(
+                content=(
+                    "Summarize the conversation below in a few sentences. Keep every "
+                    "number, result and open question. Fold in the previous summary "
+                    "if there is one."
+                )
+            ),
+            HumanMessage(
+                content=(
+                    f"Previous summary:\n{self.summary or '(none)'}\n\n"
+                    "Conversation:\n" + "\n".join(lines)
+                )
+            ),
+        ]
+
+    def _view(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+        """Return the system prompt, the summary and the kept turns."""
+        if self._summary_message is None:
+            return super()._view(messages)
+        return self._head(messages) + [self._summary_message] + messages[self._start:]
+
+
+class PromptSize:
+    """Running token estimate of the messages a session sends to the model.
+
+    Like the policies, it only counts the messages appended since the previous
+    call; a view that no longer extends the previous one (e.g. after a policy
+    evicted a turn) is counted again from the start. The runtime compares the
+    estimate with the tokens the model server reports evaluating to estimate how
+    much of the prompt it served from its cache (see `pyfunc_agent.metrics`); the
+    chars/4 estimate's error carries over into that figure.
+    """
+
+    def __init__(self) -> None:
+        """Start with nothing counted."""
+        self.tokens = 0
+        self._count = 0
+        self._last: BaseMessage | None = None
+
+    def __call__(self, messages: list[BaseMessage]) -> int:
+        """Return the estimated tokens of `messages`."""
+        if self._count and (
+            len(messages) < self._count or not self._same(messages[self._count - 1])
+        ):
+            self.tokens = 0
+            self._count = 0
+        if len(messages) > self._count:
+            self.tokens += count_tokens_approximately(messages[self._count:])
+            self._count = len(messages)
+            self._last = messages[-1]
+        return self.tokens
+
+    def _same(self, msg: BaseMessage) -> bool:
+        """Whether `msg` is the last message counted, or a copy of it."""
+        last = self._last
+        # A checkpointer hands back copies, with the IDs the graph gave them
+        return msg is last or (msg.id is not None and msg.id == last.id)
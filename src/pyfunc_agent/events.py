@@ -0,0 +1,179 @@
+"""Structured events for tool calls and LLM calls.
+
+Agents report what they do as events on the standard `logging` logger
+`pyfunc_agent.events`: one record per tool call (`tool_call`) and per model call
+(`llm_call`), with the session ID, the tool or model, the arguments, the duration and
+the size of the result. The package only attaches a `NullHandler`, so until an
+application turns events on they cost one cached level check per call.
+
+`configure_logging` turns them on as JSON lines:
+
+    listener = configure_logging(path="events.jsonl")
+    ...
+    listener.stop()  # flush on shutdown
+
+The calling thread only puts the record on a queue. Serializing it to JSON and
+writing it happen in a background thread, so tool calls never wait on stdout or
+the disk, and lines from concurrent sessions never interleave.
+
+Values that are costly to compute (serialized arguments, result sizes) can be
+passed as `Lazy(func, *args)` and are only computed in the background thread.
+
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any
+
+LOGGER_NAME = "pyfunc_agent.events"
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+
+# Lists longer than this are logged as "<n values>"
+MAX_LIST_LENGTH = 8
+
+
+class Lazy:
+    """A field value computed only when the event is written."""
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:  # noqa: ANN401
+        """Call `func(*args)` when the event is formatted."""
+        self.func = func
+        self.args = args
+
+    def __call__(self) -> Any:  # noqa: ANN401
+        """Return the value."""
+        return self.func(*self.args)
+
+
+# ------------------------------------------------------------------------------
+#  EMITTING
+# ------------------------------------------------------------------------------
+def enabled(level: int = logging.INFO) -> bool:
+    """Return whether events at `level` are written anywhere.
+
+    Check this before measuring or building anything only an event needs.
+    """
+    return logger.isEnabledFor(level)
+
+
+def log_event(
+        event: str,
+        level: int = logging.INFO,
+        **fields: Any,  # noqa: ANN401
+    ) -> None:
+    """Emit `event` with `fields`; does nothing if `level` is disabled."""
+    if logger.isEnabledFor(level):
+        # Events carry their own context, so skip `logger.log`'s stack walk
+        record = logger.makeRecord(
+            LOGGER_NAME, level, "", 0, event, None, None, extra={"fields": fields}
+        )
+        logger.handle(record)
+
+
+def current_session_id() -> str | None:
+    """Return the thread ID of the graph run this call belongs to, if any."""
+    from langchain_core.runnables.config import var_child_runnable_config
+
+    config = var_child_runnable_config.get() or {}
+    return config.get("configurable", {}).get("thread_id")
+
+
+def abbreviate(values: dict[str, Any]) -> dict[str, Any]:
+    """Return `values` with long lists replaced by their length."""
+    return {
+        key: f"<{len(value)} values>"
+        if isinstance(value, (list, tuple)) and len(value) > MAX_LIST_LENGTH
+        else value
+        for key, value in values.items()
+    }
+
+
+def json_size(value: Any) -> int:  # noqa: ANN401
+    """Return the size in bytes of `value` serialized as JSON."""
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(json.dumps(value, default=str).encode())
+
+
+# ------------------------------------------------------------------------------
+#  OUTPUT
+# ------------------------------------------------------------------------------
+class JSONLinesFormatter(logging.Formatter):
+    """Format event records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Return the record as a JSON line, computing any `Lazy` fields."""
+        line = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        for key, value in getattr(record, "fields", {}).items():
+            line[key] = value() if isinstance(value, Lazy) else value
+        return json.dumps(line, default=str)
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """Queue listener whose `stop` may be called more than once."""
+
+    def stop(self) -> None:
+        """Flush the queue and stop the thread, if it is running."""
+        if self._thread is not None:
+            super().stop()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+        stream: IO[str] | None = None,
+        path: str | Path | None = None,
+        level: int | str = logging.INFO,
+    ) -> logging.handlers.QueueListener:
+    """Write events at `level` and above as JSON lines; returns the listener.
+
+    Events go to `path` if given, otherwise to `stream` (stderr by default).
+    Replaces any previous configuration. Call `stop()` on the listener (or
+    `disable_logging()`) to flush the queue before exiting.
+    """
+    disable_logging()
+    if path is not None:
+        target: logging.Handler = logging.FileHandler(path, encoding="utf-8")
+    else:
+        target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JSONLinesFormatter())
+
+    events: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(events)
+    listener = _QueueListener(events, target)
+    handler.listener = listener
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    # Events are structured output of their own; keep them out of root's format
+    logger.propagate = False
+    listener.start()
+    return listener
+
+
+def disable_logging() -> None:
+    """Stop writing events, flushing any that are queued."""
+    for handler in list(logger.handlers):
+        if isinstance(handler, _QueueHandler):
+            logger.removeHandler(handler)
+            handler.listener.stop()
+            for target in handler.listener.handlers:
+                target.close()
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
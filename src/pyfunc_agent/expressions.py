@@ -0,0 +1,232 @@
+"""Safe arithmetic expression evaluation for agents.
+
+Lets the model submit a whole computation, e.g. `sqrt(625) + ln(5)`, as one tool
+call instead of one tool call (and one LLM round trip) per operation. Expressions
+are parsed into a Python AST and checked against a whitelist: number and list
+literals, the arithmetic operators, the constants `pi` and `e`, and calls to the
+functions registered in `FUNCTIONS`, which are the (memoized) functions in
+`pyfunc_agent.tools`. Anything else (attributes, names, keywords, comprehensions,
+...) is rejected before the expression is compiled. Compiled expressions are cached.
+
+Lists evaluate as NumPy arrays, so operators work element-wise:
+`sum(sqrt([1, 4, 9]) * 2)`.
+
+`evaluate_expression` is registered as the agents' `evaluate_tool`.
+
+"""
+
+import ast
+import functools
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from types import CodeType
+from typing import Any
+
+import numpy as np
+
+from pyfunc_agent.registry import register
+from pyfunc_agent.tools import (
+    Numbers,
+    add_arrays,
+    dot_product,
+    exponential_array,
+    ln_array,
+    mean_numbers,
+    multiply_arrays,
+    norm,
+    square_root_array,
+    sum_numbers,
+)
+
+FUNCTIONS: dict[str, Callable[..., Numbers]] = {
+    "add": add_arrays,
+    "multiply": multiply_arrays,
+    "sqrt": square_root_array,
+    "exp": exponential_array,
+    "ln": ln_array,
+    "log": ln_array,
+    "sum": sum_numbers,
+    "mean": mean_numbers,
+    "dot": dot_product,
+    "norm": norm,
+}
+CONSTANTS = {"pi": float(np.pi), "e": float(np.e)}
+
+_OPERATORS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+_ARRAY = "__array__"
+MAX_LENGTH = 2000
+# Compiled expressions kept, keyed on the exact source text
+MAX_COMPILED = 1024
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions that are invalid or use anything not whitelisted."""
+
+
+@dataclass
+class ExpressionStats:
+    """Counters for the evaluate tool."""
+    evaluations: int = 0
+    operations: int = 0
+    hops_saved: int = 0
+
+
+STATS = ExpressionStats()
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """A validated, compiled expression."""
+
+    source: str
+    code: CodeType
+    operations: int
+    """Function calls and arithmetic operators: the tool calls it replaces."""
+
+    @property
+    def hops_saved(self) -> int:
+        """LLM round trips saved by evaluating in one call instead of one per op."""
+        return max(self.operations - 1, 0)
+
+
+class _Validator(ast.NodeTransformer):
+    """Reject non-whitelisted nodes; turn list literals into arrays, ints to floats."""
+
+    def __init__(self) -> None:
+        self.operations = 0
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        allowed = (
+            ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+            ast.Constant, ast.List, ast.Tuple, *_OPERATORS,
+        )
+        if not isinstance(node, allowed):
+            raise ExpressionError(f"{type(node).__name__} is not allowed.")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Only numbers are allowed, not {node.value!r}.")
+        # Floats only, so `**` cannot build enormous integers
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id not in CONSTANTS:
+            raise ExpressionError(f"Unknown name {node.id!r}.")
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.operations += 1
+        return self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            names = ", ".join(FUNCTIONS)
+            raise ExpressionError(f"Only these functions may be called: {names}.")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not allowed.")
+        self.operations += 1
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_List(self, node: ast.List | ast.Tuple) -> ast.AST:
+        elts = [self.visit(elt) for elt in node.elts]
+        call = ast.Call(
+            func=ast.Name(_ARRAY, ast.Load()),
+            args=[ast.List(elts, ast.Load())],
+            keywords=[],
+        )
+        return ast.copy_location(call, node)
+
+    visit_Tuple = visit_List
+
+
+@functools.lru_cache(maxsize=MAX_COMPILED)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse, validate and compile `source`; results are cached by exact source text."""
+    if len(source) > MAX_LENGTH:
+        raise ExpressionError(f"Expression longer than {MAX_LENGTH} characters.")
+    validator = _Validator()
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+        tree = ast.fix_missing_locations(validator.visit(tree))
+        code = compile(tree, "<expression>", "eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}.") from None
+    except (RecursionError, MemoryError):
+        # Parsing, validating and compiling all recurse on the nesting depth
+        raise ExpressionError("Expression is nested too deeply.") from None
+    return CompiledExpression(
+        source=source, code=code, operations=validator.operations
+    )
+
+
+def _to_array(value: Numbers) -> Any:  # noqa: ANN401
+    """Return lists as float arrays so operators work element-wise."""
+    return np.asarray(value, dtype=float) if isinstance(value, list) else value
+
+
+def _array_function(func: Callable[..., Numbers]) -> Callable[..., Any]:
+    """Wrap a tool function to return arrays instead of lists."""
+    return lambda *args: _to_array(func(*args))
+
+
+_NAMESPACE = {
+    "__builtins__": {},
+    _ARRAY: lambda values: np.asarray(values, dtype=float),
+    **CONSTANTS,
+    **{name: _array_function(func) for name, func in FUNCTIONS.items()},
+}
+
+
+def evaluate(source: str) -> Numbers:
+    """Evaluate an arithmetic expression; returns a float or a list of floats.
+
+    Raises `ExpressionError` for invalid expressions and for arithmetic errors such
+    as division by zero.
+    """
+    return _evaluate(compile_expression(source))
+
+
+def _evaluate(compiled: CompiledExpression) -> Numbers:
+    """Evaluate an already compiled expression (see `evaluate`)."""
+    try:
+        with np.errstate(all="ignore"):
+            # Safe: the AST only holds whitelisted nodes and names
+            value = eval(compiled.code, dict(_NAMESPACE))
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise ExpressionError(f"{type(e).__name__}: {e}") from None
+    except (RecursionError, MemoryError):
+        raise ExpressionError("Expression is nested too deeply.") from None
+
+    STATS.evaluations += 1
+    STATS.operations += compiled.operations
+    STATS.hops_saved += compiled.hops_saved
+    if np.ndim(value) == 0:
+        return float(value)
+    return np.asarray(value, dtype=float).tolist()
+
+
+@register(
+    "evaluate_tool",
+    tags=("expression", "math"),
+    handle_errors=(ExpressionError,),
+    pure=True,
+)
+def evaluate_expression(expression: str) -> dict[str, Numbers | int]:
+    """Evaluate a whole arithmetic expression in one call.
+
+    Use numbers, lists, + - * / // % **, pi, e and the functions add, multiply,
+    sqrt, exp, ln, sum, mean, dot and norm, e.g. "sqrt(625) + ln(5)". Returns the
+    result and how many separate tool calls it replaced.
+    """
+    compiled = compile_expression(expression)
+    return {"result": _evaluate(compiled), "hops_saved": compiled.hops_saved}
+
+
+def expression_stats() -> dict[str, int]:
+    """Return evaluation, operation and hops-saved totals for this process."""
+    return asdict(STATS)
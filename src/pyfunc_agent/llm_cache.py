@@ -0,0 +1,204 @@
+"""LLM response cache for agents.
+
+Wraps an agent's bound chat model so that a request the model has already answered
+is served from a store instead of another model round trip. The key is a hash of the
+normalized message list, the model's name and sampling options, and the bound tool
+schemas. Normalization drops volatile fields (message and tool-call IDs, response
+metadata), so an identical question in a fresh session hits the cache. Since the
+system prompt and the tool schemas are part of the key, editing the prompt file or
+changing the tool set simply stops old answers from matching; they age out of the
+store. `invalidate()` drops every cached response explicitly.
+
+Cached responses are marked with `response_metadata["cache_hit"]`. Their token
+counts are the original call's, so metrics and turn budgets skip them.
+
+Only deterministic models (temperature 0) are cached by default. Stores come from
+`pyfunc_agent.caching`: `MemoryStore` for an in-process LRU, `SQLiteStore` to share
+answers across restarts and processes.
+
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from pyfunc_agent.caching import MISSING, MemoryStore, SQLiteStore, register_stats
+from pyfunc_agent.metrics import CACHE_HIT
+
+# Model attributes that change what the model answers
+MODEL_PARAMS = ("model", "temperature", "top_k", "top_p", "seed", "num_ctx", "format")
+
+
+def _stable_json(value: Any) -> str:  # noqa: ANN401
+    """Serialize `value` with sorted keys and no whitespace."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _digest(text: str) -> str:
+    """Return a short hex digest of `text`."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_message(msg: BaseMessage) -> dict[str, Any]:
+    """Return the parts of a message that matter to the model."""
+    normalized: dict[str, Any] = {"type": msg.type, "content": msg.content}
+    if isinstance(msg, AIMessage) and msg.tool_calls:
+        normalized["tool_calls"] = [
+            {"name": call["name"], "args": call["args"]} for call in msg.tool_calls
+        ]
+    if msg.name:
+        normalized["name"] = msg.name
+    return normalized
+
+
+class LLMResponseCache:
+    """Store of model responses shared by any number of agents.
+
+    Use `wrap(llm)` to put the cache in front of a bound chat model. Hits and misses
+    are counted in `stats` and reported by `pyfunc_agent.caching.cache_stats()`.
+    """
+
+    def __init__(
+            self,
+            store: MemoryStore | SQLiteStore | None = None,
+            name: str = "llm",
+            only_deterministic: bool = True,
+        ) -> None:
+        """Set the backing store (in-memory LRU by default)."""
+        self.store = store if store is not None else MemoryStore(max_size=4096)
+        self.name = name
+        self.only_deterministic = only_deterministic
+        self.stats = register_stats(f"llm_cache.{name}")
+
+        # Digests of messages already seen, by message ID, so long histories are
+        # not re-serialized on every hop.
+        self._digests: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wrap(self, llm: Runnable) -> "CachedChatModel":
+        """Return `llm` with this cache in front of it."""
+        return CachedChatModel(llm=llm, cache=self)
+
+    def invalidate(self) -> None:
+        """Drop every cached response."""
+        self.store.clear()
+        with self._lock:
+            self._digests.clear()
+
+    def _message_digest(self, msg: BaseMessage) -> str:
+        """Return the digest of a normalized message, memoized by message ID."""
+        if msg.id is None:
+            return _digest(_stable_json(normalize_message(msg)))
+        with self._lock:
+            digest = self._digests.get(msg.id)
+            if digest is not None:
+                self._digests.move_to_end(msg.id)
+                return digest
+        digest = _digest(_stable_json(normalize_message(msg)))
+        with self._lock:
+            self._digests[msg.id] = digest
+            while len(self._digests) > 65536:
+                self._digests.popitem(last=False)
+        return digest
+
+    def key(self, llm: Runnable, messages: list[BaseMessage]) -> str | None:
+        """Return the cache key for `messages` sent to `llm`, or None to bypass."""
+        model = getattr(llm, "bound", llm)
+        params = {p: getattr(model, p, None) for p in MODEL_PARAMS}
+        # An unset temperature means the server's (non-zero) default
+        if (
+            self.only_deterministic
+            and hasattr(model, "temperature")
+            and params["temperature"] != 0
+        ):
+            return None
+
+        tools = getattr(llm, "kwargs", {}).get("tools", [])
+        header = _stable_json([type(model).__name__, params, tools])
+        body = ",".join(self._message_digest(m) for m in messages)
+        return f"{self.name}:{_digest(header + '|' + body)}"
+
+    def lookup(self, key: str) -> AIMessage | None:
+        """Return a fresh copy of the cached response for `key`, if any."""
+        value = self.store.get(key)
+        if value is MISSING:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        message = messages_from_dict([value])[0]
+        # Cached answers enter a new history: give them new IDs
+        message.id = str(uuid.uuid4())
+        message.response_metadata = {**message.response_metadata, CACHE_HIT: True}
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                call["id"] = f"call_{uuid.uuid4().hex}"
+        return message
+
+    def save(self, key: str, message: BaseMessage) -> None:
+        """Store the model's response for `key`."""
+        self.store.set(key, message_to_dict(message))
+
+
+def is_cache_hit(message: BaseMessage) -> bool:
+    """Return whether `message` was served by an `LLMResponseCache`."""
+    return bool(message.response_metadata.get(CACHE_HIT))
+
+
+class CachedChatModel(Runnable):
+    """A bound chat model with an `LLMResponseCache` in front of it."""
+
+    def __init__(self, llm: Runnable, cache: LLMResponseCache) -> None:
+        """Wrap `llm`."""
+        self.llm = llm
+        self.cache = cache
+
+    def _key(self, input: Any) -> str | None:  # noqa: ANN401, A002
+        """Return the cache key for a list-of-messages input."""
+        if isinstance(input, list) and all(isinstance(m, BaseMessage) for m in input):
+            return self.cache.key(self.llm, input)
+        return None
+
+    def invoke(
+            self,
+            input: Any,  # noqa: ANN401, A002
+            config: RunnableConfig | None = None,
+            **kwargs: object,
+        ) -> BaseMessage:
+        """Return the cached response, or invoke the model and cache its answer."""
+        key = self._key(input)
+        if key is not None:
+            cached = self.cache.lookup(key)
+            if cached is not None:
+                return cached
+        response = self.llm.invoke(input, config, **kwargs)
+        if key is not None:
+            self.cache.save(key, response)
+        return response
+
+    async def ainvoke(
+            self,
+            input: Any,  # noqa: ANN401, A002
+            config: RunnableConfig | None = None,
+            **kwargs: object,
+        ) -> BaseMessage:
+        """Async version of `invoke`."""
+        key = self._key(input)
+        if key is not None:
+            cached = self.cache.lookup(key)
+            if cached is not None:
+                return cached
+        response = await self.llm.ainvoke(input, config, **kwargs)
+        if key is not None:
+            self.cache.save(key, response)
+        return response
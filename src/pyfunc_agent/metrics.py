@@ -0,0 +1,534 @@
+"""Latency and token metrics for agent graphs.
+
+The runtime times every node of the agent graph, every registered tool call and
+every turn, and reads token counts and timings from the model's response metadata
+(Ollama reports prompt and completion token counts and the time spent evaluating
+each). Ollama's prompt count covers only the tokens it evaluated, not the prefix it
+served from its cache. The server does not report the size of the whole prompt, so
+the session estimates it (about four characters per token) and the difference is
+recorded as *estimated* reused prompt tokens. That estimate is only as good as the
+chars/4 rule for the model's tokenizer: compare it across runs of one model, not as
+an exact count. Measurements go to two places:
+
+- `METRICS`: process-wide counters and histograms, labelled by node, model or tool,
+  rendered in the Prometheus text format by `METRICS.prometheus()` or served over
+  HTTP by `serve_metrics(port)`.
+- A `TurnTrace` for the current turn, when one is active: `chat(...,
+  return_trace=True)` returns it alongside the answer, so a slow turn can be split
+  into prompt evaluation, generation, tools and graph overhead.
+
+Recording a measurement is a lock and a bucket search; `METRICS.enabled = False`
+turns the process-wide metrics off.
+
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    30.0, 60.0,
+)
+HOP_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30)
+RATE_BUCKETS = (1, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+# Response metadata key `pyfunc_agent.llm_cache` sets on the answers it serves
+CACHE_HIT = "cache_hit"
+
+
+# ------------------------------------------------------------------------------
+#  METRIC TYPES
+# ------------------------------------------------------------------------------
+class Counter:
+    """Monotonic counter with one value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        """Create the counter `name` with label names `labels`."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *label_values: str) -> None:
+        """Add `amount` to the counter for `label_values`."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Return the current value for `label_values`."""
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        """Yield (suffix, label values, value) for the exporter."""
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield "_total", label_values, value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS,
+        ) -> None:
+        """Create the histogram `name` with label names `labels` and `buckets`."""
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple[str, ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record `value` for `label_values`."""
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[label_values] = series
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        """Return the number of observations for `label_values`."""
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def sum(self, *label_values: str) -> float:
+        """Return the sum of observations for `label_values`."""
+        series = self._series.get(label_values)
+        return series[1] if series else 0.0
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        """Yield (suffix, label values, value) for the exporter."""
+        with self._lock:
+            items = [(k, [list(v[0]), v[1], v[2]]) for k, v in self._series.items()]
+        for label_values, (counts, total, n) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                yield "_bucket", (*label_values, str(bound)), cumulative
+            yield "_sum", label_values, total
+            yield "_count", label_values, n
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """A set of metrics that render together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        """Start with no metrics; `enabled` gates every recording helper."""
+        self.enabled = True
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def _get(self, name: str, kind: type, new: Any) -> Any:  # noqa: ANN401
+        metric = self._metrics.setdefault(name, new)
+        if not isinstance(metric, kind):
+            raise ValueError(f"Metric {name!r} is already a {metric.kind}.")
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Return the counter `name`, creating it on first use."""
+        return self._get(name, Counter, Counter(name, help, labels))
+
+    def histogram(
+            self,
+            name: str,
+            help: str,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS,
+        ) -> Histogram:
+        """Return the histogram `name`, creating it on first use."""
+        return self._get(name, Histogram, Histogram(name, help, labels, buckets))
+
+    def prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, label_values, value in metric.samples():
+                names = metric.labels + (("le",) if suffix == "_bucket" else ())
+                labels = ",".join(
+                    f'{n}="{_escape(v)}"' for n, v in zip(names, label_values)
+                )
+                labels = f"{{{labels}}}" if labels else ""
+                lines.append(f"{metric.name}{suffix}{labels} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+NODE_SECONDS = METRICS.histogram(
+    "pyfunc_agent_node_seconds", "Wall time of one graph node run.", ["node"]
+)
+TOOL_SECONDS = METRICS.histogram(
+    "pyfunc_agent_tool_seconds", "Wall time of one registered tool call.", ["tool"]
+)
+TOOL_ERRORS = METRICS.counter(
+    "pyfunc_agent_tool_errors", "Tool calls that raised.", ["tool"]
+)
+LLM_PROMPT_TOKENS = METRICS.counter(
+    "pyfunc_agent_llm_prompt_tokens", "Prompt tokens evaluated by the model.", ["model"]
+)
+LLM_PROMPT_REUSED_TOKENS = METRICS.counter(
+    "pyfunc_agent_llm_prompt_reused_tokens_estimate",
+    "Estimated prompt tokens the model served from its cache instead of evaluating "
+    "(chars/4 prompt estimate minus the evaluated count).",
+    ["model"],
+)
+LLM_PROMPT_REUSE = METRICS.histogram(
+    "pyfunc_agent_llm_prompt_reuse_ratio_estimate",
+    "Estimated share of one call's prompt served from the model's cache.",
+    ["model"],
+    RATIO_BUCKETS,
+)
+LLM_COMPLETION_TOKENS = METRICS.counter(
+    "pyfunc_agent_llm_completion_tokens", "Tokens generated by the model.", ["model"]
+)
+LLM_PROMPT_EVAL_SECONDS = METRICS.histogram(
+    "pyfunc_agent_llm_prompt_eval_seconds",
+    "Model time spent evaluating the prompt, as reported by the server.",
+    ["model"],
+)
+LLM_EVAL_SECONDS = METRICS.histogram(
+    "pyfunc_agent_llm_eval_seconds",
+    "Model time spent generating, as reported by the server.",
+    ["model"],
+)
+LLM_TOKENS_PER_SECOND = METRICS.histogram(
+    "pyfunc_agent_llm_tokens_per_second",
+    "Generation speed of one model call.",
+    ["model"],
+    RATE_BUCKETS,
+)
+TURN_SECONDS = METRICS.histogram(
+    "pyfunc_agent_turn_seconds", "Wall time of one chat turn."
+)
+TURN_HOPS = METRICS.histogram(
+    "pyfunc_agent_turn_hops", "Model calls in one chat turn.", (), HOP_BUCKETS
+)
+TURN_STOPS = METRICS.counter(
+    "pyfunc_agent_turn_stops", "Turns cut off by their budget.", ["budget"]
+)
+ROUTE_SECONDS = METRICS.histogram(
+    "pyfunc_agent_route_seconds",
+    "Wall time of one model-router attempt, by route and outcome.",
+    ["route", "outcome"],
+)
+TOOL_CALLS_REUSED = METRICS.counter(
+    "pyfunc_agent_tool_calls_reused",
+    "Repeated tool calls answered from the turn's earlier result.",
+    ["tool"],
+)
+
+
+# ------------------------------------------------------------------------------
+#  PER-TURN TRACE
+# ------------------------------------------------------------------------------
+@dataclass
+class LLMCallTiming:
+    """One model call, with the server's token counts and timings when reported."""
+
+    model: str
+    seconds: float
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    prompt_eval_seconds: float | None = None
+    eval_seconds: float | None = None
+    load_seconds: float | None = None
+    prompt_size: int | None = None
+    """Estimated (chars/4) tokens of the whole prompt, if the session tracks it."""
+    cached: bool = False
+    """Served by an `LLMResponseCache`: no tokens were evaluated or generated."""
+
+    @property
+    def estimated_reused_tokens(self) -> int | None:
+        """Estimated prompt tokens the server did not evaluate (its cached prefix).
+
+        The chars/4 prompt estimate minus the server's exact evaluated count, so it
+        carries the estimate's error; a negative difference (the estimate being
+        short) is reported as 0.
+        """
+        if self.prompt_size is None or self.prompt_tokens is None:
+            return None
+        return max(self.prompt_size - self.prompt_tokens, 0)
+
+    @property
+    def estimated_prompt_reuse(self) -> float | None:
+        """Estimated share of the prompt served from the server's cache."""
+        reused = self.estimated_reused_tokens
+        if reused is None or not self.prompt_size:
+            return None
+        return reused / self.prompt_size
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Generation speed, if the server reported the generation time."""
+        if not self.eval_seconds or self.completion_tokens is None:
+            return None
+        return self.completion_tokens / self.eval_seconds
+
+
+@dataclass
+class TurnTrace:
+    """Where the time of one chat turn went."""
+
+    seconds: float = 0.0
+    nodes: list[tuple[str, float]] = field(default_factory=list)
+    """(node name, seconds) for every node run, in order."""
+    llm_calls: list[LLMCallTiming] = field(default_factory=list)
+    tool_calls: list[tuple[str, float]] = field(default_factory=list)
+    """(tool name, seconds) for every registered tool call."""
+    reused_tool_calls: int = 0
+    """Repeated tool calls answered from an earlier result."""
+    stopped: str | None = None
+    """The budget that cut the turn off, if any (see `pyfunc_agent.budgets`)."""
+    routes: list[tuple[str, str, float]] = field(default_factory=list)
+    """(route, outcome, seconds) for every model-router attempt (see
+    `pyfunc_agent.routing`)."""
+
+    @property
+    def hops(self) -> int:
+        """Model calls in the turn."""
+        return len(self.llm_calls)
+
+    def node_seconds(self, node: str) -> float:
+        """Total wall time of the runs of `node`."""
+        return sum(seconds for name, seconds in self.nodes if name == node)
+
+    @property
+    def graph_overhead_seconds(self) -> float:
+        """Turn time spent outside any node: scheduling, state merges, checkpoints."""
+        return max(self.seconds - sum(seconds for _, seconds in self.nodes), 0.0)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Prompt tokens over the turn's model calls."""
+        return sum(c.prompt_tokens or 0 for c in self.llm_calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        """Generated tokens over the turn's model calls."""
+        return sum(c.completion_tokens or 0 for c in self.llm_calls)
+
+    @property
+    def estimated_reused_tokens(self) -> int:
+        """Estimated cached prompt tokens over the turn's model calls."""
+        return sum(c.estimated_reused_tokens or 0 for c in self.llm_calls)
+
+    def summary(self) -> dict[str, float]:
+        """Return the turn's totals as a flat dict."""
+        return {
+            "seconds": self.seconds,
+            "hops": self.hops,
+            "agent_seconds": self.node_seconds("agent"),
+            "tools_seconds": self.node_seconds("tools"),
+            "prompt_eval_seconds": sum(
+                c.prompt_eval_seconds or 0.0 for c in self.llm_calls
+            ),
+            "eval_seconds": sum(c.eval_seconds or 0.0 for c in self.llm_calls),
+            "graph_overhead_seconds": self.graph_overhead_seconds,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_reused_tokens": self.estimated_reused_tokens,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the full trace as plain data."""
+        return {**asdict(self), "summary": self.summary()}
+
+
+_TRACE: contextvars.ContextVar[TurnTrace | None] = contextvars.ContextVar(
+    "pyfunc_agent_turn_trace", default=None
+)
+
+
+@contextmanager
+def trace_turn() -> Iterator[TurnTrace]:
+    """Collect a `TurnTrace` for everything the graph runs inside the block."""
+    trace = TurnTrace()
+    token = _TRACE.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.seconds = time.perf_counter() - start
+        try:
+            _TRACE.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context
+            _TRACE.set(None)
+        if METRICS.enabled:
+            TURN_SECONDS.observe(trace.seconds)
+            TURN_HOPS.observe(trace.hops)
+
+
+# ------------------------------------------------------------------------------
+#  RECORDING
+# ------------------------------------------------------------------------------
+def record_node(node: str, seconds: float) -> None:
+    """Record one run of graph node `node`."""
+    if METRICS.enabled:
+        NODE_SECONDS.observe(seconds, node)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.nodes.append((node, seconds))
+
+
+def record_tool(tool: str, seconds: float, failed: bool = False) -> None:
+    """Record one call of registered tool `tool`."""
+    if METRICS.enabled:
+        TOOL_SECONDS.observe(seconds, tool)
+        if failed:
+            TOOL_ERRORS.inc(1.0, tool)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.tool_calls.append((tool, seconds))
+
+
+def record_reused_call(tool: str) -> None:
+    """Record a repeated call of `tool` answered without running it."""
+    if METRICS.enabled:
+        TOOL_CALLS_REUSED.inc(1.0, tool)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.reused_tool_calls += 1
+
+
+def record_stop(budget: str) -> None:
+    """Record a turn cut off by `budget`."""
+    if METRICS.enabled:
+        TURN_STOPS.inc(1.0, budget)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.stopped = budget
+
+
+def record_route(route: str, outcome: str, seconds: float) -> None:
+    """Record one attempt of model-router `route`.
+
+    `outcome` is "answered", "declined" or "escalated".
+    """
+    if METRICS.enabled:
+        ROUTE_SECONDS.observe(seconds, route, outcome)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.routes.append((route, outcome, seconds))
+
+
+def _ns(metadata: dict[str, Any], key: str) -> float | None:
+    value = metadata.get(key)
+    return value / 1e9 if value else None
+
+
+def record_llm_call(
+        model: str,
+        seconds: float,
+        response: "AIMessage",
+        prompt_size: int | None = None,
+    ) -> LLMCallTiming:
+    """Record one model call from its AIMessage's usage and response metadata.
+
+    Token counts come from `usage_metadata`, or Ollama's `prompt_eval_count` and
+    `eval_count`; durations from Ollama's `*_duration` fields (nanoseconds).
+    `prompt_size` is the estimated size of the whole prompt, to estimate the reused
+    prompt tokens from. Responses served by an `LLMResponseCache` carry the original
+    call's counts and timings, so only their wall time is recorded.
+    """
+    metadata = response.response_metadata or {}
+    if metadata.get(CACHE_HIT):
+        call = LLMCallTiming(
+            model=model, seconds=seconds, prompt_size=prompt_size, cached=True
+        )
+    else:
+        usage = response.usage_metadata or {}
+        call = LLMCallTiming(
+            model=model,
+            seconds=seconds,
+            prompt_tokens=usage.get("input_tokens", metadata.get("prompt_eval_count")),
+            completion_tokens=usage.get("output_tokens", metadata.get("eval_count")),
+            prompt_eval_seconds=_ns(metadata, "prompt_eval_duration"),
+            eval_seconds=_ns(metadata, "eval_duration"),
+            load_seconds=_ns(metadata, "load_duration"),
+            prompt_size=prompt_size,
+        )
+    if METRICS.enabled:
+        if call.prompt_tokens is not None:
+            LLM_PROMPT_TOKENS.inc(call.prompt_tokens, model)
+        if call.estimated_prompt_reuse is not None:
+            LLM_PROMPT_REUSED_TOKENS.inc(call.estimated_reused_tokens, model)
+            LLM_PROMPT_REUSE.observe(call.estimated_prompt_reuse, model)
+        if call.completion_tokens is not None:
+            LLM_COMPLETION_TOKENS.inc(call.completion_tokens, model)
+        if call.prompt_eval_seconds is not None:
+            LLM_PROMPT_EVAL_SECONDS.observe(call.prompt_eval_seconds, model)
+        if call.eval_seconds is not None:
+            LLM_EVAL_SECONDS.observe(call.eval_seconds, model)
+        if call.tokens_per_second is not None:
+            LLM_TOKENS_PER_SECOND.observe(call.tokens_per_second, model)
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.llm_calls.append(call)
+    return call
+
+
+# ------------------------------------------------------------------------------
+#  EXPORT
+# ------------------------------------------------------------------------------
+def serve_metrics(
+        port: int = 9464,
+        host: str = "127.0.0.1",
+        registry: MetricsRegistry = METRICS,
+    ) -> ThreadingHTTPServer:
+    """Serve `registry` at `/metrics` from a daemon thread; returns the server.
+
+    Call `shutdown()` on the server to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            """Keep scrape requests out of the logs."""
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
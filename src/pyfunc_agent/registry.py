@@ -0,0 +1,373 @@
+"""Declarative tool registry.
+
+Plain functions are registered once with a tool name, a description and tags:
+
+    @register("add_tool", description="Return a + b.", tags=("scalar", "math"))
+    def add_numbers(a: float, b: float) -> float: ...
+
+The registry builds the LangChain tool for a function the first time it is asked
+for (argument schema from the type hints, description from the docstring unless
+given) together with its JSON tool schema, and caches both for the life of the
+process. Registering is just a dict insert, so hundreds of functions cost nothing
+until an agent selects them. LangChain's tool machinery is imported only then, too.
+
+Agents pick tools by name or tag with `REGISTRY.select(...)`; the runtime binds the
+cached schemas, so building another agent never regenerates them.
+
+A tool registered with `answer_arg` is terminal: a call to it ends the turn, and the
+value of that argument becomes the turn's answer without the tool (or another model
+call) running, e.g. ReAct's `finish_tool`.
+
+A tool registered with `pure=True`, or whose function is memoized (see
+`pyfunc_agent.caching.memoize`), may have a repeated call in a turn answered from its
+earlier result (see `pyfunc_agent.budgets`); other tools always run.
+
+On the async path a tool runs in a worker thread, so a slow function does not block
+the other sessions on the event loop. Tools registered with `cheap=True` (functions
+that return in microseconds) run inline instead, saving the thread hop.
+
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from pyfunc_agent.events import (
+    Lazy,
+    abbreviate,
+    current_session_id,
+    json_size,
+    log_event,
+    logger,
+)
+from pyfunc_agent.metrics import record_tool
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool, StructuredTool
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Modules whose import registers the built-in tools
+DEFAULT_MODULES = ("pyfunc_agent.tools", "pyfunc_agent.expressions")
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A registered function and how to expose it as a tool."""
+
+    name: str
+    func: Callable[..., Any]
+    description: str
+    tags: frozenset[str]
+    handle_errors: tuple[type[Exception], ...] = ()
+    """Exceptions reported to the model as an error ToolMessage."""
+    answer_arg: str | None = None
+    """For a terminal tool, the argument holding the turn's final answer."""
+    cheap: bool = False
+    """Run inline on the event loop instead of in a worker thread."""
+    pure: bool = False
+    """Same arguments, same result, no side effects: repeated calls may be reused."""
+
+    @property
+    def reusable(self) -> bool:
+        """Whether a repeated call may be answered from an earlier result."""
+        # `memoize` wrappers expose their store as `.cache`
+        return self.pure or hasattr(self.func, "cache")
+
+
+class ToolRegistry:
+    """Name -> function registry that builds and caches tools and their schemas."""
+
+    def __init__(self, modules: Sequence[str] = ()) -> None:
+        """Create an empty registry.
+
+        `modules` are imported on the first lookup, so the functions they register
+        are available without importing them explicitly.
+        """
+        self.modules = tuple(modules)
+        self._specs: dict[str, ToolSpec] = {}
+        self._tools: dict[str, StructuredTool] = {}
+        self._schemas: dict[str, dict[str, Any]] = {}
+        self._loaded = not self.modules
+        self._lock = threading.RLock()
+
+    # --------------------------------------------------------------------------
+    #  Registration
+    # --------------------------------------------------------------------------
+    def register(
+            self,
+            name: str | None = None,
+            *,
+            description: str | None = None,
+            tags: Iterable[str] = (),
+            handle_errors: tuple[type[Exception], ...] = (),
+            answer_arg: str | None = None,
+            cheap: bool = False,
+            pure: bool = False,
+        ) -> Callable[[F], F]:
+        """Decorator registering a function as a tool; the function is unchanged.
+
+        Args:
+            name: Tool name the model calls (defaults to the function name).
+            description: Tool description (defaults to the function's docstring).
+            tags: Tags agents can select the tool by.
+            handle_errors: Exceptions returned to the model as an error message
+                instead of failing the run.
+            answer_arg: Makes the tool terminal: calling it ends the turn with
+                the value of this argument as the answer.
+            cheap: The function returns in microseconds, so the async path calls
+                it on the event loop instead of in a worker thread.
+            pure: The function has no side effects and returns the same result
+                for the same arguments, so a repeated call in a turn may reuse
+                the earlier result. Memoized functions count as pure.
+        """
+
+        def decorator(func: F) -> F:
+            self.add(
+                func,
+                name=name,
+                description=description,
+                tags=tags,
+                handle_errors=handle_errors,
+                answer_arg=answer_arg,
+                cheap=cheap,
+                pure=pure,
+            )
+            return func
+
+        return decorator
+
+    def add(
+            self,
+            func: Callable[..., Any],
+            name: str | None = None,
+            *,
+            description: str | None = None,
+            tags: Iterable[str] = (),
+            handle_errors: tuple[type[Exception], ...] = (),
+            answer_arg: str | None = None,
+            cheap: bool = False,
+            pure: bool = False,
+        ) -> None:
+        """Register `func`; see `register` for the options."""
+        name = name or func.__name__
+        params = inspect.signature(func).parameters
+        if answer_arg is not None and answer_arg not in params:
+            raise ValueError(f"{name} has no argument {answer_arg!r} to answer with.")
+        spec = ToolSpec(
+            name=name,
+            func=func,
+            description=description or inspect.getdoc(func) or name,
+            tags=frozenset(tags),
+            handle_errors=handle_errors,
+            answer_arg=answer_arg,
+            cheap=cheap,
+            pure=pure,
+        )
+        with self._lock:
+            self._specs[name] = spec
+            # Re-registering replaces the cached tool
+            self._tools.pop(name, None)
+            self._schemas.pop(name, None)
+
+    # --------------------------------------------------------------------------
+    #  Lookup
+    # --------------------------------------------------------------------------
+    def _load(self) -> None:
+        """Import the registry's modules once."""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                for module in self.modules:
+                    importlib.import_module(module)
+                self._loaded = True
+
+    def spec(self, name: str) -> ToolSpec:
+        """Return the registration of tool `name`."""
+        self._load()
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise KeyError(f"No tool named {name!r} is registered.") from None
+
+    def get(self, name: str) -> "StructuredTool":
+        """Return the tool `name`, building it on first use."""
+        tool = self._tools.get(name)
+        if tool is not None:
+            return tool
+        spec = self.spec(name)
+        with self._lock:
+            if name not in self._tools:
+                self._tools[name] = self._build(spec)
+            return self._tools[name]
+
+    def schema(self, name: str) -> dict[str, Any]:
+        """Return the cached JSON (OpenAI function) schema of tool `name`."""
+        schema = self._schemas.get(name)
+        if schema is None:
+            from langchain_core.utils.function_calling import convert_to_openai_tool
+
+            schema = convert_to_openai_tool(self.get(name))
+            self._schemas[name] = schema
+        return schema
+
+    def select(self, *names_or_tags: str) -> list["StructuredTool"]:
+        """Return the tools matching any of the given names or tags.
+
+        Tools come back once each, in registration order. Raises KeyError for an
+        entry that is neither a tool name nor a tag.
+        """
+        self._load()
+        wanted = set(names_or_tags)
+        known = set(self._specs).union(*(s.tags for s in self._specs.values()))
+        unknown = wanted - known
+        if unknown:
+            raise KeyError(f"No tool or tag named {', '.join(sorted(unknown))}.")
+        return [
+            self.get(name)
+            for name, spec in self._specs.items()
+            if name in wanted or spec.tags & wanted
+        ]
+
+    def resolve(self, tools: Iterable["BaseTool | str"]) -> list["BaseTool"]:
+        """Return `tools` with names and tags replaced by the registered tools."""
+        resolved: dict[int, BaseTool] = {}
+        for entry in tools:
+            for tool in self.select(entry) if isinstance(entry, str) else [entry]:
+                resolved.setdefault(id(tool), tool)
+        return list(resolved.values())
+
+    def schemas(self, tools: Iterable["BaseTool"]) -> list[dict[str, Any]]:
+        """Return tool schemas for `bind_tools`, cached for registered tools."""
+        from langchain_core.utils.function_calling import convert_to_openai_tool
+
+        return [
+            self.schema(tool.name)
+            if self._tools.get(tool.name) is tool
+            else convert_to_openai_tool(tool)
+            for tool in tools
+        ]
+
+    def answer_args(self, tools: Iterable["BaseTool"]) -> dict[str, str]:
+        """Return the answer argument of each terminal tool in `tools`, by name.
+
+        Only the registered tool objects count; another tool with the same name is
+        an ordinary tool.
+        """
+        return {
+            tool.name: self._specs[tool.name].answer_arg
+            for tool in tools
+            if self._tools.get(tool.name) is tool
+            and self._specs[tool.name].answer_arg is not None
+        }
+
+    def reusable(self, tools: Iterable["BaseTool"]) -> frozenset[str]:
+        """Return the names of the pure or memoized registered tools in `tools`.
+
+        As for `answer_args`, only the registered tool objects count.
+        """
+        return frozenset(
+            tool.name
+            for tool in tools
+            if self._tools.get(tool.name) is tool and self._specs[tool.name].reusable
+        )
+
+    def names(self) -> list[str]:
+        """Return every registered tool name."""
+        self._load()
+        return list(self._specs)
+
+    def tags(self) -> set[str]:
+        """Return every tag in use."""
+        self._load()
+        return set().union(*(s.tags for s in self._specs.values()))
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether a tool `name` is registered."""
+        self._load()
+        return name in self._specs
+
+    def __len__(self) -> int:
+        """Return the number of registered tools."""
+        self._load()
+        return len(self._specs)
+
+    # --------------------------------------------------------------------------
+    #  Tool construction
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _build(spec: ToolSpec) -> "StructuredTool":
+        """Build the LangChain tool for `spec`.
+
+        The argument schema comes from the function's own signature. On the async
+        path the call runs in a worker thread, unless the tool is `cheap`: then a
+        thread hop would cost more than the call, so it runs inline.
+
+        Each call is timed into the tool metrics (see `pyfunc_agent.metrics`) and
+        reported as a `tool_call` event (see `pyfunc_agent.events`); with events
+        disabled that costs one level check.
+        """
+        from langchain_core.tools import StructuredTool, ToolException
+
+        func = spec.func
+
+        def run(kwargs: dict[str, Any]) -> Any:  # noqa: ANN401
+            try:
+                return func(**kwargs)
+            except spec.handle_errors as e:
+                raise ToolException(f"Error: {e}") from None
+
+        def call(**kwargs: Any) -> Any:  # noqa: ANN401
+            start = time.perf_counter()
+            try:
+                result = run(kwargs)
+            except Exception as e:
+                seconds = time.perf_counter() - start
+                record_tool(spec.name, seconds, failed=True)
+                if logger.isEnabledFor(logging.WARNING):
+                    log_event(
+                        "tool_call",
+                        logging.WARNING,
+                        session_id=current_session_id(),
+                        tool=spec.name,
+                        args=Lazy(abbreviate, kwargs),
+                        seconds=seconds,
+                        error=str(e),
+                    )
+                raise
+            seconds = time.perf_counter() - start
+            record_tool(spec.name, seconds)
+            if logger.isEnabledFor(logging.INFO):
+                log_event(
+                    "tool_call",
+                    session_id=current_session_id(),
+                    tool=spec.name,
+                    args=Lazy(abbreviate, kwargs),
+                    seconds=seconds,
+                    result_bytes=Lazy(json_size, result),
+                )
+            return result
+
+        async def acall(**kwargs: Any) -> Any:  # noqa: ANN401
+            if spec.cheap:
+                return call(**kwargs)
+            return await asyncio.to_thread(call, **kwargs)
+
+        tool = StructuredTool.from_function(
+            func=func, name=spec.name, description=spec.description
+        )
+        tool.func = call
+        tool.coroutine = acall
+        tool.handle_tool_error = bool(spec.handle_errors)
+        return tool
+
+
+REGISTRY = ToolRegistry(modules=DEFAULT_MODULES)
+register = REGISTRY.register
@@ -0,0 +1,335 @@
+"""Model routing: cheap routes for easy turns, the agent's model for the rest.
+
+Every model call of an agent normally goes to its (large) model. A `ModelRouter`
+puts cheaper routes in front of it, tried in order:
+
+- `ArithmeticRoute`: a rules-based fast path. A plainly arithmetic question ("Add 4
+  and 5.2", "What is sqrt(625) + 3?") is rewritten into an expression, evaluated by
+  `pyfunc_agent.expressions` and answered without any model call. Anything it
+  cannot parse completely is declined.
+- `ModelRoute`: a smaller chat model (e.g. a 1B Ollama model) with the agent's tools
+  bound. Its response must pass validation (tool calls name a bound tool with
+  arguments matching its schema; an answer is not empty) and a confidence check
+  (by default: the answer does not hedge) to be used.
+
+A route that declines passes the call on to the next one; a response that fails
+its checks is dropped and the call escalates to the agent's own model. A turn stays
+on the route that first answered it (or on the agent's model, once escalated): the
+route is recorded in each response's `response_metadata["route"]`, so routing holds
+no per-session state. Each attempt's wall time goes to the
+`pyfunc_agent_route_seconds` histogram, labelled by route and outcome (see
+`pyfunc_agent.metrics`).
+
+Routes are pluggable: subclass `Route` and implement `respond` (and `accept`).
+
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel, ValidationError
+
+from pyfunc_agent.budgets import current_turn
+from pyfunc_agent.expressions import ExpressionError, compile_expression, evaluate
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.runtime import DEFAULT_MODEL_OPTIONS
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.tools import BaseTool
+
+# Key of the route name in a routed response's `response_metadata`
+ROUTE_KEY = "route"
+# Route name of the agent's own model
+DEFAULT_ROUTE = "default"
+# LangGraph does not stream the tokens of model runs with this tag; a cheap model's
+# answer reaches the stream only once it is accepted
+NOSTREAM = "nostream"
+
+_NUMBER = r"[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?"
+# Leading and trailing words around a plain arithmetic question
+_FILLER = re.compile(
+    r"^(?:please\s+)?(?:what\s+is|what's|whats|how\s+much\s+is|compute|calculate|"
+    r"evaluate|work\s+out)?\s*|\s*(?:please)?[?.!\s]*$"
+)
+# (pattern, replacement) rewriting arithmetic phrases into expression syntax
+PHRASES = (
+    (rf"^add ({_NUMBER}) (?:and|to) ({_NUMBER})$", r"\1 + \2"),
+    (rf"^subtract ({_NUMBER}) from ({_NUMBER})$", r"\2 - \1"),
+    (rf"^multiply ({_NUMBER}) (?:and|by) ({_NUMBER})$", r"\1 * \2"),
+    (rf"^divide ({_NUMBER}) by ({_NUMBER})$", r"\1 / \2"),
+    (rf"^(?:the )?sum of ({_NUMBER}) and ({_NUMBER})$", r"\1 + \2"),
+    (rf"^(?:the )?product of ({_NUMBER}) and ({_NUMBER})$", r"\1 * \2"),
+    (rf"(?:the )?square root of ({_NUMBER})", r"sqrt(\1)"),
+    (rf"(?:the )?(?:natural )?(?:log|logarithm) of ({_NUMBER})", r"ln(\1)"),
+    (rf"(?:the )?exp(?:onential)? of ({_NUMBER})", r"exp(\1)"),
+    (r"\bplus\b", "+"),
+    (r"\bminus\b", "-"),
+    (r"\b(?:times|multiplied by)\b", "*"),
+    (r"\b(?:divided by|over)\b", "/"),
+    (r"\bto the power of\b", "**"),
+)
+# Answers a small model gives when it should not be trusted
+HEDGES = re.compile(
+    r"\b(?:not sure|unsure|i don't know|i do not know|cannot|can't|unable to|"
+    r"i think|maybe|probably)\b",
+    re.IGNORECASE,
+)
+
+
+def route_of(msg: BaseMessage) -> str | None:
+    """Return the route that produced `msg`, if it was routed."""
+    if isinstance(msg, AIMessage):
+        return msg.response_metadata.get(ROUTE_KEY)
+    return None
+
+
+def valid_response(response: AIMessage, tools: Sequence["BaseTool"]) -> bool:
+    """Whether `response` is usable with `tools`.
+
+    Every tool call must name one of `tools` with arguments that validate against
+    its schema; a response without tool calls must have some text.
+    """
+    if response.invalid_tool_calls:
+        return False
+    if not response.tool_calls:
+        return bool(str(response.content).strip())
+    by_name = {tool.name: tool for tool in tools}
+    for call in response.tool_calls:
+        tool = by_name.get(call["name"])
+        if tool is None:
+            return False
+        schema = tool.tool_call_schema
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            try:
+                schema.model_validate(call["args"])
+            except ValidationError:
+                return False
+    return True
+
+
+def hedging_confidence(messages: list[BaseMessage], response: AIMessage) -> float:
+    """Confidence 0 for an answer that hedges ("I'm not sure", ...), else 1."""
+    if response.tool_calls:
+        return 1.0
+    return 0.0 if HEDGES.search(str(response.content)) else 1.0
+
+
+# ------------------------------------------------------------------------------
+#  ROUTES
+# ------------------------------------------------------------------------------
+class Route(ABC):
+    """Base class: one way of answering a model call."""
+
+    name = "route"
+    model_name: str | None = None
+    """Label of the route's model in the LLM metrics; None if it calls no model."""
+
+    @abstractmethod
+    def respond(
+            self,
+            messages: list[BaseMessage],
+            tools: Sequence["BaseTool"],
+        ) -> AIMessage | None:
+        """Return a response to `messages`, or None to decline the call."""
+
+    async def arespond(
+            self,
+            messages: list[BaseMessage],
+            tools: Sequence["BaseTool"],
+        ) -> AIMessage | None:
+        """Async version of `respond`."""
+        return self.respond(messages, tools)
+
+    def accept(
+            self,
+            messages: list[BaseMessage],
+            response: AIMessage,
+            tools: Sequence["BaseTool"],
+        ) -> bool:
+        """Whether `response` passes the route's checks; if not, the call escalates."""
+        return True
+
+
+class ArithmeticRoute(Route):
+    """Answer plainly arithmetic questions without a model."""
+
+    name = "arithmetic"
+
+    def __init__(self, template: str = "{expression} = {result}") -> None:
+        """Format answers with `template`, given `expression` and `result`."""
+        self.template = template
+
+    @staticmethod
+    def expression(question: str) -> str | None:
+        """Return `question` as an arithmetic expression, if it is nothing else."""
+        text = _FILLER.sub("", question.strip().lower())
+        for pattern, replacement in PHRASES:
+            text = re.sub(pattern, replacement, text)
+        try:
+            compiled = compile_expression(text)
+        except ExpressionError:
+            return None
+        # A bare number is no computation
+        return text if compiled.operations else None
+
+    def respond(
+            self,
+            messages: list[BaseMessage],
+            tools: Sequence["BaseTool"],
+        ) -> AIMessage | None:
+        """Answer the turn's question if it is plain arithmetic with a finite result.
+
+        Only the first model call of a turn is answered.
+        """
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        expression = self.expression(str(messages[-1].content))
+        if expression is None:
+            return None
+        try:
+            result = evaluate(expression)
+        except ExpressionError:
+            return None
+        if not np.all(np.isfinite(result)):
+            return None
+        if isinstance(result, list):
+            text = "[" + ", ".join(f"{x:.12g}" for x in result) + "]"
+        else:
+            text = f"{result:.12g}"
+        return AIMessage(
+            content=self.template.format(expression=expression, result=text)
+        )
+
+
+class ModelRoute(Route):
+    """A cheaper chat model, trusted only with responses that pass its checks."""
+
+    def __init__(
+            self,
+            llm: "BaseChatModel | None" = None,
+            model_name: str | None = None,
+            name: str | None = None,
+            model_options: dict[str, Any] | None = None,
+            confidence: Callable[[list[BaseMessage], AIMessage], float] = (
+                hedging_confidence
+            ),
+            min_confidence: float = 0.5,
+        ) -> None:
+        """Use `llm`, or a `ChatOllama` for `model_name` with `model_options`.
+
+        A response is used when it is valid for the bound tools (see
+        `valid_response`) and `confidence(messages, response)` is at least
+        `min_confidence`.
+        """
+        if llm is None and model_name is None:
+            raise ValueError("A model route needs an llm or a model_name.")
+        self._llm = llm
+        self.model_name = model_name or getattr(llm, "model", None) or type(llm).__name__
+        self.name = name or self.model_name
+        self.model_options = {**DEFAULT_MODEL_OPTIONS, **(model_options or {})}
+        self.confidence = confidence
+        self.min_confidence = min_confidence
+        # Bound models per tool set
+        self._bound: dict[tuple[str, ...], Runnable] = {}
+        self._lock = threading.Lock()
+
+    @cached_property
+    def model(self) -> "BaseChatModel":
+        """The chat model client: the `llm` passed in, or ChatOllama."""
+        if self._llm is not None:
+            return self._llm
+        from langchain_ollama import ChatOllama
+
+        return ChatOllama(model=self.model_name, **self.model_options)
+
+    def _bind(self, tools: Sequence["BaseTool"]) -> Runnable:
+        """Return the model with `tools` bound, binding each tool set once."""
+        key = tuple(tool.name for tool in tools)
+        bound = self._bound.get(key)
+        if bound is None:
+            bound = self.model.bind_tools(REGISTRY.schemas(tools))
+            with self._lock:
+                bound = self._bound.setdefault(key, bound)
+        return bound
+
+    def respond(
+            self,
+            messages: list[BaseMessage],
+            tools: Sequence["BaseTool"],
+        ) -> AIMessage | None:
+        """Ask the model; its tokens are not streamed until the response is used."""
+        return self._bind(tools).invoke(messages, {"tags": [NOSTREAM]})
+
+    async def arespond(
+            self,
+            messages: list[BaseMessage],
+            tools: Sequence["BaseTool"],
+        ) -> AIMessage | None:
+        """Async version of `respond`."""
+        return await self._bind(tools).ainvoke(messages, {"tags": [NOSTREAM]})
+
+    def accept(
+            self,
+            messages: list[BaseMessage],
+            response: AIMessage,
+            tools: Sequence["BaseTool"],
+        ) -> bool:
+        """Whether `response` is valid and confident enough."""
+        return (
+            valid_response(response, tools)
+            and self.confidence(messages, response) >= self.min_confidence
+        )
+
+
+# ------------------------------------------------------------------------------
+#  ROUTER
+# ------------------------------------------------------------------------------
+class ModelRouter:
+    """Routes tried in order before the agent's own model.
+
+    One router can serve any number of runtimes and sessions.
+    """
+
+    default = DEFAULT_ROUTE
+    """Route name of the agent's own model."""
+
+    def __init__(self, routes: Sequence[Route]) -> None:
+        """Try `routes` in order; route names must be unique."""
+        names = [route.name for route in routes]
+        if len(set(names)) != len(names) or DEFAULT_ROUTE in names:
+            raise ValueError(
+                f"Route names must be unique and not {DEFAULT_ROUTE!r}: {names}."
+            )
+        self.routes = list(routes)
+
+    def plan(self, messages: list[BaseMessage]) -> list[Route]:
+        """Return the routes to try for this call of the turn, in order.
+
+        A turn continues on the route that answered its latest routed response; a
+        turn that escalated stays on the agent's model.
+        """
+        for msg in reversed(current_turn(messages)):
+            route = route_of(msg)
+            if route is None:
+                continue
+            if route == self.default:
+                return []
+            for i, candidate in enumerate(self.routes):
+                if candidate.name == route:
+                    return self.routes[i:]
+            return []
+        return self.routes
+
+    @staticmethod
+    def tag(response: AIMessage, route: str) -> AIMessage:
+        """Return a copy of `response` recording the route that produced it."""
+        metadata = {**(response.response_metadata or {}), ROUTE_KEY: route}
+        return response.model_copy(update={"response_metadata": metadata})
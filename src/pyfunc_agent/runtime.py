@@ -0,0 +1,722 @@
+"""Shared agent runtimes.
+
+An `AgentRuntime` holds everything about an agent that does not change between
+conversations: the chat model client with its tools bound, the tool node, the
+compiled LangGraph graph and the system prompt. Per-conversation state (the message
+history and the context policy) lives on the agent object and reaches the graph
+through the run config, so one runtime can serve any number of sessions at once.
+
+`AgentFactory` builds each (agent class, model, prompt, options) runtime once and
+hands it to every agent it creates, so a new session costs a few attribute
+assignments instead of a model client, schema generation and a graph compile.
+
+Each turn of the `agent -> tools -> agent` loop runs under a `TurnBudget` (see
+`pyfunc_agent.budgets`): the tools node cuts a runaway turn off and answers repeated
+tool calls from their earlier results. A call to a terminal tool (registered with
+`answer_arg`, like ReAct's `finish_tool`) ends the turn right there, with that
+argument as the answer: no tool runs and no model call restates it.
+
+Ollama keeps the evaluated prompt of its last request per loaded model (its KV
+cache) and only evaluates the tokens after the longest prefix a new request shares
+with it. A session's requests share everything but their newest messages: the system
+prompt is one parsed `SystemMessage` for every session of a runtime, the tool schemas
+are built once in registration order, and the history is append-only, so a later
+turn pays only for its own messages. Context policies that evict turns and tool
+selectors that bind another subset change the prefix; they trade that reuse for a
+shorter prompt. `model_options` reach `ChatOllama` (e.g. `keep_alive`, `num_ctx`);
+keep them identical across the runtimes sharing a model, as a request with other
+load options (like `num_ctx`) reloads the model and drops its cache. Each model call
+records an estimate of how many prompt tokens the server did not have to evaluate
+(see `pyfunc_agent.metrics`).
+
+With a `router` (see `pyfunc_agent.routing`), each model call first tries the
+router's cheaper routes, a rules-based arithmetic answer or a small model, and
+escalates to the runtime's model when they decline or fail their checks.
+
+The model client, the tool binding, the tool node and the graph are built on first
+use, and `langchain_ollama` and `langgraph` are imported only then, so importing
+this module (or creating a runtime that is never run) stays cheap.
+
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping, Sequence
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolCall,
+    ToolMessage,
+)
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from pyfunc_agent.agent_attributes import AgentState
+from pyfunc_agent.budgets import (
+    DEFAULT_TURN_BUDGET,
+    TurnBudget,
+    call_key,
+    current_turn,
+    earlier_results,
+    reused_result,
+    stop_turn,
+)
+from pyfunc_agent.events import log_event, logger
+from pyfunc_agent.llm_cache import LLMResponseCache
+from pyfunc_agent.metrics import (
+    record_llm_call,
+    record_node,
+    record_reused_call,
+    record_route,
+    record_stop,
+)
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.tool_executor import ToolExecutor
+from pyfunc_agent.utils import PROMPTS
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.tools import BaseTool
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+
+    from pyfunc_agent.routing import ModelRouter, Route
+    from pyfunc_agent.tool_selection import ToolIndex, ToolSelector
+
+DEFAULT_MODEL = "mix_77/gemma3-qat-tools:12b"
+# ChatOllama options of every runtime, under its `model_options`. Ollama unloads an
+# idle model (and its cached prompt) after 5 minutes by default, shorter than a user
+# may take to read an answer and reply.
+DEFAULT_MODEL_OPTIONS: dict[str, Any] = {"temperature": 0.0, "keep_alive": "30m"}
+
+# Bound models kept per runtime for per-turn tool subsets
+MAX_BOUND_SUBSETS = 256
+
+
+class AgentRuntime:
+    """Build-once model client, tools, graph and system prompt for an agent."""
+
+    def __init__(
+            self,
+            tools: Sequence["BaseTool | str"],
+            prompt_name: str,
+            model_name: str = DEFAULT_MODEL,
+            llm: "BaseChatModel | None" = None,
+            tool_executor: ToolExecutor | None = None,
+            response_cache: LLMResponseCache | None = None,
+            checkpointer: "BaseCheckpointSaver | None" = None,
+            tool_selector: "ToolSelector | None" = None,
+            model_options: Mapping[str, Any] | None = None,
+            router: "ModelRouter | None" = None,
+        ) -> None:
+        """Resolve `tools` and load the prompt; the client and graph come on first use.
+
+        `tools` may mix tool objects with names and tags of registered tools (see
+        `pyfunc_agent.registry`).
+
+        See the agent classes in `pyfunc_agent.simple_agents` for the options. With a
+        `checkpointer`, the graph keeps each session's history itself, under the
+        agent's `session_id` as thread ID (see `pyfunc_agent.sessions`). With a
+        `tool_selector`, each model call binds only the tools it picks for the turn
+        (see `pyfunc_agent.tool_selection`). `model_options` are passed to
+        `ChatOllama` over `DEFAULT_MODEL_OPTIONS`, e.g. `{"num_ctx": 8192}`. With a
+        `router`, model calls try its cheaper routes first (see
+        `pyfunc_agent.routing`).
+        """
+        self.prompt_name = prompt_name
+        self.model_name = model_name
+        self.model_options = {**DEFAULT_MODEL_OPTIONS, **(model_options or {})}
+        self.tools = REGISTRY.resolve(tools)
+        self.checkpointer = checkpointer
+        self.response_cache = response_cache
+        self.tool_executor = tool_executor
+        self.tool_selector = tool_selector
+        self.router = router
+        self._llm = llm
+
+        # 1) Take the system prompt every session starts from (parsed once, see
+        #    `pyfunc_agent.utils.PROMPTS`)
+        prompt = PROMPTS.get(prompt_name)
+        self.prompt_hash = prompt.sha256
+        self.system_prompt = SystemMessage(content=prompt.text)
+
+        # 2) Bound models per tool subset, when a selector picks tools per turn
+        self._bound: OrderedDict[tuple[str, ...], Runnable] = OrderedDict()
+        self._bound_lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    #  Built on first use
+    # --------------------------------------------------------------------------
+    @cached_property
+    def model(self) -> "BaseChatModel":
+        """The chat model client: the `llm` passed in, or ChatOllama."""
+        if self._llm is not None:
+            return self._llm
+        from langchain_ollama import ChatOllama
+
+        return ChatOllama(model=self.model_name, **self.model_options)
+
+    @cached_property
+    def llm(self) -> Runnable:
+        """The model with every tool bound (with their cached schemas).
+
+        Repeated requests are served from the response cache, if any.
+        """
+        return self._bind(self.tools)
+
+    @cached_property
+    def tool_index(self) -> "ToolIndex | None":
+        """The selector's index of the tools, if tools are picked per turn."""
+        if self.tool_selector is None:
+            return None
+        return self.tool_selector.index(self.tools)
+
+    @cached_property
+    def answer_args(self) -> dict[str, str]:
+        """The answer argument of each terminal tool, by tool name."""
+        return REGISTRY.answer_args(self.tools)
+
+    @cached_property
+    def reusable_tools(self) -> frozenset[str]:
+        """Names of the pure or memoized tools, whose repeated calls may be reused."""
+        return REGISTRY.reusable(self.tools)
+
+    @cached_property
+    def schema_tokens(self) -> int:
+        """Approximate prompt tokens of the tool schemas, for prefix-reuse metrics."""
+        schemas = REGISTRY.schemas(self.tools)
+        return len(json.dumps(schemas, default=str)) // 4
+
+    @cached_property
+    def tool_node(self) -> Runnable:
+        """The node running the model's tool calls."""
+        if self.tool_executor is not None:
+            return self.tool_executor.as_node(self.tools)
+        from langgraph.prebuilt import ToolNode
+
+        return ToolNode(self.tools)
+
+    @cached_property
+    def graph(self) -> "CompiledStateGraph":
+        """The compiled graph; per-session state arrives through the run config."""
+        return self._compile(self.checkpointer)
+
+    @cached_property
+    def batch_graph(self) -> "CompiledStateGraph":
+        """The graph compiled without the checkpointer, for one-off batch items.
+
+        Batch items are independent single turns, so persisting them would only
+        leave a thread per item behind in the checkpointer.
+        """
+        if self.checkpointer is None:
+            return self.graph
+        return self._compile(None)
+
+    def _compile(
+            self,
+            checkpointer: "BaseCheckpointSaver | None",
+        ) -> "CompiledStateGraph":
+        """Build and compile the agent graph with `checkpointer`."""
+        from langgraph.graph import END, START, StateGraph
+        from langgraph.prebuilt import tools_condition
+
+        builder = StateGraph(AgentState)
+        builder.add_node(
+            "agent", RunnableLambda(self.agent_node, afunc=self.aagent_node)
+        )
+        builder.add_node(
+            "tools", RunnableLambda(self.tools_node, afunc=self.atools_node)
+        )
+        builder.add_edge(START, "agent")
+        builder.add_conditional_edges("agent", tools_condition)
+        builder.add_conditional_edges("tools", self._after_tools, ["agent", END])
+        return builder.compile(checkpointer=checkpointer)
+
+    # --------------------------------------------------------------------------
+    #  Nodes
+    # --------------------------------------------------------------------------
+    def _bind(self, tools: Sequence["BaseTool"]) -> Runnable:
+        """Return the model with `tools` bound, behind the response cache if any."""
+        bound = self.model.bind_tools(REGISTRY.schemas(tools))
+        if self.response_cache is not None:
+            bound = self.response_cache.wrap(bound)
+        return bound
+
+    def _llm_for(self, messages: list) -> Runnable:
+        """Return the bound model for this call: all tools, or the turn's subset."""
+        if self.tool_index is None:
+            return self.llm
+        query = next(
+            (
+                str(m.content)
+                for m in reversed(messages)
+                if isinstance(m, HumanMessage)
+            ),
+            "",
+        )
+        tools = self.tool_index.select(query)
+        if len(tools) == len(self.tools):
+            return self.llm
+
+        key = tuple(t.name for t in tools)
+        with self._bound_lock:
+            llm = self._bound.get(key)
+            if llm is not None:
+                self._bound.move_to_end(key)
+                return llm
+        llm = self._bind(tools)
+        with self._bound_lock:
+            self._bound[key] = llm
+            while len(self._bound) > MAX_BOUND_SUBSETS:
+                self._bound.popitem(last=False)
+        return llm
+
+    @staticmethod
+    def _model_view(state: AgentState, config: RunnableConfig) -> list:
+        """Return the messages to send, applying the session's context policy."""
+        messages = state["messages"]
+        policy = config.get("configurable", {}).get("context_policy")
+        if policy is not None:
+            messages = policy(messages)
+        return messages
+
+    @staticmethod
+    async def _amodel_view(state: AgentState, config: RunnableConfig) -> list:
+        """Async version of `_model_view`; a summarizing policy awaits its model."""
+        messages = state["messages"]
+        policy = config.get("configurable", {}).get("context_policy")
+        if policy is not None:
+            messages = await policy.acall(messages)
+        return messages
+
+    def _prompt_size(self, messages: list, config: RunnableConfig) -> int | None:
+        """Return the estimated prompt tokens of this call, if the session tracks it.
+
+        Tool subsets are counted as the full tool set.
+        """
+        size = config.get("configurable", {}).get("prompt_size")
+        if size is None:
+            return None
+        return size(messages) + self.schema_tokens
+
+    def _record_llm_call(
+            self,
+            config: RunnableConfig,
+            messages: list,
+            response: AIMessage,
+            llm_start: float,
+            model: str | None = None,
+        ) -> None:
+        """Record the metrics (and the event, if enabled) of one model call.
+
+        `model` defaults to the runtime's model.
+        """
+        seconds = time.perf_counter() - llm_start
+        model = model or getattr(self.model, "model", None) or self.model_name
+        call = record_llm_call(
+            model, seconds, response, self._prompt_size(messages, config)
+        )
+        if logger.isEnabledFor(logging.INFO):
+            log_event(
+                "llm_call",
+                session_id=config.get("configurable", {}).get("thread_id"),
+                model=model,
+                messages=len(messages),
+                seconds=call.seconds,
+                tool_calls=len(response.tool_calls),
+                input_tokens=call.prompt_tokens,
+                output_tokens=call.completion_tokens,
+                estimated_reused_tokens=call.estimated_reused_tokens,
+                cached=call.cached,
+            )
+
+    def _route_result(
+            self,
+            route: "Route",
+            config: RunnableConfig,
+            messages: list,
+            response: AIMessage | None,
+            start: float,
+        ) -> AIMessage | None:
+        """Record one route attempt; return its response if the route answered."""
+        if response is None:
+            outcome = "declined"
+        elif route.accept(messages, response, self.tools):
+            outcome = "answered"
+        else:
+            outcome = "escalated"
+        record_route(route.name, outcome, time.perf_counter() - start)
+        if response is not None and route.model_name is not None:
+            self._record_llm_call(config, messages, response, start, route.model_name)
+        if outcome == "escalated":
+            log_event(
+                "route_escalated",
+                logging.DEBUG,
+                session_id=config.get("configurable", {}).get("thread_id"),
+                route=route.name,
+            )
+        if outcome != "answered":
+            return None
+        return self.router.tag(response, route.name)
+
+    def _routed(self, messages: list, config: RunnableConfig) -> AIMessage | None:
+        """Return the answer of the first route that gives one, if any."""
+        for route in self.router.plan(messages):
+            start = time.perf_counter()
+            response = route.respond(messages, self.tools)
+            answer = self._route_result(route, config, messages, response, start)
+            if answer is not None:
+                return answer
+        return None
+
+    async def _arouted(
+            self,
+            messages: list,
+            config: RunnableConfig
+        ) -> AIMessage | None:
+        """Async version of `_routed`."""
+        for route in self.router.plan(messages):
+            start = time.perf_counter()
+            response = await route.arespond(messages, self.tools)
+            answer = self._route_result(route, config, messages, response, start)
+            if answer is not None:
+                return answer
+        return None
+
+    def _model_answer(
+            self,
+            config: RunnableConfig,
+            messages: list,
+            response: AIMessage,
+            llm_start: float,
+        ) -> AIMessage:
+        """Record a call of the runtime's model; tag it as the router's default."""
+        self._record_llm_call(config, messages, response, llm_start)
+        if self.router is None:
+            return response
+        default = self.router.default
+        record_route(default, "answered", time.perf_counter() - llm_start)
+        return self.router.tag(response, default)
+
+    def agent_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Node method.
+
+        The “node” function for LangGraph: given a state containing messages,
+        invoke the LLM and return only the new message. The state reducer appends
+        it to the history, so a step never copies the full conversation.
+        """
+        node_start = time.perf_counter()
+        messages = self._model_view(state, config)
+        response = self._routed(messages, config) if self.router else None
+        if response is None:
+            llm_start = time.perf_counter()
+            response = self._llm_for(messages).invoke(messages)
+            response = self._model_answer(config, messages, response, llm_start)
+        record_node("agent", time.perf_counter() - node_start)
+        return {"messages": [response]}
+
+    async def aagent_node(
+            self,
+            state: AgentState,
+            config: RunnableConfig
+        ) -> AgentState:
+        """Async node method.
+
+        Same as `agent_node`, but awaits the LLM so the event loop can serve other
+        conversations while this one waits on the model server.
+        """
+        node_start = time.perf_counter()
+        messages = await self._amodel_view(state, config)
+        response = await self._arouted(messages, config) if self.router else None
+        if response is None:
+            llm_start = time.perf_counter()
+            response = await self._llm_for(messages).ainvoke(messages)
+            response = self._model_answer(config, messages, response, llm_start)
+        record_node("agent", time.perf_counter() - node_start)
+        return {"messages": [response]}
+
+    @staticmethod
+    def _turn_budget(config: RunnableConfig) -> TurnBudget:
+        """Return the session's turn budget, or the default one."""
+        budget = config.get("configurable", {}).get("turn_budget")
+        return budget if budget is not None else DEFAULT_TURN_BUDGET
+
+    @staticmethod
+    def _after_tools(state: AgentState) -> str:
+        """Route to END once the tools node has answered the turn, else back."""
+        if isinstance(state["messages"][-1], AIMessage):
+            return "__end__"  # LangGraph's END
+        return "agent"
+
+    def _stop(
+            self,
+            turn: list[BaseMessage],
+            config: RunnableConfig
+        ) -> list[BaseMessage] | None:
+        """Return the messages ending the turn if it is over budget, else None.
+
+        A turn answering with a terminal tool is never stopped.
+        """
+        if self._answer_args(turn[-1]):
+            return None
+        configurable = config.get("configurable", {})
+        budget = self._turn_budget(config)
+        exceeded = budget.exceeded(turn, configurable.get("turn_started"))
+        if exceeded is None:
+            return None
+
+        record_stop(exceeded)
+        log_event(
+            "turn_stopped",
+            logging.WARNING,
+            session_id=configurable.get("thread_id"),
+            budget=exceeded,
+            messages=len(turn),
+        )
+        return stop_turn(turn[-1], budget.reason(exceeded))
+
+    def _answer_args(self, request: AIMessage) -> dict[str, str]:
+        """Return the answer argument of each terminal call in `request`, by ID."""
+        if not self.answer_args:
+            return {}
+        return {
+            call["id"]: self.answer_args[call["name"]]
+            for call in request.tool_calls
+            if call["name"] in self.answer_args
+        }
+
+    def _answered(
+            self,
+            state: AgentState,
+            turn: list[BaseMessage],
+            config: RunnableConfig,
+        ) -> tuple[dict[str, ToolMessage], AgentState | None]:
+        """Answer terminal and repeated tool calls without running them.
+
+        Terminal calls are answered with their answer argument, repeated calls to
+        pure or memoized tools with the turn's earlier result. Returns those results
+        by call ID and the state to run the tool node on for the remaining calls
+        (None if there are none).
+        """
+        request = turn[-1]
+        answer_args = self._answer_args(request)
+        earlier = (
+            earlier_results(turn) if self._turn_budget(config).reuse_results else {}
+        )
+        answered = {}
+        for call in request.tool_calls:
+            if call["id"] in answer_args:
+                answered[call["id"]] = ToolMessage(
+                    content=self._answer(call, answer_args[call["id"]]),
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                )
+                continue
+            if call["name"] not in self.reusable_tools:
+                continue
+            result = earlier.get(call_key(call))
+            if result is not None:
+                answered[call["id"]] = reused_result(call, result)
+                record_reused_call(call["name"])
+        if not answered:
+            return answered, state
+        pending = [c for c in request.tool_calls if c["id"] not in answered]
+        if not pending:
+            return answered, None
+        request = request.model_copy(update={"tool_calls": pending})
+        return answered, {**state, "messages": [*state["messages"][:-1], request]}
+
+    @staticmethod
+    def _answer(call: ToolCall, answer_arg: str) -> str:
+        """Return a terminal call's answer, as its tool would have returned it."""
+        answer = call["args"].get(answer_arg, "")
+        return answer if isinstance(answer, str) else json.dumps(answer)
+
+    def _tools_update(
+            self,
+            request: AIMessage,
+            answered: dict[str, ToolMessage],
+            update: AgentState,
+        ) -> AgentState:
+        """Merge all results in call order; end the turn on a terminal call."""
+        results = update["messages"]
+        if answered:
+            ran = {m.tool_call_id: m for m in results}
+            results = [
+                answered.get(call["id"]) or ran[call["id"]]
+                for call in request.tool_calls
+            ]
+        for call, result in zip(request.tool_calls, results):
+            if call["name"] in self.answer_args:
+                # The argument is the answer; skip restating it in a model call
+                return {"messages": [*results, AIMessage(content=result.content)]}
+        return {"messages": results}
+
+    def tools_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Run the tool calls of the latest AIMessage within the turn's budget.
+
+        Ends the turn instead when it is over budget or on a terminal call, and
+        answers repeated calls from their earlier results.
+        """
+        start = time.perf_counter()
+        turn = current_turn(state["messages"])
+        stop = self._stop(turn, config)
+        if stop is not None:
+            update = {"messages": stop}
+        else:
+            answered, pending = self._answered(state, turn, config)
+            ran = self.tool_node.invoke(pending, config) if pending else {"messages": []}
+            update = self._tools_update(turn[-1], answered, ran)
+        record_node("tools", time.perf_counter() - start)
+        return update
+
+    async def atools_node(
+            self,
+            state: AgentState,
+            config: RunnableConfig
+        ) -> AgentState:
+        """Async version of `tools_node`."""
+        start = time.perf_counter()
+        turn = current_turn(state["messages"])
+        stop = self._stop(turn, config)
+        if stop is not None:
+            update = {"messages": stop}
+        else:
+            answered, pending = self._answered(state, turn, config)
+            ran = (
+                await self.tool_node.ainvoke(pending, config)
+                if pending
+                else {"messages": []}
+            )
+            update = self._tools_update(turn[-1], answered, ran)
+        record_node("tools", time.perf_counter() - start)
+        return update
+
+
+class AgentFactory:
+    """Creates agents that share one runtime per configuration.
+
+    Runtimes are keyed on the agent class, prompt, tool selection, model and the
+    identity of any `llm`, `tool_executor`, `response_cache`, `checkpointer` or
+    `tool_selector` or `router` passed in and the `model_options`, and are built on
+    first use. A runtime built from an older version of its prompt file (see
+    `pyfunc_agent.utils.PROMPTS`) is replaced by one for the current version. At
+    most `max_runtimes` runtimes are kept, least recently used first out.
+    """
+
+    def __init__(self, max_runtimes: int = 64) -> None:
+        """Start with no runtimes; keep at most `max_runtimes`."""
+        self.max_runtimes = max_runtimes
+        self._runtimes: OrderedDict[Hashable, AgentRuntime] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def runtime(
+            self,
+            agent_cls: type,
+            prompt_name: str | None = None,
+            model_name: str = DEFAULT_MODEL,
+            llm: "BaseChatModel | None" = None,
+            tool_executor: ToolExecutor | None = None,
+            response_cache: LLMResponseCache | None = None,
+            checkpointer: "BaseCheckpointSaver | None" = None,
+            tools: Sequence[str] | None = None,
+            tool_selector: "ToolSelector | None" = None,
+            model_options: Mapping[str, Any] | None = None,
+            router: "ModelRouter | None" = None,
+        ) -> AgentRuntime:
+        """Return the shared runtime for this configuration, building it once."""
+        prompt_name = prompt_name or agent_cls.PROMPT_NAME
+        tools = tuple(tools or agent_cls.TOOLS)
+        # The runtime holds every object whose id() is in its key, so an id cannot
+        # be recycled while the entry exists; evicting the entry drops both
+        key = (
+            agent_cls,
+            prompt_name,
+            tools,
+            model_name,
+            id(llm),
+            id(tool_executor),
+            id(response_cache),
+            id(checkpointer),
+            id(tool_selector),
+            id(router),
+            json.dumps(model_options or {}, sort_keys=True, default=repr),
+        )
+        prompt_hash = PROMPTS.hash(prompt_name)
+        with self._lock:
+            runtime = self._runtimes.get(key)
+            if runtime is not None and runtime.prompt_hash == prompt_hash:
+                self._runtimes.move_to_end(key)
+                return runtime
+
+        runtime = AgentRuntime(
+            tools,
+            prompt_name,
+            model_name,
+            llm=llm,
+            tool_executor=tool_executor,
+            response_cache=response_cache,
+            checkpointer=checkpointer,
+            tool_selector=tool_selector,
+            model_options=model_options,
+            router=router,
+        )
+        with self._lock:
+            current = self._runtimes.get(key)
+            if current is not None and current.prompt_hash == runtime.prompt_hash:
+                # Another thread built it first
+                self._runtimes.move_to_end(key)
+                return current
+            # Replaces a runtime built from an outdated prompt
+            self._runtimes[key] = runtime
+            self._runtimes.move_to_end(key)
+            while len(self._runtimes) > self.max_runtimes:
+                self._runtimes.popitem(last=False)
+        return runtime
+
+    def create(
+            self,
+            agent_cls: type,
+            prompt_name: str | None = None,
+            model_name: str = DEFAULT_MODEL,
+            llm: "BaseChatModel | None" = None,
+            tool_executor: ToolExecutor | None = None,
+            response_cache: LLMResponseCache | None = None,
+            checkpointer: "BaseCheckpointSaver | None" = None,
+            tools: Sequence[str] | None = None,
+            tool_selector: "ToolSelector | None" = None,
+            model_options: Mapping[str, Any] | None = None,
+            router: "ModelRouter | None" = None,
+            **session_options: Any,  # noqa: ANN401
+        ) -> Any:  # noqa: ANN401
+        """Create a new session of `agent_cls` on the shared runtime.
+
+        `session_options` (e.g. `context_policy`, `session_id`, `store`) go to the
+        agent constructor.
+        """
+        runtime = self.runtime(
+            agent_cls,
+            prompt_name,
+            model_name,
+            llm=llm,
+            tool_executor=tool_executor,
+            response_cache=response_cache,
+            checkpointer=checkpointer,
+            tools=tools,
+            tool_selector=tool_selector,
+            model_options=model_options,
+            router=router,
+        )
+        return agent_cls(runtime=runtime, **session_options)
+
+    def clear(self) -> None:
+        """Forget every runtime; agents already created keep theirs."""
+        with self._lock:
+            self._runtimes.clear()
@@ -0,0 +1,282 @@
+"""Persistent conversation sessions.
+
+A conversation store keeps each session's message history, keyed by session ID, so
+histories survive worker restarts and idle sessions need not stay in RAM. Agents
+created with a `store` and `session_id` load their history on first access and, at
+the end of each turn, append only that turn's new messages. The system prompt is
+never stored; a reloaded session starts from the runtime's current prompt.
+
+`SQLiteConversationStore` is the local backend: one row per message, written with
+plain INSERTs. `MemoryConversationStore` has the same interface for tests and
+single-process use.
+
+Sessions can instead be persisted by a LangGraph checkpointer passed to the runtime
+(`AgentFactory.create(..., checkpointer=...)`), with the session ID as the thread ID.
+Checkpointers snapshot the full state on every step, so prefer a conversation store
+when histories are long.
+
+`SessionManager` hands out one agent per session ID, creating it lazily on the
+shared runtime and dropping sessions from memory when they go idle.
+
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Protocol
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from pyfunc_agent.context import ContextPolicy
+from pyfunc_agent.runtime import AgentFactory
+
+
+# ------------------------------------------------------------------------------
+#  STORES
+# ------------------------------------------------------------------------------
+class ConversationStore(Protocol):
+    """Interface of a conversation store.
+
+    Positions count the stored messages of a session from 0 (the system prompt is
+    not stored).
+    """
+
+    def load(self, session_id: str) -> list[BaseMessage]:
+        """Return the stored history of `session_id` (empty if unknown)."""
+
+    def append(self, session_id: str, start: int, messages: list[BaseMessage]) -> None:
+        """Store `messages` at positions `start`, `start + 1`, ..."""
+
+    def truncate(self, session_id: str, length: int) -> None:
+        """Drop every message of `session_id` from position `length` on."""
+
+    def delete(self, session_id: str) -> None:
+        """Drop the whole session."""
+
+    def sessions(self) -> list[str]:
+        """Return the IDs of every stored session."""
+
+
+class MemoryConversationStore:
+    """Conversation store in a dict, for tests and single-process use."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self._data: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> list[BaseMessage]:
+        """Return the stored history of `session_id` (empty if unknown)."""
+        with self._lock:
+            return messages_from_dict(self._data.get(session_id, []))
+
+    def append(self, session_id: str, start: int, messages: list[BaseMessage]) -> None:
+        """Store `messages` at positions `start`, `start + 1`, ..."""
+        with self._lock:
+            history = self._data.setdefault(session_id, [])
+            del history[start:]
+            history.extend(message_to_dict(m) for m in messages)
+
+    def truncate(self, session_id: str, length: int) -> None:
+        """Drop every message of `session_id` from position `length` on."""
+        with self._lock:
+            del self._data.get(session_id, [])[length:]
+
+    def delete(self, session_id: str) -> None:
+        """Drop the whole session."""
+        with self._lock:
+            self._data.pop(session_id, None)
+
+    def sessions(self) -> list[str]:
+        """Return the IDs of every stored session."""
+        with self._lock:
+            return list(self._data)
+
+
+class SQLiteConversationStore:
+    """Conversation store in a SQLite file, one row per message.
+
+    Messages are stored as JSON (`message_to_dict`). The file is opened in WAL
+    mode, so several worker processes can share it.
+    """
+
+    def __init__(self, path: str | Path, table: str = "messages") -> None:
+        """Open (or create) the message table in the SQLite file at `path`."""
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "session_id TEXT, position INTEGER, message TEXT, stored_at REAL, "
+                "PRIMARY KEY (session_id, position))"
+            )
+
+    def load(self, session_id: str) -> list[BaseMessage]:
+        """Return the stored history of `session_id` (empty if unknown)."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT message FROM {self.table} WHERE session_id = ? "
+                "ORDER BY position",
+                (session_id,),
+            ).fetchall()
+        return messages_from_dict([json.loads(row[0]) for row in rows])
+
+    def append(self, session_id: str, start: int, messages: list[BaseMessage]) -> None:
+        """Store `messages` at positions `start`, `start + 1`, ..."""
+        now = time.time()
+        rows = [
+            (session_id, start + i, json.dumps(message_to_dict(m)), now)
+            for i, m in enumerate(messages)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE session_id = ? AND position >= ?",
+                (session_id, start),
+            )
+            self._conn.executemany(
+                f"INSERT INTO {self.table} VALUES (?, ?, ?, ?)", rows
+            )
+
+    def truncate(self, session_id: str, length: int) -> None:
+        """Drop every message of `session_id` from position `length` on."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE session_id = ? AND position >= ?",
+                (session_id, length),
+            )
+
+    def delete(self, session_id: str) -> None:
+        """Drop the whole session."""
+        self.truncate(session_id, 0)
+
+    def sessions(self) -> list[str]:
+        """Return the IDs of every stored session."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT session_id FROM {self.table}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+# ------------------------------------------------------------------------------
+#  SESSION MANAGER
+# ------------------------------------------------------------------------------
+class SessionManager:
+    """One agent per session ID, kept in memory only while it is in use.
+
+    Agents are created on first `get` with a shared runtime from `factory`; their
+    history loads from the store when first needed. Sessions idle for longer than
+    `idle_ttl` seconds, or beyond the `max_sessions` most recently used, are dropped
+    from memory. Their history is already in the store, so the next `get` simply
+    recreates them. A session whose agent is in the middle of a turn is never
+    dropped: it stays in memory, possibly over the cap, until a later eviction.
+    """
+
+    def __init__(
+            self,
+            agent_cls: type,
+            store: ConversationStore | None = None,
+            factory: AgentFactory | None = None,
+            max_sessions: int | None = 1024,
+            idle_ttl: float | None = None,
+            context_policy: Callable[[], ContextPolicy] | None = None,
+            **runtime_options: Any,  # noqa: ANN401
+        ) -> None:
+        """Configure the manager.
+
+        Args:
+            agent_cls: Agent class to create, e.g. `MultiToolMathAgent`.
+            store: Where histories are kept. May be None only if a `checkpointer`
+                is passed in `runtime_options`.
+            factory: Factory sharing runtimes (a new one if None).
+            max_sessions: Most sessions kept in memory (None for no cap).
+            idle_ttl: Seconds after which an unused session leaves memory.
+            context_policy: Called once per session to build its context policy.
+            runtime_options: Passed to `AgentFactory.create`, e.g. `prompt_name`,
+                `llm` or `checkpointer`.
+        """
+        if store is None and runtime_options.get("checkpointer") is None:
+            raise ValueError("SessionManager needs a store or a checkpointer.")
+        self.agent_cls = agent_cls
+        self.store = store
+        self.factory = factory or AgentFactory()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.context_policy = context_policy
+        self.runtime_options = runtime_options
+
+        self._sessions: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Any:  # noqa: ANN401
+        """Return the agent for `session_id`, creating it if it is not in memory."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                agent = self.factory.create(
+                    self.agent_cls,
+                    session_id=session_id,
+                    store=self.store,
+                    context_policy=self.context_policy and self.context_policy(),
+                    **self.runtime_options,
+                )
+            else:
+                agent = entry[1]
+            self._sessions[session_id] = (now, agent)
+            self._evict(now, keep=session_id)
+        return agent
+
+    def evict_idle(self) -> int:
+        """Drop idle sessions from memory now; return how many were dropped."""
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def _evict(self, now: float, keep: str | None = None) -> int:
+        """Drop sessions over the cap or idle past `idle_ttl` (oldest first).
+
+        Sessions with a turn running are skipped, and so is `keep`, the session
+        being handed out.
+        """
+        dropped: list[str] = []
+        kept = len(self._sessions)
+        for session_id, (last_used, agent) in self._sessions.items():
+            over_cap = self.max_sessions is not None and kept > self.max_sessions
+            idle = self.idle_ttl is not None and now - last_used > self.idle_ttl
+            if not (over_cap or idle):
+                break
+            if agent.active_turns or session_id == keep:
+                continue
+            dropped.append(session_id)
+            kept -= 1
+        for session_id in dropped:
+            del self._sessions[session_id]
+        return len(dropped)
+
+    def drop(self, session_id: str) -> None:
+        """Drop `session_id` from memory; its stored history is kept."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def delete(self, session_id: str) -> None:
+        """Drop `session_id` from memory and from the store."""
+        self.drop(session_id)
+        if self.store is not None:
+            self.store.delete(session_id)
+
+    def __len__(self) -> int:
+        """Return the number of sessions in memory."""
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        """Return whether `session_id` is in memory."""
+        return session_id in self._sessions
@@ -5,278 +5,530 @@ agentic systems.
 
 """
 
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from langchain_core.tools import tool
-from langchain_ollama import ChatOllama
-from langgraph.graph import StateGraph, MessagesState, START
-from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_core.runnables import RunnableLambda
-
-from pyfunc_agent.tools import (
-    add_numbers,
-    multiply_numbers,
-    square_root,
-    exponential,
-    ln,
-)
+import time
+import uuid
+from collections.abc import AsyncIterator, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+from langchain_core.runnables import Runnable, RunnableConfig
 
 from pyfunc_agent.agent_attributes import AgentState
-from pyfunc_agent.utils import load_prompt_yaml
+from pyfunc_agent.batch import BatchResult, Timed, timed
+from pyfunc_agent.budgets import TurnBudget
+from pyfunc_agent.context import ContextPolicy, PromptSize
+from pyfunc_agent.llm_cache import LLMResponseCache
+from pyfunc_agent.metrics import TurnTrace, trace_turn
+from pyfunc_agent.runtime import DEFAULT_MODEL, AgentRuntime
+from pyfunc_agent.sessions import ConversationStore
+from pyfunc_agent.streaming import (
+    FinalAnswer,
+    StreamEvent,
+    astream_graph_events,
+    stream_graph_events,
+)
+from pyfunc_agent.tool_executor import ToolExecutor
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langgraph.graph.state import CompiledStateGraph
+
+    from pyfunc_agent.routing import ModelRouter
+    from pyfunc_agent.tool_selection import ToolSelector
 
 # ------------------------------------------------------------------------------
-#  TOOL WRAPPERS (must be at module level so @tool can register them)
+#  AGENT CLASSES
 # ------------------------------------------------------------------------------
-@tool
-def add_tool(a: float, b: float) -> float:
-    """Return a + b."""
-    print(f"[add_tool] called with a={a}, b={b}.")
-    return add_numbers(a, b)
+class BaseMathAgent:
+    """Shared session logic for the math agents.
+
+    An agent object is one conversation: its message history and context policy.
+    Everything else (model client, bound tools, compiled graph, system prompt) lives
+    in an `AgentRuntime` that many agents can share; see `AgentFactory`. Histories
+    can be persisted per session ID; see `pyfunc_agent.sessions`.
+
+    Every turn runs under a turn budget, `DEFAULT_TURN_BUDGET` unless one is passed
+    (see `pyfunc_agent.budgets`). This changes what older versions did: a turn that
+    keeps calling tools is cut off after 8 tool hops, or after repeating its calls
+    more than twice, and ends with a "stopped before finishing" answer instead of
+    LangGraph raising `GraphRecursionError`; a repeated call to a pure or memoized
+    tool is answered from its earlier result in the turn. Pass
+    `turn_budget=TurnBudget(max_hops=None, max_repeats=None, reuse_results=False)`
+    for the old behaviour.
+    """
 
+    PROMPT_NAME = "fizban.yaml"
+    TOOLS: tuple[str, ...] = ()
+    """Registered tool names or tags the agent binds (see `pyfunc_agent.registry`)."""
 
-@tool
-def multiply_tool(a: float, b: float) -> float:
-    """Return a * b."""
-    print(f"[multiply_tool] called with a={a}, b={b}.")
-    return multiply_numbers(a, b)
+    def __init__(
+            self,
+            prompt_name: str | None = None,
+            model_name: str = DEFAULT_MODEL,
+            llm: "BaseChatModel | None" = None,
+            context_policy: ContextPolicy | None = None,
+            tool_executor: ToolExecutor | None = None,
+            response_cache: LLMResponseCache | None = None,
+            runtime: AgentRuntime | None = None,
+            session_id: str | None = None,
+            store: ConversationStore | None = None,
+            tools: Sequence[str] | None = None,
+            tool_selector: "ToolSelector | None" = None,
+            turn_budget: TurnBudget | None = None,
+            model_options: Mapping[str, Any] | None = None,
+            router: "ModelRouter | None" = None,
+        ) -> None:
+        """Initialize tools, LLM, LangGraph workflow, and message history.
 
+        `prompt_name` defaults to the class's `PROMPT_NAME` and `tools`, a list of
+        registered tool names or tags (see `pyfunc_agent.registry`), to the class's
+        `TOOLS`.
 
-@tool
-def sqrt_tool(a: float) -> float:
-    """Return sqrt(a)."""
-    print(f"[sqrt_tool] called with a={a}.")
-    return square_root(a)
+        Pass `llm` to use an already constructed chat model (e.g. a fake model for
+        offline benchmarks) instead of building a `ChatOllama` for `model_name`.
+        `model_options` go to that `ChatOllama` (e.g. `keep_alive`, `num_ctx`; see
+        `pyfunc_agent.runtime.DEFAULT_MODEL_OPTIONS`).
 
+        Pass a `context_policy` (see `pyfunc_agent.context`) to bound the history
+        sent to the model on each hop. By default the whole history is sent.
 
-@tool
-def exp_tool(a: float) -> float:
-    """Return exp(a)."""
-    print(f"[exp_tool] called with a={a}.")
-    return exponential(a)
+        Pass a `turn_budget` (see `pyfunc_agent.budgets`) to change how many tool
+        hops, seconds and tokens one turn may spend before it is cut off. By default
+        a turn may take 8 tool hops and repeat its calls twice (see above).
 
+        Pass a `tool_executor` (see `pyfunc_agent.tool_executor`) to control how the
+        tool calls of one AIMessage run: sequentially, in a thread or process pool,
+        or on the event loop. By default LangGraph's `ToolNode` runs them.
 
-@tool
-def ln_tool(a: float) -> float:
-    """Return ln(a)."""
-    print(f"[ln_tool] called with a={a}.")
-    return ln(a)
+        Pass a `response_cache` (see `pyfunc_agent.llm_cache`) to answer repeated
+        requests without a model round trip. Answers cached under another prompt
+        file or tool set are never served.
 
+        Pass a `tool_selector` (see `pyfunc_agent.tool_selection`) to bind only the
+        tools relevant to each turn instead of every tool on every call.
 
-@tool
-def finish_tool(answer: str) -> str:
-    """A no-op “Finish” tool to unify the interface. It just echoes back the answer."""
-    return answer
+        Pass a `router` (see `pyfunc_agent.routing`) to answer easy turns with a
+        rules-based fast path or a smaller model, escalating to `model_name` only
+        when they decline or fail their checks.
 
-# ------------------------------------------------------------------------------
-#  AGENT CLASSES
-# ------------------------------------------------------------------------------
-class MultiToolMathAgent:
-    """Encapsulated multi-tool math agent (Fizban)."""
+        Pass a shared `runtime` (see `pyfunc_agent.runtime`) to skip building one;
+        the other runtime options are then ignored.
 
-    def __init__(
+        Pass a `session_id` and a conversation `store` (see `pyfunc_agent.sessions`)
+        to persist the history: it loads from the store on first access and each
+        turn appends its new messages. A runtime with a checkpointer persists the
+        history itself and only needs the `session_id`.
+        """
+        if runtime is None:
+            runtime = AgentRuntime(
+                tools or self.TOOLS,
+                prompt_name or self.PROMPT_NAME,
+                model_name,
+                llm=llm,
+                tool_executor=tool_executor,
+                response_cache=response_cache,
+                tool_selector=tool_selector,
+                model_options=model_options,
+                router=router,
+            )
+        if store is not None and runtime.checkpointer is not None:
+            raise ValueError("Use either a conversation store or a checkpointer.")
+        if session_id is None and (store is not None or runtime.checkpointer):
+            raise ValueError("A persisted session needs a session_id.")
+        self.runtime = runtime
+        self.context_policy = context_policy
+        self.turn_budget = turn_budget
+        self.session_id = session_id
+        self.store = store
+
+        # Initialize the message history with the shared SystemMessage; persisted
+        # sessions load theirs on first access.
+        self._messages: list[BaseMessage] | None = None
+        if store is None and runtime.checkpointer is None:
+            self._messages = [runtime.system_prompt]
+        # Number of leading messages already in the store or checkpoint
+        self._persisted = 0
+        # Timings of the latest turn (see `pyfunc_agent.metrics`)
+        self.last_trace: TurnTrace | None = None
+        # Size of the prompts sent, for the prefix-reuse metrics
+        self._prompt_size = PromptSize()
+        # Turns running right now; a `SessionManager` keeps the agent meanwhile
+        self.active_turns = 0
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        """The conversation history, starting with the system prompt."""
+        if self._messages is None:
+            self._messages = self._load()
+        return self._messages
+
+    @messages.setter
+    def messages(self, messages: list[BaseMessage]) -> None:
+        self._messages = messages
+
+    def _load(self) -> list[BaseMessage]:
+        """Return the persisted history of this session."""
+        if self.store is not None:
+            history = [self.runtime.system_prompt, *self.store.load(self.session_id)]
+            self._persisted = len(history)
+            return history
+
+        snapshot = self.graph.get_state(self._config())
+        history = list(snapshot.values.get("messages", []))
+        self._persisted = len(history)
+        return history or [self.runtime.system_prompt]
+
+    def _input_state(self) -> AgentState:
+        """Return the graph input for the turn just appended to the history."""
+        if self.runtime.checkpointer is None:
+            return {"messages": self.messages}
+        # The checkpoint already holds the start of the history
+        return {"messages": self.messages[self._persisted:]}
+
+    def _end_turn(self, messages: list[BaseMessage]) -> None:
+        """Adopt the graph's final history and persist the turn's new messages."""
+        self._messages = messages
+        if self.runtime.checkpointer is not None:
+            self._persisted = len(messages)
+        elif self.store is not None:
+            if len(messages) < self._persisted:
+                # History was rewritten (e.g. RemoveMessage): store it again
+                self._persisted = 1
+            # The system prompt (position 0) is not stored
+            self.store.append(
+                self.session_id, self._persisted - 1, messages[self._persisted:]
+            )
+            self._persisted = len(messages)
+
+    @property
+    def llm(self) -> Runnable:
+        """The runtime's chat model with tools bound."""
+        return self.runtime.llm
+
+    @property
+    def graph(self) -> "CompiledStateGraph":
+        """The runtime's compiled LangGraph workflow."""
+        return self.runtime.graph
+
+    @property
+    def tool_node(self) -> Runnable:
+        """The runtime's tools node."""
+        return self.runtime.tool_node
+
+    def _config(self) -> RunnableConfig:
+        """Return the run config carrying this session's state into the graph.
+
+        Build it when the turn starts: it times the turn's budget.
+        """
+        config: RunnableConfig = {
+            "configurable": {
+                "context_policy": self.context_policy,
+                "thread_id": self.session_id,
+                "turn_budget": self.turn_budget,
+                "turn_started": time.monotonic(),
+                "prompt_size": self._prompt_size,
+            }
+        }
+        if self.turn_budget is not None and self.turn_budget.recursion_limit:
+            config["recursion_limit"] = self.turn_budget.recursion_limit
+        return config
+
+    @contextmanager
+    def _turn(self) -> Iterator[None]:
+        """Count a turn as running for the duration of the block."""
+        self.active_turns += 1
+        try:
+            yield
+        finally:
+            self.active_turns -= 1
+
+    def _run(self, user_input: str) -> None:
+        """Append the question and run the graph, updating the history."""
+        with self._turn():
+            self.messages.append(HumanMessage(content=user_input))
+            graph = self.graph  # built outside the turn's timings on first use
+            with trace_turn() as self.last_trace:
+                result_state = graph.invoke(self._input_state(), self._config())
+                self._end_turn(result_state["messages"])
+
+    async def _arun(self, user_input: str) -> None:
+        """Async version of `_run`."""
+        with self._turn():
+            self.messages.append(HumanMessage(content=user_input))
+            graph = self.graph
+            with trace_turn() as self.last_trace:
+                result_state = await graph.ainvoke(
+                    self._input_state(), self._config()
+                )
+                self._end_turn(result_state["messages"])
+
+    def _reply(self) -> str:
+        """Return the text of the final AIMessage."""
+        last_msg = self.messages[-1]
+        if isinstance(last_msg, AIMessage):
+            return last_msg.content
+
+        return ""  # In case something odd happened
+
+    def _answer(self, turn: list[BaseMessage]) -> str | list[str]:
+        """Return what `chat` returns for a turn's messages: the reply text."""
+        if turn and isinstance(turn[-1], AIMessage):
+            return turn[-1].content
+        return ""
+
+    def _batch_inputs(
             self,
-            prompt_name: str = "fizban.yaml",
-            model_name: str = "mix_77/gemma3-qat-tools:12b"
-        ) -> None:
-        """Initialize tools, LLM, LangGraph workflow, and message history."""
-        # 2.1) Build ChatOllama and bind all tools
-        self.llm = ChatOllama(model=model_name, temperature=0.0)
-        self.llm = self.llm.bind_tools(
-            [
-                add_tool,
-                multiply_tool,
-                sqrt_tool,
-                exp_tool,
-                ln_tool,
-            ]
-        )
-
-        # 2.2) Build the same LangGraph graph as before, but using methods of this class
-        self.tool_node = ToolNode(
-            [
-                add_tool,
-                multiply_tool,
-                sqrt_tool,
-                exp_tool,
-                ln_tool,
-            ]
-        )
-
-        builder = StateGraph(MessagesState)
-        # Node “agent” calls self.agent_node
-        builder.add_node("agent", RunnableLambda(self.agent_node))
-        builder.add_node("tools", self.tool_node)
-        builder.add_edge(START, "agent")
-        builder.add_conditional_edges("agent", tools_condition)
-        builder.add_edge("tools", "agent")
-        self.graph = builder.compile()
-
-        # 2.3) Initialize the message history with a SystemMessage
-        system_text = load_prompt_yaml(prompt_name)
-        system_prompt = SystemMessage(content=system_text)
-
-        self.messages: list[HumanMessage | SystemMessage | AIMessage] = [
-            system_prompt
+            prompts: list[str],
+            max_concurrency: int,
+        ) -> tuple[list[AgentState], list[RunnableConfig]]:
+        """Return an isolated input state and config for every prompt."""
+        inputs: list[AgentState] = [
+            {"messages": [self.runtime.system_prompt, HumanMessage(content=prompt)]}
+            for prompt in prompts
+        ]
+        configs: list[RunnableConfig] = [
+            {
+                "max_concurrency": max_concurrency,
+                # Items run without the checkpointer (see `AgentRuntime.batch_graph`);
+                # the thread ID only labels their events. Items queue behind each
+                # other, so only the hop and token budgets apply
+                "configurable": {
+                    "thread_id": f"batch-{uuid.uuid4().hex}",
+                    "turn_budget": self.turn_budget,
+                },
+            }
+            for _ in prompts
         ]
+        return inputs, configs
 
-    def agent_node(self, state: AgentState) -> AgentState:
-        """Node method.
+    def _batch_results(
+            self,
+            prompts: list[str],
+            outputs: list[Timed],
+        ) -> list[BatchResult]:
+        """Pair each prompt with its answer, timing and error."""
+        results = []
+        for i, (prompt, (state, seconds, error)) in enumerate(zip(prompts, outputs)):
+            messages = state["messages"] if state is not None else []
+            results.append(
+                BatchResult(
+                    index=i,
+                    prompt=prompt,
+                    answer=self._answer(messages[1:]) if error is None else None,
+                    seconds=seconds,
+                    error=error,
+                    messages=messages,
+                )
+            )
+        return results
+
+    def batch_chat(
+            self,
+            prompts: list[str],
+            max_concurrency: int = 8,
+        ) -> list[BatchResult]:
+        """Answer many independent prompts.
+
+        Each prompt runs in its own state (system prompt plus the question), so the
+        agent's history and context policy are neither used nor changed, and nothing
+        is written to the runtime's checkpointer. Up to `max_concurrency` prompts
+        run at once in a thread pool; set it to the number of requests the model
+        server can serve in parallel.
+
+        Returns one `BatchResult` per prompt, in input order, with the same answer
+        `chat` would give, the item's wall time and its error, if any.
+        """
+        inputs, configs = self._batch_inputs(prompts, max_concurrency)
+        outputs = timed(self.runtime.batch_graph).batch(inputs, configs)
+        return self._batch_results(prompts, outputs)
 
-        The “node” function for LangGraph: given a state containing messages,
-        invoke the LLM and return updated messages.
+    async def abatch_chat(
+            self,
+            prompts: list[str],
+            max_concurrency: int = 8,
+        ) -> list[BatchResult]:
+        """Async version of `batch_chat`, running the prompts on the event loop."""
+        inputs, configs = self._batch_inputs(prompts, max_concurrency)
+        outputs = await timed(self.runtime.batch_graph).abatch(inputs, configs)
+        return self._batch_results(prompts, outputs)
+
+    def _final_event(self, event: FinalAnswer, before_len: int) -> FinalAnswer:
+        """Record the finished turn; subclasses may decorate the closing event."""
+        self._end_turn(event.messages)
+        return event
+
+    def stream_chat(self, user_input: str) -> Iterator[StreamEvent]:
+        """Streaming chat.
+
+        Like `chat`, but yields token deltas and tool-call events while the graph
+        runs, ending with a `FinalAnswer` holding the reply text and the turn's
+        `TurnTrace`.
         """
-        messages = state["messages"]
-        response = self.llm.invoke(messages)
-        return {"messages": messages + [response]}
+        with self._turn():
+            before_len = len(self.messages)
+            self.messages.append(HumanMessage(content=user_input))
+
+            final = None
+            graph = self.graph
+            with trace_turn() as self.last_trace:
+                for event in stream_graph_events(
+                    graph, self._input_state(), self._config()
+                ):
+                    if isinstance(event, FinalAnswer):
+                        final = self._final_event(event, before_len)
+                    else:
+                        yield event
+        if final is not None:
+            yield replace(final, timings=self.last_trace)
 
-    def chat(self, user_input: str) -> str:
+    async def astream_chat(self, user_input: str) -> AsyncIterator[StreamEvent]:
+        """Async version of `stream_chat`."""
+        with self._turn():
+            before_len = len(self.messages)
+            self.messages.append(HumanMessage(content=user_input))
+
+            final = None
+            graph = self.graph
+            with trace_turn() as self.last_trace:
+                async for event in astream_graph_events(
+                    graph, self._input_state(), self._config()
+                ):
+                    if isinstance(event, FinalAnswer):
+                        final = self._final_event(event, before_len)
+                    else:
+                        yield event
+        if final is not None:
+            yield replace(final, timings=self.last_trace)
+
+
+class MultiToolMathAgent(BaseMathAgent):
+    """Encapsulated multi-tool math agent (Fizban)."""
+
+    PROMPT_NAME = "fizban.yaml"
+    TOOLS = ("math",)
+
+    def chat(
+            self,
+            user_input: str,
+            return_trace: bool = False,
+        ) -> str | tuple[str, TurnTrace]:
         """Pass HumanMessage.
 
         Send a new HumanMessage(user_input) to the agent, run the graph,
-        and return the agent's reply text.
+        and return the agent's reply text. With `return_trace`, return the reply
+        and the turn's `TurnTrace` (see `pyfunc_agent.metrics`).
         """
-        # 1) Append new human question
-        self.messages.append(HumanMessage(content=user_input))
-
-        # 2) Invoke the LangGraph workflow
-        input_state: AgentState = {"messages": self.messages}
-        result_state = self.graph.invoke(input_state)
+        self._run(user_input)
+        if return_trace:
+            return self._reply(), self.last_trace
+        return self._reply()
 
-        # 3) Update the stored messages
-        self.messages = result_state["messages"]
-
-        # 4) Extract just the final AIMessage and return its text
-        last_msg = self.messages[-1]
-        if isinstance(last_msg, AIMessage):
-            return last_msg.content
+    async def achat(
+            self,
+            user_input: str,
+            return_trace: bool = False,
+        ) -> str | tuple[str, TurnTrace]:
+        """Async version of `chat`.
 
-        return ""  # In case something odd happened
+        Runs the graph with `ainvoke`, so many agents can hold conversations
+        concurrently on one event loop.
+        """
+        await self._arun(user_input)
+        if return_trace:
+            return self._reply(), self.last_trace
+        return self._reply()
 
 
-class ReActMathAgent:
+class ReActMathAgent(BaseMathAgent):
     """Encapsulated ReAct math agent.
 
     The only changes that make this a ReAct agent is the system prompt structure which
     defines the ReAct process and the chat method that returns the full reasoning trace.
     """
 
-    def __init__(
-            self,
-            prompt_name: str = "react_bot.yaml",
-            model_name: str = "mix_77/gemma3-qat-tools:12b"
-        ) -> None:
-        """Initialize tools, LLM, LangGraph workflow, and message history."""
-        # 2.1) Build ChatOllama and bind all tools
-        self.llm = ChatOllama(model=model_name, temperature=0.0)
-        self.llm = self.llm.bind_tools(
-            [
-                add_tool,
-                multiply_tool,
-                sqrt_tool,
-                exp_tool,
-                ln_tool,
-                finish_tool,
-            ]
-        )
-
-        # 2.2) Build the same LangGraph graph as before, but using methods of this class
-        self.tool_node = ToolNode(
-            [
-                add_tool,
-                multiply_tool,
-                sqrt_tool,
-                exp_tool,
-                ln_tool,
-                finish_tool,
-            ]
-        )
-
-        builder = StateGraph(MessagesState)
-        # Node “agent” calls self.agent_node
-        builder.add_node("agent", RunnableLambda(self.agent_node))
-        builder.add_node("tools", self.tool_node)
-        builder.add_edge(START, "agent")
-        builder.add_conditional_edges("agent", tools_condition)
-        builder.add_edge("tools", "agent")
-        self.graph = builder.compile()
-
-        # 2.3) Initialize the message history with a SystemMessage
-        system_text = load_prompt_yaml(prompt_name)
-        system_prompt = SystemMessage(content=system_text)
-
-        self.messages: list[HumanMessage | SystemMessage | AIMessage] = [
-            system_prompt
-        ]
-
-    def agent_node(self, state: AgentState) -> AgentState:
-        """Node method.
-
-        The “node” function for LangGraph: given a state containing messages,
-        invoke the LLM and return updated messages.
-        """
-        messages = state["messages"]
-        response = self.llm.invoke(messages)
-        return {"messages": messages + [response]}
+    PROMPT_NAME = "react_bot.yaml"
+    TOOLS = ("math", "finish_tool")
 
     def chat(
             self,
             user_input: str,
-        ) -> list[str]:
-            """Full ReAct trace return.
-
-            Send a new HumanMessage, run the LangGraph workflow, and return the full
-            REACT trace.
-
-            Instead of returning only the final AIMessage.content, this method returns a
-            list of strings, each string corresponding to one step in the
-            *Thought / Action / Observation / … / Final Answer* chain for that single
-            query.
-            """
-            # 1) Record how many messages we have so far
-            before_len = len(self.messages)
+            return_trace: bool = False,
+        ) -> list[str] | tuple[list[str], TurnTrace]:
+        """Full ReAct trace return.
+
+        Send a new HumanMessage, run the LangGraph workflow, and return the full
+        REACT trace.
+
+        Instead of returning only the final AIMessage.content, this method returns a
+        list of strings, each string corresponding to one step in the
+        *Thought / Action / Observation / … / Final Answer* chain for that single
+        query. With `return_trace`, also return the turn's timings as a
+        `TurnTrace` (see `pyfunc_agent.metrics`).
+        """
+        # 1) Record how many messages we have so far
+        before_len = len(self.messages)
 
-            # 2) Append the new question
-            self.messages.append(HumanMessage(content=user_input))
+        # 2) Run the LangGraph workflow on the new question
+        self._run(user_input)
 
-            # 3) Run the LangGraph workflow
-            input_state: AgentState = {"messages": self.messages}
-            result_state = self.graph.invoke(input_state)
-
-            # 4) Update the stored messages
-            self.messages = result_state["messages"]
-
-            # 5) Extract only the “new” messages (from before_len onward)
-            new_msgs = self.messages[before_len:]
-
-            # 6) Format each message as a human-readable string, preserving tool calls
-            trace: list[str] = []
-            for msg in new_msgs:
-                if isinstance(msg, SystemMessage):
-                    # (We generally won’t see a new SystemMessage here—only at init time)
-                    trace.append(f"System: {msg.content}")
-                elif isinstance(msg, HumanMessage):
-                    trace.append(f"You: {msg.content}")
-                elif isinstance(msg, AIMessage):
-                    func_call = msg.additional_kwargs.get("function_call")
-                    if func_call:
-                        # This AIMessage is a tool-call request
-                        name = func_call["name"]
-                        args = func_call["arguments"]
-                        # e.g. "Action: sqrt_tool(a=256)"
-                        arg_str = ", ".join(f"{k}={v}" for k, v in args.items())
-                        trace.append(f"Action: {name}({arg_str})")
-                    else:
-                        content = msg.content.strip()
-                        # Distinguish “Thought: …” vs “Observation: …” vs final answer
-                        if content.startswith("Thought:"):
-                            trace.append(content)  # already "Thought: <…>"
-                        elif content.startswith("Observation:"):
-                            trace.append(content)  # already "Observation: <…>"
-                        else:
-                            # Anything else is the final answer string
-                            trace.append(f"Answer: {content}")
-                else:
-                    # Just in case some other type appears
-                    text = getattr(msg, "content", "")
-                    trace.append(f"{type(msg).__name__}: {text}")
+        # 3) Format only the “new” messages (from before_len onward)
+        steps = self._format_trace(self.messages[before_len:])
+        return (steps, self.last_trace) if return_trace else steps
 
-            return trace
+    async def achat(
+            self,
+            user_input: str,
+            return_trace: bool = False,
+        ) -> list[str] | tuple[list[str], TurnTrace]:
+        """Async version of `chat`, returning the same ReAct trace."""
+        before_len = len(self.messages)
+        await self._arun(user_input)
+        steps = self._format_trace(self.messages[before_len:])
+        return (steps, self.last_trace) if return_trace else steps
+
+    def _answer(self, turn: list[BaseMessage]) -> list[str]:
+        """Return the ReAct trace of a turn, as `chat` does."""
+        return self._format_trace(turn)
+
+    def _final_event(self, event: FinalAnswer, before_len: int) -> FinalAnswer:
+        """Attach the same trace `chat` returns to the closing event."""
+        self._end_turn(event.messages)
+        return replace(event, trace=self._format_trace(self.messages[before_len:]))
+
+    @staticmethod
+    def _format_trace(new_msgs: list[BaseMessage]) -> list[str]:
+        """Format each message as a human-readable string, preserving tool calls."""
+        trace: list[str] = []
+        for msg in new_msgs:
+            if isinstance(msg, SystemMessage):
+                # (We generally won’t see a new SystemMessage here—only at init time)
+                trace.append(f"System: {msg.content}")
+            elif isinstance(msg, HumanMessage):
+                trace.append(f"You: {msg.content}")
+            elif isinstance(msg, AIMessage):
+                func_call = msg.additional_kwargs.get("function_call")
+                if func_call:
+                    # This AIMessage is a tool-call request
+                    name = func_call["name"]
+                    args = func_call["arguments"]
+                    # e.g. "Action: sqrt_tool(a=256)"
+                    arg_str = ", ".join(f"{k}={v}" for k, v in args.items())
+                    trace.append(f"Action: {name}({arg_str})")
+                else:
+                    content = msg.content.strip()
+                    # Distinguish “Thought: …” vs “Observation: …” vs final answer
+                    if content.startswith("Thought:"):
+                        trace.append(content)  # already "Thought: <…>"
+                    elif content.startswith("Observation:"):
+                        trace.append(content)  # already "Observation: <…>"
+                    else:
+                        # Anything else is the final answer string
+                        trace.append(f"Answer: {content}")
+            else:
+                # Just in case some other type appears
+                text = getattr(msg, "content", "")
+                trace.append(f"{type(msg).__name__}: {text}")
+
+        return trace
@@ -0,0 +1,137 @@
+"""Streaming events for agents.
+
+Turns LangGraph's `messages` and `updates` stream modes into a small set of typed
+events: token deltas from the model, tool calls starting and finishing, and the final
+answer. The graph is expected to follow the layout used by the agents in this
+package, with the model in an `"agent"` node and tools in a `"tools"` node.
+
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from pyfunc_agent.agent_attributes import AgentState
+
+if TYPE_CHECKING:
+    from langgraph.graph.state import CompiledStateGraph
+
+    from pyfunc_agent.metrics import TurnTrace
+
+STREAM_MODES = ["messages", "updates", "values"]
+
+
+@dataclass(frozen=True)
+class TokenDelta:
+    """A piece of text generated by the model."""
+    text: str
+
+
+@dataclass(frozen=True)
+class ToolCallStart:
+    """The model requested a tool call."""
+    name: str
+    args: dict[str, Any]
+    call_id: str
+
+
+@dataclass(frozen=True)
+class ToolCallEnd:
+    """A tool call finished; `result` is the ToolMessage content."""
+    name: str
+    call_id: str
+    result: str
+    status: str = "success"
+
+
+@dataclass(frozen=True)
+class FinalAnswer:
+    """The turn is over.
+
+    `messages` is the full history after the turn. `trace` is filled in by agents that
+    report a reasoning trace (see `ReActMathAgent`), `timings` by agents with the
+    turn's `TurnTrace` (see `pyfunc_agent.metrics`).
+    """
+    content: str
+    messages: list[BaseMessage] = field(repr=False)
+    trace: list[str] = field(default_factory=list)
+    timings: "TurnTrace | None" = field(default=None, repr=False)
+
+
+StreamEvent = TokenDelta | ToolCallStart | ToolCallEnd | FinalAnswer
+
+
+def _events(mode: str, payload: Any) -> Iterator[StreamEvent]:  # noqa: ANN401
+    """Translate one LangGraph stream part into events."""
+    if mode == "messages":
+        msg, metadata = payload
+        if (
+            isinstance(msg, AIMessage)
+            and metadata.get("langgraph_node") == "agent"
+            and isinstance(msg.content, str)
+            and msg.content
+        ):
+            yield TokenDelta(text=msg.content)
+
+    elif mode == "updates":
+        for update in payload.values():
+            for msg in (update or {}).get("messages", []):
+                if isinstance(msg, AIMessage):
+                    for call in msg.tool_calls:
+                        yield ToolCallStart(
+                            name=call["name"], args=call["args"], call_id=call["id"]
+                        )
+                elif isinstance(msg, ToolMessage):
+                    yield ToolCallEnd(
+                        name=msg.name or "",
+                        call_id=msg.tool_call_id,
+                        result=str(msg.content),
+                        status=msg.status,
+                    )
+
+
+def _final_answer(state: AgentState) -> FinalAnswer:
+    """Build the closing event from the final graph state."""
+    messages = state["messages"]
+    last_msg = messages[-1]
+    content = last_msg.content if isinstance(last_msg, AIMessage) else ""
+    return FinalAnswer(content=content, messages=messages)
+
+
+def stream_graph_events(
+        graph: "CompiledStateGraph",
+        input_state: AgentState,
+        config: RunnableConfig | None = None,
+    ) -> Iterator[StreamEvent]:
+    """Run `graph` on `input_state`, yielding events as they happen.
+
+    The last event is always a `FinalAnswer`.
+    """
+    state = input_state
+    for mode, payload in graph.stream(input_state, config, stream_mode=STREAM_MODES):
+        if mode == "values":
+            state = payload
+        else:
+            yield from _events(mode, payload)
+    yield _final_answer(state)
+
+
+async def astream_graph_events(
+        graph: "CompiledStateGraph",
+        input_state: AgentState,
+        config: RunnableConfig | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+    """Async version of `stream_graph_events`."""
+    state = input_state
+    async for mode, payload in graph.astream(
+        input_state, config, stream_mode=STREAM_MODES
+    ):
+        if mode == "values":
+            state = payload
+        else:
+            for event in _events(mode, payload):
+                yield event
+    yield _final_answer(state)
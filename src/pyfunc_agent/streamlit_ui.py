@@ -0,0 +1,407 @@
+"""Streamlit integration: shared agent workers and non-blocking chat turns.
+
+A Streamlit script reruns top to bottom on every interaction, in the thread of the
+browser session. Calling `agent.chat()` there (or in an `on_change` callback) blocks
+the page until the whole agent loop is done. This module moves turns off the script
+thread:
+
+- `worker_pool()` returns the process-wide `AgentWorkerPool`, shared by every
+  browser session through `st.cache_resource`. Its `AgentFactory` builds each
+  agent configuration's runtime (model client, compiled graph) once.
+- `session_agent(...)` creates a browser session's agent on the shared runtime.
+- `AgentWorkerPool.submit(agent, prompt)` runs the turn's `stream_chat` on a
+  background thread and returns a `TurnHandle` at once.
+- `live_turn(handle)` draws the turn's streamed tokens and tool calls in a
+  fragment that reruns on its own while the turn runs, then reruns the page once
+  the turn is done.
+- `session_history()` keeps the session's finished turns as a `ChatHistory`:
+  each turn is formatted once, when it is added, and a rerun only draws the most
+  recent page of turns, so rerun time stays flat as the conversation grows.
+
+A typical page:
+
+    pool = worker_pool()
+    agent = session_agent(MultiToolMathAgent, prompt_name="calc_bot.yaml")
+
+    def send() -> None:
+        st.session_state.turn = pool.submit(agent, st.session_state.user_input)
+
+    history = session_history()
+    turn = st.session_state.get("turn")
+    if turn is not None and turn.poll():
+        history.add_turn(turn)
+        st.session_state.turn = None
+    history.render()
+    if st.session_state.get("turn") is not None:
+        live_turn(st.session_state.turn)
+    st.text_input("Ask", key="user_input", on_change=send)
+
+Only the functions drawing on the page import `streamlit` (the `ui` extra);
+`AgentWorkerPool` and `TurnHandle` work without it.
+
+"""
+
+import functools
+import queue
+import threading
+import weakref
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from pyfunc_agent.runtime import AgentFactory
+from pyfunc_agent.streaming import (
+    FinalAnswer,
+    StreamEvent,
+    TokenDelta,
+    ToolCallEnd,
+    ToolCallStart,
+)
+
+# Concurrent turns per process; match the model server's parallel request limit
+DEFAULT_WORKERS = 4
+# Seconds between redraws of a running turn
+POLL_INTERVAL = 0.1
+CURSOR = "▌"
+# Finished turns drawn per page of history
+DEFAULT_PAGE_SIZE = 20
+
+
+class TurnHandle:
+    """A chat turn running on a worker thread, read from the Streamlit script."""
+
+    def __init__(self, prompt: str) -> None:
+        """Start with no events; the pool runs the turn."""
+        self.prompt = prompt
+        self.events: list[StreamEvent] = []
+        """Every event read by `poll` so far."""
+        self.final: FinalAnswer | None = None
+        self.error: BaseException | None = None
+        self._queue: queue.SimpleQueue[StreamEvent] = queue.SimpleQueue()
+        self._finished = threading.Event()
+
+    def _run(self, events: Callable[[], Iterable[StreamEvent]]) -> None:
+        """Worker thread: queue the turn's events as they happen."""
+        try:
+            for event in events():
+                self._queue.put(event)
+        except Exception as e:
+            # Shown on the page by whoever reads the handle
+            self.error = e
+        finally:
+            self._finished.set()
+
+    @property
+    def done(self) -> bool:
+        """Whether the turn is over and `poll` has read all of its events."""
+        return self._finished.is_set() and self._queue.empty()
+
+    def poll(self) -> bool:
+        """Read the events queued since the last call; return `done`."""
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.events.append(event)
+            if isinstance(event, FinalAnswer):
+                self.final = event
+        return self.done
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the turn is over, read its events and return `done`."""
+        self._finished.wait(timeout)
+        return self.poll()
+
+
+class AgentWorkerPool:
+    """Creates agents on shared runtimes and runs their turns in the background.
+
+    One pool serves every browser session of a Streamlit server; see
+    `worker_pool`.
+    """
+
+    def __init__(
+            self,
+            max_workers: int = DEFAULT_WORKERS,
+            factory: AgentFactory | None = None,
+        ) -> None:
+        """Run up to `max_workers` turns at once, building agents with `factory`."""
+        self.factory = factory or AgentFactory()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pyfunc-agent"
+        )
+        # The running turn of each agent: one conversation runs one turn at a time
+        self._running: weakref.WeakKeyDictionary[Any, TurnHandle] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def create(self, agent_cls: type, **options: Any) -> Any:  # noqa: ANN401
+        """Create an agent on the shared runtime; see `AgentFactory.create`."""
+        return self.factory.create(agent_cls, **options)
+
+    def submit(self, agent: Any, prompt: str) -> TurnHandle:  # noqa: ANN401
+        """Start `agent.stream_chat(prompt)` in the background.
+
+        Raises RuntimeError if the agent's previous turn is still running.
+        """
+        with self._lock:
+            running = self._running.get(agent)
+            if running is not None and not running._finished.is_set():
+                raise RuntimeError("The agent is still answering its last prompt.")
+            handle = self.submit_stream(lambda: agent.stream_chat(prompt), prompt)
+            self._running[agent] = handle
+        return handle
+
+    def submit_stream(
+            self,
+            events: Callable[[], Iterable[StreamEvent]],
+            prompt: str = "",
+        ) -> TurnHandle:
+        """Run any event stream (e.g. `stream_graph_events(...)`) in the background.
+
+        `events` is called on the worker thread.
+        """
+        handle = TurnHandle(prompt)
+        self._executor.submit(handle._run, events)
+        return handle
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads, after the running turns if `wait`."""
+        self._executor.shutdown(wait=wait)
+
+
+# ------------------------------------------------------------------------------
+#  STREAMLIT
+# ------------------------------------------------------------------------------
+def _new_pool(max_workers: int) -> AgentWorkerPool:
+    return AgentWorkerPool(max_workers)
+
+
+@functools.cache
+def _cached_pool() -> Callable[[int], AgentWorkerPool]:
+    """Return the pool constructor wrapped in `st.cache_resource`."""
+    import streamlit as st
+
+    return st.cache_resource(show_spinner=False)(_new_pool)
+
+
+def worker_pool(max_workers: int = DEFAULT_WORKERS) -> AgentWorkerPool:
+    """Return the pool shared by every browser session of this server."""
+    return _cached_pool()(max_workers)
+
+
+def session_agent(
+        agent_cls: type,
+        key: str = "agent",
+        pool: AgentWorkerPool | None = None,
+        **options: Any,  # noqa: ANN401
+    ) -> Any:  # noqa: ANN401
+    """Return this browser session's agent, created on first use.
+
+    The agent is kept in `st.session_state[key]`; `options` go to
+    `AgentWorkerPool.create`.
+    """
+    import streamlit as st
+
+    if key not in st.session_state:
+        st.session_state[key] = (pool or worker_pool()).create(agent_cls, **options)
+    return st.session_state[key]
+
+
+def _call_text(event: ToolCallStart) -> str:
+    args = ", ".join(f"{k}={v}" for k, v in event.args.items())
+    return f"{event.name}({args})"
+
+
+def render_reply(handle: TurnHandle, speaker: str = "Agent") -> None:
+    """Draw a turn so far: tool calls as captions, then the reply being written."""
+    import streamlit as st
+
+    reply = ""
+    for event in handle.events:
+        if isinstance(event, TokenDelta):
+            reply += event.text
+        elif isinstance(event, ToolCallStart):
+            st.caption(f"Calling `{_call_text(event)}`…")
+        elif isinstance(event, ToolCallEnd):
+            st.caption(f"`{event.name}` returned {event.result}")
+            # The model starts a fresh message after each tool hop
+            reply = ""
+        elif isinstance(event, FinalAnswer):
+            reply = event.content
+    cursor = "" if handle.done else CURSOR
+    st.markdown(f"**{speaker}:** {reply}{cursor}")
+
+
+def react_steps(handle: TurnHandle) -> list[str]:
+    """Return a ReAct turn's steps so far; the agent's own trace once it is done."""
+    if handle.final is not None:
+        return handle.final.trace
+    steps: list[str] = []
+    current = ""
+    for event in handle.events:
+        if isinstance(event, TokenDelta):
+            current += event.text
+        elif isinstance(event, ToolCallStart):
+            if current.strip():
+                steps.append(current.strip())
+            current = ""
+            steps.append(f"Action: {_call_text(event)}")
+        elif isinstance(event, ToolCallEnd):
+            steps.append(f"Observation: {event.result}")
+    return [*steps, current] if current.strip() else steps
+
+
+def render_react_trace(handle: TurnHandle) -> None:
+    """Draw a ReAct turn's steps so far as a code block."""
+    import streamlit as st
+
+    cursor = "" if handle.done else CURSOR
+    st.markdown("```\n" + "\n\n".join(react_steps(handle)) + f"{cursor}\n```")
+
+
+def live_turn(
+        handle: TurnHandle,
+        render: Callable[[TurnHandle], None] = render_reply,
+        poll_interval: float = POLL_INTERVAL,
+    ) -> None:
+    """Draw a running turn with `render`, refreshing it every `poll_interval`.
+
+    Only this fragment reruns while the turn runs, so the rest of the page stays
+    responsive. Once the turn is done the whole page reruns, to move the turn into
+    the history.
+    """
+    import streamlit as st
+
+    @st.fragment(run_every=poll_interval)
+    def refresh() -> None:
+        done = handle.poll()
+        st.markdown(f"**You:** {handle.prompt}")
+        render(handle)
+        if handle.error is not None:
+            st.error(f"The agent failed: {handle.error}")
+        if done:
+            st.rerun()
+
+    refresh()
+
+
+# ------------------------------------------------------------------------------
+#  HISTORY
+# ------------------------------------------------------------------------------
+def format_message(msg: BaseMessage, speaker: str = "Agent") -> str:
+    """Return the markdown of one history message."""
+    if isinstance(msg, SystemMessage):
+        return f"**System:** {msg.content}"
+    if isinstance(msg, HumanMessage):
+        return f"**You:** {msg.content}"
+    if isinstance(msg, AIMessage):
+        lines = [f"**{speaker}:** {msg.content}"] if msg.content else []
+        for call in msg.tool_calls:
+            args = ", ".join(f"{k}={v}" for k, v in call["args"].items())
+            lines.append(f"**{speaker} (tool call):** `{call['name']}({args})`")
+        return "\n\n".join(lines)
+    return f"**{type(msg).__name__}:** {msg.content}"
+
+
+class ChatHistory:
+    """A session's finished turns as markdown, drawn a page at a time.
+
+    Each turn is formatted once, when it is added. A rerun draws one markdown
+    element per turn on the visible pages (the latest `page_size` turns until the
+    user asks for earlier ones), and the system prompt only on request, so its cost
+    does not grow with the length of the conversation.
+    """
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        """Start empty, showing one page of `page_size` turns."""
+        self.page_size = page_size
+        self.pages = 1
+        self.system: str | None = None
+        """Markdown of the system prompt, if `sync` saw one."""
+        self.turns: list[str] = []
+        """Markdown of each finished turn, oldest first."""
+        # Number of messages already formatted by `sync`
+        self._seen = 0
+
+    def __len__(self) -> int:
+        """Return the number of turns."""
+        return len(self.turns)
+
+    def add(self, markdown: str) -> None:
+        """Add a finished turn's markdown."""
+        self.turns.append(markdown)
+
+    def add_turn(
+            self,
+            handle: TurnHandle,
+            speaker: str = "Agent",
+            trace: bool = False,
+        ) -> None:
+        """Add a finished turn from its handle.
+
+        The turn shows the reply, or with `trace` the agent's ReAct trace.
+        """
+        if handle.final is None:
+            body = f"**Error:** {handle.error}"
+        elif trace:
+            body = "```\n" + "\n\n".join(handle.final.trace) + "\n```"
+        else:
+            body = f"**{speaker}:** {handle.final.content}"
+        self.add(f"**You:** {handle.prompt}\n\n{body}")
+
+    def sync(self, messages: list[BaseMessage], speaker: str = "Agent") -> None:
+        """Add the messages appended to `messages` since the last call.
+
+        Each `HumanMessage` starts a turn; a history that got shorter is formatted
+        again from the start.
+        """
+        if len(messages) < self._seen:
+            self.system = None
+            self.turns.clear()
+            self._seen = 0
+        for msg in messages[self._seen:]:
+            text = format_message(msg, speaker)
+            if isinstance(msg, SystemMessage):
+                self.system = text
+            elif isinstance(msg, HumanMessage) or not self.turns:
+                self.turns.append(text)
+            elif text:
+                self.turns[-1] += "\n\n" + text
+        self._seen = len(messages)
+
+    def render(self, key: str = "history") -> None:
+        """Draw the visible turns; `key` tells several histories' widgets apart."""
+        import streamlit as st
+
+        if self.system is not None and st.toggle(
+            "Show system prompt", key=f"{key}_system"
+        ):
+            st.markdown(self.system)
+
+        shown = self.pages * self.page_size
+        hidden = len(self.turns) - shown
+        if hidden > 0 and st.button(
+            f"Show {min(hidden, self.page_size)} earlier turns ({hidden} hidden)",
+            key=f"{key}_earlier",
+        ):
+            self.pages += 1
+            shown += self.page_size
+        for turn in self.turns[max(len(self.turns) - shown, 0):]:
+            st.markdown(f"{turn}\n\n---")
+
+
+def session_history(
+        key: str = "history",
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> ChatHistory:
+    """Return this browser session's `ChatHistory`, created on first use."""
+    import streamlit as st
+
+    if key not in st.session_state:
+        st.session_state[key] = ChatHistory(page_size)
+    return st.session_state[key]
@@ -0,0 +1,300 @@
+"""Tool executors for agents.
+
+A `ToolExecutor` runs the tool calls of the latest AIMessage as the `"tools"` node of
+an agent graph, in place of LangGraph's `ToolNode`, with an explicit concurrency
+policy:
+
+- `"sequential"`: one call after another in the calling thread.
+- `"thread"`: calls run concurrently in a shared thread pool.
+- `"process"`: tools listed in `process_functions` run in a shared process pool,
+  everything else in the thread pool. Use it for CPU-heavy pure Python functions.
+- `"async"`: calls run concurrently on the event loop with `tool.ainvoke`.
+
+Per-tool concurrency limits and timeouts apply across every graph that shares the
+executor. ToolMessages always come back in the order of the AIMessage's tool calls,
+whatever order the calls finish in. A timed out call is answered with an error
+ToolMessage; a call already running in a thread cannot be interrupted and finishes
+in the background.
+
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any, Literal
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from pyfunc_agent.agent_attributes import AgentState
+
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
+
+ExecutorMode = Literal["sequential", "thread", "process", "async"]
+
+INVALID_TOOL_TEMPLATE = "Error: {name} is not a valid tool, try one of [{names}]."
+TOOL_ERROR_TEMPLATE = "Error: {error}\n Please fix your mistakes."
+TIMEOUT_TEMPLATE = "Error: {name} timed out after {timeout}s."
+
+
+def _content(result: Any) -> str:  # noqa: ANN401
+    """Format a plain function's return value as ToolMessage content."""
+    if isinstance(result, str):
+        return result
+    try:
+        return json.dumps(result)
+    except TypeError:
+        return str(result)
+
+
+def _error(call: ToolCall, content: str) -> ToolMessage:
+    """Build an error ToolMessage answering `call`."""
+    return ToolMessage(
+        content=content,
+        name=call["name"],
+        tool_call_id=call["id"],
+        status="error",
+    )
+
+
+class ToolExecutor:
+    """Runs tool calls with a configurable concurrency policy.
+
+    One executor can serve many agents; its pools and limits are shared between
+    them. Call `as_node(tools)` to get the graph node for a particular tool set.
+    """
+
+    def __init__(
+            self,
+            mode: ExecutorMode = "thread",
+            max_workers: int | None = None,
+            timeout: float | None = None,
+            timeouts: dict[str, float] | None = None,
+            concurrency_limits: dict[str, int] | None = None,
+            process_functions: dict[str, Callable[..., Any]] | None = None,
+        ) -> None:
+        """Configure the executor.
+
+        Args:
+            mode: How calls in one AIMessage are run, see the module docstring.
+            max_workers: Size of the thread/process pools (library default if None).
+            timeout: Default per-call timeout in seconds; None waits forever.
+            timeouts: Per-tool timeouts by tool name, overriding `timeout`.
+                Timeouts are not enforced in `"sequential"` mode.
+            concurrency_limits: Maximum concurrent calls per tool name.
+            process_functions: Picklable, module-level functions to run in the
+                process pool in `"process"` mode, by tool name. They are called with
+                the tool call's arguments as keywords.
+        """
+        if mode not in ("sequential", "thread", "process", "async"):
+            raise ValueError(f"Unknown tool executor mode: {mode!r}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.timeouts = dict(timeouts or {})
+        self.concurrency_limits = dict(concurrency_limits or {})
+        self.process_functions = dict(process_functions or {})
+
+        self._lock = threading.Lock()
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._limits = {
+            name: threading.BoundedSemaphore(n)
+            for name, n in self.concurrency_limits.items()
+        }
+        # asyncio semaphores belong to one event loop, so keep a set per loop
+        self._async_limits: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+
+    # --------------------------------------------------------------------------
+    #  Graph node
+    # --------------------------------------------------------------------------
+    def as_node(self, tools: list["BaseTool"]) -> RunnableLambda:
+        """Return a graph node that runs `tools` with this executor."""
+        tools_by_name = {t.name: t for t in tools}
+
+        def tools_node(state: AgentState) -> AgentState:
+            """Run the latest AIMessage's tool calls."""
+            return {"messages": self.run(tools_by_name, self._tool_calls(state))}
+
+        async def atools_node(state: AgentState) -> AgentState:
+            """Run the latest AIMessage's tool calls on the event loop."""
+            return {"messages": await self.arun(tools_by_name, self._tool_calls(state))}
+
+        return RunnableLambda(tools_node, afunc=atools_node, name="tools")
+
+    @staticmethod
+    def _tool_calls(state: AgentState) -> list[ToolCall]:
+        """Return the tool calls of the latest AIMessage in `state`."""
+        for msg in reversed(state["messages"]):
+            if isinstance(msg, AIMessage):
+                return msg.tool_calls
+        return []
+
+    # --------------------------------------------------------------------------
+    #  Sync path
+    # --------------------------------------------------------------------------
+    def run(
+            self,
+            tools_by_name: dict[str, "BaseTool"],
+            calls: list[ToolCall]
+        ) -> list[ToolMessage]:
+        """Run `calls` and return their ToolMessages in call order.
+
+        In `"async"` mode the sync path uses the thread pool.
+        """
+        if self.mode == "sequential" or (
+            len(calls) == 1 and self._timeout_for(calls[0]["name"]) is None
+        ):
+            return [self._call(tools_by_name, call) for call in calls]
+
+        pool = self._get_thread_pool()
+        started = time.monotonic()
+        # Each call runs in the caller's context, so events keep the session ID
+        futures: list[Future] = [
+            pool.submit(contextvars.copy_context().run, self._call, tools_by_name, call)
+            for call in calls
+        ]
+
+        messages = []
+        for call, future in zip(calls, futures):
+            timeout = self._timeout_for(call["name"])
+            try:
+                if timeout is None:
+                    messages.append(future.result())
+                else:
+                    remaining = max(0.0, started + timeout - time.monotonic())
+                    messages.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                messages.append(
+                    _error(
+                        call, TIMEOUT_TEMPLATE.format(name=call["name"], timeout=timeout)
+                    )
+                )
+        return messages
+
+    def _call(self, tools_by_name: dict[str, "BaseTool"], call: ToolCall) -> ToolMessage:
+        """Run one call under its tool's concurrency limit."""
+        tool = tools_by_name.get(call["name"])
+        if tool is None:
+            content = INVALID_TOOL_TEMPLATE.format(
+                name=call["name"], names=", ".join(tools_by_name)
+            )
+            return _error(call, content)
+
+        limit = self._limits.get(call["name"])
+        if limit is not None:
+            limit.acquire()
+        try:
+            func = self.process_functions.get(call["name"])
+            if self.mode == "process" and func is not None:
+                result = self._get_process_pool().submit(func, **call["args"]).result()
+                return ToolMessage(
+                    content=_content(result),
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                )
+            return tool.invoke({**call, "type": "tool_call"})
+        except Exception as e:
+            return _error(call, TOOL_ERROR_TEMPLATE.format(error=repr(e)))
+        finally:
+            if limit is not None:
+                limit.release()
+
+    # --------------------------------------------------------------------------
+    #  Async path
+    # --------------------------------------------------------------------------
+    async def arun(
+            self,
+            tools_by_name: dict[str, "BaseTool"],
+            calls: list[ToolCall]
+        ) -> list[ToolMessage]:
+        """Async version of `run`.
+
+        Only `"async"` mode runs tools on the event loop; the other modes run `run`
+        in a worker thread so the loop is never blocked.
+        """
+        if self.mode != "async":
+            return await asyncio.to_thread(self.run, tools_by_name, calls)
+        return list(
+            await asyncio.gather(*(self._acall(tools_by_name, call) for call in calls))
+        )
+
+    async def _acall(
+            self,
+            tools_by_name: dict[str, "BaseTool"],
+            call: ToolCall
+        ) -> ToolMessage:
+        """Run one call on the event loop under its limit and timeout."""
+        tool = tools_by_name.get(call["name"])
+        if tool is None:
+            content = INVALID_TOOL_TEMPLATE.format(
+                name=call["name"], names=", ".join(tools_by_name)
+            )
+            return _error(call, content)
+
+        timeout = self._timeout_for(call["name"])
+        limit = self._async_limit(call["name"])
+        invocation = {**call, "type": "tool_call"}
+        try:
+            if limit is None:
+                return await asyncio.wait_for(tool.ainvoke(invocation), timeout)
+            async with limit:
+                return await asyncio.wait_for(tool.ainvoke(invocation), timeout)
+        except asyncio.TimeoutError:
+            return _error(
+                call, TIMEOUT_TEMPLATE.format(name=call["name"], timeout=timeout)
+            )
+        except Exception as e:
+            return _error(call, TOOL_ERROR_TEMPLATE.format(error=repr(e)))
+
+    def _async_limit(self, name: str) -> asyncio.Semaphore | None:
+        """Return the running loop's semaphore for tool `name`, if it is limited."""
+        if name not in self.concurrency_limits:
+            return None
+        loop = asyncio.get_running_loop()
+        limits = self._async_limits.setdefault(loop, {})
+        if name not in limits:
+            limits[name] = asyncio.Semaphore(self.concurrency_limits[name])
+        return limits[name]
+
+    # --------------------------------------------------------------------------
+    #  Pools
+    # --------------------------------------------------------------------------
+    def _timeout_for(self, name: str) -> float | None:
+        """Return the timeout for tool `name`."""
+        return self.timeouts.get(name, self.timeout)
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        """Create the shared thread pool on first use."""
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pyfunc-tool"
+                )
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Create the shared process pool on first use."""
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._process_pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the pools. They are recreated if the executor is used again."""
+        with self._lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait)
+            self._thread_pool = None
+            self._process_pool = None
@@ -0,0 +1,270 @@
+"""Per-turn tool selection.
+
+Binding every tool on every model call puts every tool schema in every prompt. A
+tool selector picks the top-k tools relevant to the current turn (the latest
+HumanMessage) so the runtime binds only those; bound models are cached per tool
+subset, so a subset seen before costs a dict lookup.
+
+Selectors index the tool descriptions once per runtime:
+
+- `KeywordToolSelector`: BM25 over tool names, descriptions, tags and the
+  docstrings of registered functions.
+- `EmbeddingToolSelector`: cosine similarity of embeddings. The default
+  `HashingEmbedder` is local and offline (hashed word and character n-grams); any
+  LangChain `Embeddings` (e.g. `OllamaEmbeddings`) can be used instead.
+
+When nothing in the query matches any tool, every tool is bound, so a question the
+index cannot place never loses its tools. `stats` reports the schema tokens sent
+versus binding everything.
+
+"""
+
+import json
+import math
+import re
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.tools import BaseTool
+
+from pyfunc_agent.registry import REGISTRY
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by calculate compute do for from how i in is it me of on "
+    "or please return returns take the to tool what whats with you".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of `text`, splitting snake_case, minus stop words."""
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("_", " "))
+    return [w for w in words if len(w) > 1 and w not in STOP_WORDS]
+
+
+def tool_text(tool: BaseTool) -> str:
+    """Return the text a tool is indexed by."""
+    parts = [tool.name, tool.description]
+    if tool.name in REGISTRY:
+        spec = REGISTRY.spec(tool.name)
+        parts += [spec.func.__name__, spec.func.__doc__ or "", *sorted(spec.tags)]
+    return " ".join(parts)
+
+
+def schema_tokens(tool: BaseTool) -> int:
+    """Approximate prompt tokens of a tool's schema (4 characters per token)."""
+    return len(json.dumps(REGISTRY.schemas([tool])[0])) // 4 + 1
+
+
+@dataclass
+class SelectionStats:
+    """Counters for one selector, across every runtime that uses it."""
+
+    calls: int = 0
+    tools_bound: int = 0
+    tools_available: int = 0
+    schema_tokens_bound: int = 0
+    schema_tokens_available: int = 0
+    fallbacks: int = 0
+    """Calls where nothing matched and every tool was bound."""
+
+    @property
+    def prompt_tokens_saved(self) -> int:
+        """Schema tokens not sent, compared with binding every tool."""
+        return self.schema_tokens_available - self.schema_tokens_bound
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the counters and the savings."""
+        return {**asdict(self), "prompt_tokens_saved": self.prompt_tokens_saved}
+
+
+class ToolIndex:
+    """Tool set indexed by one selector; picks the top-k tools for a query."""
+
+    def __init__(
+            self,
+            selector: "ToolSelector",
+            tools: Sequence[BaseTool],
+            score: Callable[[str], np.ndarray],
+        ) -> None:
+        """Keep the tools, their schema sizes and the scoring function."""
+        self.selector = selector
+        self.tools = list(tools)
+        self.score = score
+        self._tokens = np.array([schema_tokens(t) for t in self.tools])
+        self._always = np.array([t.name in selector.always for t in self.tools])
+
+    def select(self, query: str) -> list[BaseTool]:
+        """Return the `k` best tools for `query` plus the always-bound ones.
+
+        Tools keep their original order, so equal subsets are equal lists.
+        """
+        scores = self.score(query)
+        no_match = not scores.any()
+        if no_match or len(self.tools) <= self.selector.k:
+            chosen = np.ones(len(self.tools), dtype=bool)
+        else:
+            chosen = self._always.copy()
+            # Stable sort: ties go to the earlier tool
+            best = np.argsort(-scores, kind="stable")[: self.selector.k]
+            chosen[best[scores[best] > 0]] = True
+
+        stats = self.selector.stats
+        with self.selector._lock:
+            stats.calls += 1
+            stats.fallbacks += int(no_match)
+            stats.tools_bound += int(chosen.sum())
+            stats.tools_available += len(self.tools)
+            stats.schema_tokens_bound += int(self._tokens[chosen].sum())
+            stats.schema_tokens_available += int(self._tokens.sum())
+        return [tool for tool, keep in zip(self.tools, chosen) if keep]
+
+
+class ToolSelector(ABC):
+    """Base class: configuration shared by the indexes built from it."""
+
+    def __init__(self, k: int = 5, always: Sequence[str] = ("finish_tool",)) -> None:
+        """Bind at most `k` matching tools per call, plus the tools named in `always`.
+
+        `always` names tools that must stay available whatever the question, such
+        as ReAct's `finish_tool`; names not in a runtime's tool set are ignored.
+        """
+        self.k = k
+        self.always = frozenset(always)
+        self.stats = SelectionStats()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def index(self, tools: Sequence[BaseTool]) -> ToolIndex:
+        """Precompute the index for `tools`."""
+
+
+class KeywordToolSelector(ToolSelector):
+    """BM25 keyword match between the question and the tool descriptions."""
+
+    def __init__(
+            self,
+            k: int = 5,
+            always: Sequence[str] = ("finish_tool",),
+            k1: float = 1.2,
+            b: float = 0.75,
+        ) -> None:
+        """Set `k`, `always` and the BM25 parameters."""
+        super().__init__(k, always)
+        self.k1 = k1
+        self.b = b
+
+    def index(self, tools: Sequence[BaseTool]) -> ToolIndex:
+        """Precompute term frequencies and IDF weights for `tools`."""
+        docs = [Counter(tokenize(tool_text(t))) for t in tools]
+        lengths = np.array([sum(d.values()) for d in docs], dtype=float)
+        avg_length = lengths.mean() if len(docs) else 1.0
+        df = Counter(term for d in docs for term in d)
+        idf = {
+            term: math.log(1 + (len(docs) - n + 0.5) / (n + 0.5))
+            for term, n in df.items()
+        }
+        norms = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        postings: dict[str, list[tuple[int, float]]] = {}
+        for i, d in enumerate(docs):
+            for term, tf in d.items():
+                weight = idf[term] * tf * (self.k1 + 1) / (tf + norms[i])
+                postings.setdefault(term, []).append((i, weight))
+
+        def score(query: str) -> np.ndarray:
+            scores = np.zeros(len(docs))
+            for term in set(tokenize(query)):
+                for i, weight in postings.get(term, ()):
+                    scores[i] += weight
+            return scores
+
+        return ToolIndex(self, tools, score)
+
+
+class HashingEmbedder(Embeddings):
+    """Offline embedding: hashed word unigrams and character trigrams.
+
+    Needs no model or download, and is stable across processes (CRC32 hashing), so
+    vectors can be precomputed. It only captures lexical overlap, including partial
+    words ("sqrt" / "square").
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        """Set the vector size."""
+        self.dim = dim
+
+    def _embed(self, text: str) -> list[float]:
+        vec = np.zeros(self.dim)
+        for word in tokenize(text):
+            vec[zlib.crc32(word.encode()) % self.dim] += 1.0
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                vec[zlib.crc32(padded[i:i + 3].encode()) % self.dim] += 0.5
+        norm = np.linalg.norm(vec)
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed tool descriptions."""
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a question."""
+        return self._embed(text)
+
+
+class EmbeddingToolSelector(ToolSelector):
+    """Cosine similarity between question and tool-description embeddings."""
+
+    def __init__(
+            self,
+            embedder: Embeddings | None = None,
+            k: int = 5,
+            always: Sequence[str] = ("finish_tool",),
+            min_similarity: float = 0.05,
+            query_cache_size: int = 1024,
+        ) -> None:
+        """Set the embedder (offline `HashingEmbedder` by default), `k` and `always`.
+
+        Tools less similar than `min_similarity` never count as a match. Query
+        embeddings are cached, since every hop of a turn asks with the same text.
+        """
+        super().__init__(k, always)
+        self.embedder = embedder or HashingEmbedder()
+        self.min_similarity = min_similarity
+        self.query_cache_size = query_cache_size
+        self._queries: OrderedDict[str, np.ndarray] = OrderedDict()
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        with self._lock:
+            vec = self._queries.get(query)
+            if vec is not None:
+                self._queries.move_to_end(query)
+                return vec
+        vec = np.asarray(self.embedder.embed_query(query), dtype=float)
+        norm = np.linalg.norm(vec)
+        vec = vec / norm if norm else vec
+        with self._lock:
+            self._queries[query] = vec
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return vec
+
+    def index(self, tools: Sequence[BaseTool]) -> ToolIndex:
+        """Embed every tool description once."""
+        matrix = np.asarray(
+            self.embedder.embed_documents([tool_text(t) for t in tools]), dtype=float
+        )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+        def score(query: str) -> np.ndarray:
+            similarity = matrix @ self._embed_query(query)
+            return np.where(similarity >= self.min_similarity, similarity, 0.0)
+
+        return ToolIndex(self, tools, score)
+
@@ -2,31 +2,220 @@
 
 We're aiming for examples! Not something actually useful!
 
+The `*_array` functions and the aggregates (sum, mean, dot, norm) take lists of
+numbers and evaluate them in one NumPy call, so one tool call can answer a question
+about many values.
+
+These are pure functions, so they opt into result caching with `@memoize()`; see
+`pyfunc_agent.caching.cache_stats()` for their hit/miss counters. Each one is
+registered as an agent tool with `@register` (see `pyfunc_agent.registry`); the
+scalar tools are marked `cheap`, so the async path calls them inline rather than in
+a worker thread.
+
 """
 
 import numpy as np
 
+from pyfunc_agent.caching import memoize
+from pyfunc_agent.registry import register
 
+
+@register(
+    "add_tool",
+    description="Return a + b.",
+    tags=("scalar", "math"),
+    cheap=True,
+)
+@memoize()
 def add_numbers(a: float, b: float) -> float:
     """Add two integers."""
     return a + b
 
 
+@register(
+    "sqrt_tool",
+    description="Return sqrt(a).",
+    tags=("scalar", "math"),
+    cheap=True,
+)
+@memoize()
 def square_root(a: float) -> float:
     """Take the square root of a number."""
     return np.sqrt(a)
 
 
+@register(
+    "exp_tool",
+    description="Return exp(a).",
+    tags=("scalar", "math"),
+    cheap=True,
+)
+@memoize()
 def exponential(a: float) -> float:
     """Calculate the exponential of a number."""
     return np.exp(a)
 
 
+@register(
+    "ln_tool",
+    description="Return ln(a).",
+    tags=("scalar", "math"),
+    cheap=True,
+)
+@memoize()
 def ln(a: float) -> float:
     """Calculate natural log of a number."""
     return np.log(a)
 
 
+@register(
+    "multiply_tool",
+    description="Return a * b.",
+    tags=("scalar", "math"),
+    cheap=True,
+)
+@memoize()
 def multiply_numbers(a: float, b: float) -> float:
     """Multiply two numbers."""
     return a*b
+
+
+# ------------------------------------------------------------------------------
+#  ARRAY TOOLS
+# ------------------------------------------------------------------------------
+# Element-wise versions of the tools above: each argument may be a number or a list
+# of numbers, lists are evaluated in one vectorized NumPy call, and scalars
+# broadcast against lists. Lists come back as lists, scalars as floats. Lists of
+# mismatched lengths raise ValueError, which goes back to the model as an error
+# result instead of failing the turn.
+Numbers = float | list[float]
+
+
+def _as_result(value: np.ndarray | np.floating) -> Numbers:
+    """Return a NumPy result as a float or a (JSON-able) list of floats."""
+    if np.ndim(value) == 0:
+        return float(value)
+    return np.asarray(value, dtype=float).tolist()
+
+
+@register(
+    "add_array_tool",
+    description="Return a + b element-wise; a and b are numbers or equal-length lists.",
+    tags=("array", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def add_arrays(a: Numbers, b: Numbers) -> Numbers:
+    """Add two numbers or lists element-wise."""
+    return _as_result(np.add(np.asarray(a, dtype=float), np.asarray(b, dtype=float)))
+
+
+@register(
+    "multiply_array_tool",
+    description="Return a * b element-wise; a and b are numbers or equal-length lists.",
+    tags=("array", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def multiply_arrays(a: Numbers, b: Numbers) -> Numbers:
+    """Multiply two numbers or lists element-wise."""
+    return _as_result(
+        np.multiply(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    )
+
+
+@register(
+    "sqrt_array_tool",
+    description="Return sqrt of a number or of every element of a list.",
+    tags=("array", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def square_root_array(a: Numbers) -> Numbers:
+    """Take the square root of a number or of each element of a list."""
+    return _as_result(np.sqrt(np.asarray(a, dtype=float)))
+
+
+@register(
+    "exp_array_tool",
+    description="Return exp of a number or of every element of a list.",
+    tags=("array", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def exponential_array(a: Numbers) -> Numbers:
+    """Calculate the exponential of a number or of each element of a list."""
+    return _as_result(np.exp(np.asarray(a, dtype=float)))
+
+
+@register(
+    "ln_array_tool",
+    description="Return ln of a number or of every element of a list.",
+    tags=("array", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def ln_array(a: Numbers) -> Numbers:
+    """Calculate the natural log of a number or of each element of a list."""
+    return _as_result(np.log(np.asarray(a, dtype=float)))
+
+
+# ------------------------------------------------------------------------------
+#  AGGREGATE TOOLS
+# ------------------------------------------------------------------------------
+@register(
+    "sum_tool",
+    description="Return the sum of a list of numbers.",
+    tags=("array", "aggregate", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def sum_numbers(values: list[float]) -> float:
+    """Sum a list of numbers."""
+    return float(np.sum(np.asarray(values, dtype=float)))
+
+
+@register(
+    "mean_tool",
+    description="Return the mean of a list of numbers.",
+    tags=("array", "aggregate", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def mean_numbers(values: list[float]) -> float:
+    """Average a list of numbers."""
+    return float(np.mean(np.asarray(values, dtype=float)))
+
+
+@register(
+    "dot_tool",
+    description="Return the dot product of two equal-length lists of numbers.",
+    tags=("array", "aggregate", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def dot_product(a: list[float], b: list[float]) -> float:
+    """Dot product of two equal-length lists of numbers."""
+    return float(np.dot(np.asarray(a, dtype=float), np.asarray(b, dtype=float)))
+
+
+@register(
+    "norm_tool",
+    description="Return the Euclidean norm of a list of numbers.",
+    tags=("array", "aggregate", "math"),
+    handle_errors=(ValueError,),
+)
+@memoize()
+def norm(values: list[float]) -> float:
+    """Euclidean (L2) norm of a list of numbers."""
+    return float(np.linalg.norm(np.asarray(values, dtype=float)))
+
+
+# ------------------------------------------------------------------------------
+#  CONTROL TOOLS
+# ------------------------------------------------------------------------------
+# Terminal: agents end the turn with `answer` without calling the function
+@register("finish_tool", tags=("control",), answer_arg="answer", cheap=True)
+def finish(answer: str) -> str:
+    """A no-op “Finish” tool to unify the interface. It just echoes back the answer."""
+    return answer
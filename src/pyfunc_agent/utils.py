@@ -1,31 +1,222 @@
-"""Utilities for agentic systems."""
+"""Utilities for agentic systems.
 
-from pathlib import Path
+Prompts live as YAML or JSON files in `PROMPT_DIR`, each a mapping with at least a
+`description` (the prompt text). A file may also set `variables`, substituted into
+the description as `${name}` when the file is loaded.
+
+`PROMPTS` loads and validates every prompt file once, the first time a prompt is
+asked for, and keeps the parsed, rendered prompts in memory, so constructing any
+number of agents reads nothing from disk. At most every `check_interval` seconds a
+lookup compares the files' modification times with the loaded ones and re-parses
+only the files that changed (hot reload). Each prompt carries a SHA-256 of its
+rendered text for downstream caches to key on.
+
+"""
+
+import hashlib
 import json
+import logging
+import string
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
 import yaml
 
+from pyfunc_agent.events import log_event
+
 # If `simple_agents.py` lives in pyfunc_agent/, then:
 PROMPT_DIR = Path(__file__).parent / "prompts"
+PROMPT_SUFFIXES = (".yaml", ".yml", ".json")
+
+# Seconds between checks of the prompt files' modification times
+CHECK_INTERVAL = 5.0
+
+
+class PromptError(ValueError):
+    """A prompt file is missing, unreadable or malformed."""
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A parsed prompt file, with its variables rendered into the text."""
+
+    name: str
+    text: str
+    """The rendered `description`."""
+    sha256: str
+    """Hex digest of `text`."""
+    path: Path = field(repr=False)
+    mtime_ns: int = field(repr=False)
+    data: dict[str, Any] = field(repr=False, default_factory=dict)
+    """Every field of the file, as parsed."""
+
+
+def parse_prompt(path: Path) -> Prompt:
+    """Read, validate and render the prompt file at `path`."""
+    try:
+        stat = path.stat()
+        raw = path.read_text(encoding="utf-8")
+        data = json.loads(raw) if path.suffix == ".json" else yaml.safe_load(raw)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        raise PromptError(f"Cannot load prompt {path.name}: {e}") from e
+
+    # 1) Validate the fields agents rely on
+    if not isinstance(data, dict):
+        raise PromptError(f"Prompt {path.name} is not a mapping.")
+    description = data.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise PromptError(f"Prompt {path.name} has no 'description' text.")
+    variables = data.get("variables", {})
+    if not isinstance(variables, dict):
+        raise PromptError(f"Prompt {path.name}: 'variables' is not a mapping.")
+
+    # 2) Render the template once, here, instead of per agent
+    text = string.Template(description).safe_substitute(
+        {key: str(value) for key, value in variables.items()}
+    )
+    return Prompt(
+        name=path.name,
+        text=text,
+        sha256=hashlib.sha256(text.encode()).hexdigest(),
+        path=path,
+        mtime_ns=stat.st_mtime_ns,
+        data=data,
+    )
+
+
+class PromptRegistry:
+    """Every prompt file in a directory, parsed once and reloaded when changed."""
+
+    def __init__(
+            self,
+            directory: Path = PROMPT_DIR,
+            check_interval: float | None = CHECK_INTERVAL,
+        ) -> None:
+        """Serve the prompts in `directory`; nothing is read until first use.
+
+        Lookups re-check the files' modification times at most every
+        `check_interval` seconds; None loads the files once and never again (see
+        `reload`).
+        """
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._prompts: dict[str, Prompt] = {}
+        self._errors: dict[str, PromptError] = {}
+        # (modification time, size) of every file at its last load, by file name
+        self._stats: dict[str, tuple[int, int]] = {}
+        self._checked: float | None = None
+        self._lock = threading.Lock()
+
+    def _scan(self) -> None:
+        """Parse the files that are new or changed since the last scan."""
+        seen = set()
+        for path in sorted(self.directory.iterdir()):
+            if path.suffix not in PROMPT_SUFFIXES:
+                continue
+            seen.add(path.name)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            key = (stat.st_mtime_ns, stat.st_size)
+            if self._stats.get(path.name) == key:
+                continue
+
+            self._stats[path.name] = key
+            try:
+                self._prompts[path.name] = parse_prompt(path)
+            except PromptError as e:
+                self._prompts.pop(path.name, None)
+                self._errors[path.name] = e
+                log_event(
+                    "prompt_invalid", logging.WARNING, path=str(path), error=str(e)
+                )
+            else:
+                self._errors.pop(path.name, None)
+                log_event("prompt_loaded", logging.DEBUG, path=str(path))
+
+        for name in set(self._stats) - seen:
+            del self._stats[name]
+            self._prompts.pop(name, None)
+            self._errors.pop(name, None)
+
+    def _refresh(self) -> None:
+        """Scan on first use, then at most every `check_interval` seconds."""
+        now = time.monotonic()
+        checked = self._checked
+        if checked is not None and (
+            self.check_interval is None or now - checked < self.check_interval
+        ):
+            return
+        with self._lock:
+            if self._checked == checked:
+                self._scan()
+                self._checked = now
+
+    def reload(self) -> None:
+        """Re-check every file now, re-parsing those that changed."""
+        with self._lock:
+            self._scan()
+            self._checked = time.monotonic()
+
+    def get(self, name: str) -> Prompt:
+        """Return the prompt in file `name` (e.g. "calc_bot.yaml").
+
+        Raises PromptError if the file is missing or invalid.
+        """
+        self._refresh()
+        prompt = self._prompts.get(name)
+        if prompt is not None:
+            return prompt
+        error = self._errors.get(name)
+        if error is not None:
+            raise error
+        raise PromptError(f"No prompt {name!r} in {self.directory}.")
+
+    def text(self, name: str) -> str:
+        """Return the rendered text of prompt `name`."""
+        return self.get(name).text
+
+    def hash(self, name: str) -> str:
+        """Return the SHA-256 of prompt `name`'s rendered text."""
+        return self.get(name).sha256
+
+    def names(self) -> list[str]:
+        """Return the file names of the valid prompts."""
+        self._refresh()
+        return sorted(self._prompts)
+
+    def errors(self) -> dict[str, PromptError]:
+        """Return the error of every invalid prompt file, by file name."""
+        self._refresh()
+        return dict(self._errors)
+
+    def validate(self) -> None:
+        """Raise PromptError listing every invalid prompt file, if any."""
+        errors = self.errors()
+        if errors:
+            raise PromptError("; ".join(str(e) for e in errors.values()))
+
+
+PROMPTS = PromptRegistry()
 
 
 def load_prompt_json(name: str) -> str:
     """Load a JSON prompt.
 
-    Given a filename (like "fizban.json"), open it,
-    read the "description" field, and return the string.
+    Given a filename (like "fizban.json"), return its "description" field from the
+    prompt registry.
     """
-    print(f"load_prompt: {PROMPT_DIR}")
-    data = json.loads((PROMPT_DIR / name).read_text(encoding="utf-8"))
-
-    return data["description"]
+    return PROMPTS.text(name)
 
 
 def load_prompt_yaml(name: str) -> str:
     """Load YAML prompt.
 
-    Given a filename like "calc_bot.yaml", open it, read the 'description' field,
-    and return that multiline string.
+    Given a filename like "calc_bot.yaml", return its 'description' field (a
+    multiline string) from the prompt registry.
     """
-    raw = (PROMPT_DIR / name).read_text(encoding="utf-8")
-    payload = yaml.safe_load(raw)
-    return payload["description"]
+    return PROMPTS.text(name)
@@ -0,0 +1,72 @@
+"""Tests for the context policies in `pyfunc_agent.context`."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from pyfunc_agent.context import SummaryPolicy
+
+
+class FlakySummarizer:
+    """Stands in for the summarizing model; fails its first `failures` calls."""
+
+    def __init__(self, failures: int = 0) -> None:
+        """Set how many calls fail before the model answers."""
+        self.failures = failures
+        self.calls = 0
+
+    def invoke(self, messages: list[BaseMessage]) -> AIMessage:
+        """Return a summary, unless this call is set to fail."""
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("model unavailable")
+        return AIMessage(content=f"summary {self.calls}")
+
+    async def ainvoke(self, messages: list[BaseMessage]) -> AIMessage:
+        """Async version of `invoke`."""
+        return self.invoke(messages)
+
+
+def history(turns: int) -> list[BaseMessage]:
+    """Return a system prompt followed by `turns` question/answer turns."""
+    messages: list[BaseMessage] = [SystemMessage(content="system")]
+    for i in range(turns):
+        messages += [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")]
+    return messages
+
+
+def test_summary_policy_folds_old_turns() -> None:
+    """Past `max_turns`, the oldest turns are replaced by their summary."""
+    policy = SummaryPolicy(FlakySummarizer(), max_turns=3, keep_turns=2)
+    messages = history(4)
+    view = policy(messages)
+    assert policy.summary == "summary 1"
+    assert [m.content for m in view[2:]] == ["q2", "a2", "q3", "a3"]
+
+
+def test_summary_policy_keeps_turns_when_the_summarizer_fails() -> None:
+    """A failed summary evicts nothing; the next call folds the same turns."""
+    llm = FlakySummarizer(failures=1)
+    policy = SummaryPolicy(llm, max_turns=3, keep_turns=2)
+    messages = history(4)
+    with pytest.raises(ConnectionError):
+        policy(messages)
+    assert policy._view(messages) == messages
+    assert policy.summary == ""
+
+    view = policy(messages)
+    assert policy.summary == "summary 2"
+    assert [m.content for m in view[2:]] == ["q2", "a2", "q3", "a3"]
+
+
+def test_summary_policy_keeps_turns_when_the_async_summarizer_fails() -> None:
+    """`acall` leaves the window alone when the summarizer fails, too."""
+    policy = SummaryPolicy(FlakySummarizer(failures=1), max_turns=3, keep_turns=2)
+    messages = history(4)
+    with pytest.raises(ConnectionError):
+        asyncio.run(policy.acall(messages))
+    assert policy._view(messages) == messages
+
+    view = asyncio.run(policy.acall(messages))
+    assert [m.content for m in view[2:]] == ["q2", "a2", "q3", "a3"]
@@ -0,0 +1,57 @@
+"""Tests for the LLM response cache in `pyfunc_agent.llm_cache`, run offline."""
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.budgets import TurnBudget
+from pyfunc_agent.llm_cache import LLMResponseCache, is_cache_hit
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+QUESTION = "What is 4 plus 5.2?"
+
+
+def agent_with(cache: LLMResponseCache, **kwargs: object) -> MultiToolMathAgent:
+    """Return an agent whose model answers at once, behind `cache`."""
+    llm = ScriptedChatModel(tool_calls=[], answer="9.2")
+    return MultiToolMathAgent(
+        prompt_name="calc_bot.yaml", llm=llm, response_cache=cache, **kwargs
+    )
+
+
+def test_repeated_question_is_served_from_the_cache() -> None:
+    """The same question in a fresh session hits the cache, marked as a hit."""
+    cache = LLMResponseCache(name="test_repeat")
+    first = agent_with(cache)
+    first.chat(QUESTION)
+    assert not is_cache_hit(first.messages[-1])
+
+    second = agent_with(cache)
+    hits = cache.stats.hits
+    assert second.chat(QUESTION) == "9.2"
+    assert cache.stats.hits == hits + 1
+    assert is_cache_hit(second.messages[-1])
+
+
+def test_another_tool_set_keeps_the_cached_answers() -> None:
+    """Runtimes sharing a cache with different tool sets keep each other's entries."""
+    cache = LLMResponseCache(name="test_tool_sets")
+    agent_with(cache).chat(QUESTION)
+    agent_with(cache, tools=["add_tool"]).chat(QUESTION)
+
+    hits = cache.stats.hits
+    agent_with(cache).chat(QUESTION)
+    assert cache.stats.hits == hits + 1
+
+
+def test_cache_hits_cost_no_tokens() -> None:
+    """Hits are not counted against the metrics or the turn's token budget."""
+    cache = LLMResponseCache(name="test_tokens")
+    first = agent_with(cache)
+    first.chat(QUESTION)
+    second = agent_with(cache)
+    _, trace = second.chat(QUESTION, return_trace=True)
+
+    assert [call.cached for call in trace.llm_calls] == [True]
+    assert trace.prompt_tokens == trace.completion_tokens == 0
+
+    budget = TurnBudget(max_tokens=1)
+    assert budget.exceeded(first.messages[-1:], None) == "max_tokens"
+    assert budget.exceeded(second.messages[-1:], None) is None
@@ -0,0 +1,286 @@
+"""Tests for `pyfunc_agent.routing`, run offline against scripted fake models."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatResult
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.routing import (
+    DEFAULT_ROUTE,
+    ArithmeticRoute,
+    ModelRoute,
+    ModelRouter,
+    Route,
+    route_of,
+)
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+PROMPT = "calc_bot.yaml"
+ADD = {"name": "add_tool", "args": {"a": 4.0, "b": 5.2}}
+BAD_ADD = {"name": "add_tool", "args": {"a": "four"}}
+LARGE_ANSWER = "The large model says 9.2."
+SMALL_ANSWER = "The small model says 9.2."
+
+
+class CountingChatModel(ScriptedChatModel):
+    """Scripted fake model that counts the calls it answers."""
+
+    calls: int = 0
+
+    def _generate(
+            self,
+            messages: list[BaseMessage],
+            **kwargs: Any,  # noqa: ANN401
+        ) -> ChatResult:
+        """Count the call, then answer from the script."""
+        self.calls += 1
+        return super()._generate(messages, **kwargs)
+
+    async def _agenerate(
+            self,
+            messages: list[BaseMessage],
+            **kwargs: Any,  # noqa: ANN401
+        ) -> ChatResult:
+        """Async version of `_generate`."""
+        self.calls += 1
+        return await super()._agenerate(messages, **kwargs)
+
+
+@pytest.fixture
+def tools() -> list:
+    """The tools of a `MultiToolMathAgent`."""
+    return REGISTRY.resolve(MultiToolMathAgent.TOOLS)
+
+
+def question(text: str) -> list:
+    """Return the model's view of a new turn asking `text`."""
+    return [SystemMessage(content="You are a calculator."), HumanMessage(content=text)]
+
+
+def agent_with(router: ModelRouter, large: ScriptedChatModel) -> MultiToolMathAgent:
+    """Return an agent on `large` behind `router`."""
+    return MultiToolMathAgent(prompt_name=PROMPT, llm=large, router=router)
+
+
+def answered_by(agent: MultiToolMathAgent) -> str | None:
+    """Return the route of the agent's latest reply."""
+    return route_of(agent.messages[-1])
+
+
+# ------------------------------------------------------------------------------
+#  ARITHMETIC FAST PATH
+# ------------------------------------------------------------------------------
+def test_arithmetic_route_answers_plain_arithmetic(tools: list) -> None:
+    """A plainly arithmetic question is evaluated, not sent to a model."""
+    response = ArithmeticRoute().respond(question("Add 4 and 5.2"), tools)
+    assert response is not None
+    assert response.content == "4 + 5.2 = 9.2"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I had 4 apples and bought 5.2 more. How many now?",
+        "What is 7?",
+        "Hello",
+        "what is " + "-" * 600 + "1",
+    ],
+)
+def test_arithmetic_route_declines_anything_else(text: str, tools: list) -> None:
+    """Worded questions, bare numbers, chat and absurd nesting go to the models."""
+    assert ArithmeticRoute().respond(question(text), tools) is None
+
+
+def test_arithmetic_route_only_answers_the_question(tools: list) -> None:
+    """Later model calls of a turn are not the fast path's to answer."""
+    messages = [
+        *question("Add 4 and 5.2"),
+        AIMessage(content="", tool_calls=[{**ADD, "id": "call_1"}]),
+        ToolMessage(content="9.2", tool_call_id="call_1"),
+    ]
+    assert ArithmeticRoute().respond(messages, tools) is None
+
+
+def test_arithmetic_fast_path_makes_no_model_call() -> None:
+    """"Add 4 and 5.2" is answered end to end without calling the model."""
+    large = CountingChatModel(tool_calls=[[ADD]], answer=LARGE_ANSWER)
+    agent = agent_with(ModelRouter([ArithmeticRoute()]), large)
+
+    assert agent.chat("Add 4 and 5.2") == "4 + 5.2 = 9.2"
+    assert large.calls == 0
+    assert answered_by(agent) == "arithmetic"
+
+
+# ------------------------------------------------------------------------------
+#  SMALL-MODEL ROUTE
+# ------------------------------------------------------------------------------
+def test_model_route_accepts_a_valid_tool_call(tools: list) -> None:
+    """A tool call naming a bound tool with valid arguments is used."""
+    route = ModelRoute(llm=ScriptedChatModel(tool_calls=[[ADD]]), name="small")
+    messages = question("What do I get if I put 4 and 5.2 together?")
+    response = route.respond(messages, tools)
+    assert response.tool_calls
+    assert route.accept(messages, response, tools)
+
+
+def test_model_route_accepts_a_confident_answer(tools: list) -> None:
+    """An answer that does not hedge is used."""
+    route = ModelRoute(
+        llm=ScriptedChatModel(tool_calls=[], answer=SMALL_ANSWER), name="small"
+    )
+    messages = question("What is four plus five point two?")
+    response = route.respond(messages, tools)
+    assert response.content == SMALL_ANSWER
+    assert route.accept(messages, response, tools)
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        AIMessage(
+            content="",
+            invalid_tool_calls=[
+                {
+                    "name": "add_tool",
+                    "args": "{a: 4",
+                    "id": "call_1",
+                    "error": "Invalid JSON",
+                    "type": "invalid_tool_call",
+                }
+            ],
+        ),
+        AIMessage(content="", tool_calls=[{**BAD_ADD, "id": "call_1"}]),
+        AIMessage(content="", tool_calls=[{"name": "no_tool", "args": {}, "id": "c"}]),
+        AIMessage(content="I'm not sure, maybe 9.2?"),
+        AIMessage(content="  "),
+    ],
+    ids=["invalid tool call", "schema mismatch", "unknown tool", "hedge", "empty"],
+)
+def test_model_route_rejects(response: AIMessage, tools: list) -> None:
+    """Responses failing validation or the confidence check escalate."""
+    route = ModelRoute(llm=ScriptedChatModel(), name="small")
+    assert not route.accept(question("Add four and 5.2"), response, tools)
+
+
+def test_valid_small_model_answers_without_the_large_model() -> None:
+    """A turn the small model handles never reaches the large model."""
+    large = CountingChatModel(tool_calls=[[ADD]], answer=LARGE_ANSWER)
+    small = ScriptedChatModel(tool_calls=[[ADD]], answer=SMALL_ANSWER)
+    router = ModelRouter([ArithmeticRoute(), ModelRoute(llm=small, name="small")])
+    agent = agent_with(router, large)
+
+    assert agent.chat("I had 4 apples and bought 5.2 more. How many?") == SMALL_ANSWER
+    assert large.calls == 0
+    assert answered_by(agent) == "small"
+
+
+@pytest.mark.parametrize(
+    "small",
+    [
+        ScriptedChatModel(tool_calls=[[BAD_ADD]], answer=SMALL_ANSWER),
+        ScriptedChatModel(tool_calls=[], answer="I think it is probably 9.2."),
+    ],
+    ids=["schema mismatch", "hedge"],
+)
+def test_failing_small_model_escalates(small: ScriptedChatModel) -> None:
+    """A rejected response hands the rest of the turn to the large model."""
+    large = CountingChatModel(tool_calls=[[ADD]], answer=LARGE_ANSWER)
+    router = ModelRouter([ModelRoute(llm=small, name="small")])
+    agent = agent_with(router, large)
+
+    _, trace = agent.chat("I had 4 apples and 5.2 more. How many?", return_trace=True)
+    assert agent.messages[-1].content == LARGE_ANSWER
+    assert answered_by(agent) == DEFAULT_ROUTE
+    # The large model took over for the rest of the turn: the tool call and answer
+    assert large.calls == 2
+    assert [outcome for route, outcome, _ in trace.routes if route == "small"] == [
+        "escalated"
+    ]
+
+
+def test_async_path_routes_the_same_way() -> None:
+    """`achat` takes the fast path too."""
+    large = CountingChatModel(tool_calls=[[ADD]], answer=LARGE_ANSWER)
+    agent = agent_with(ModelRouter([ArithmeticRoute()]), large)
+
+    assert asyncio.run(agent.achat("What is sqrt(625) + 3?")) == "sqrt(625) + 3 = 28"
+    assert large.calls == 0
+
+
+# ------------------------------------------------------------------------------
+#  ROUTER
+# ------------------------------------------------------------------------------
+def routed(route: str) -> AIMessage:
+    """Return a tool-calling response tagged as answered by `route`."""
+    return ModelRouter.tag(
+        AIMessage(content="", tool_calls=[{**ADD, "id": "call_1"}]), route
+    )
+
+
+@pytest.fixture
+def router() -> ModelRouter:
+    """Arithmetic, then a small model, then the default model."""
+    small = ModelRoute(llm=ScriptedChatModel(), name="small")
+    return ModelRouter([ArithmeticRoute(), small])
+
+
+def test_plan_tries_every_route_on_a_new_turn(router: ModelRouter) -> None:
+    """A new turn starts at the first route."""
+    assert router.plan(question("Add 4 and 5.2")) == router.routes
+
+
+def test_plan_keeps_the_turn_on_its_route(router: ModelRouter) -> None:
+    """A turn continues on the route that answered its latest call."""
+    messages = [
+        *question("Add four and 5.2"),
+        routed("small"),
+        ToolMessage(content="9.2", tool_call_id="call_1"),
+    ]
+    assert [route.name for route in router.plan(messages)] == ["small"]
+
+
+def test_plan_keeps_an_escalated_turn_on_the_default_model(router: ModelRouter) -> None:
+    """Once escalated, a turn stays on the agent's model."""
+    messages = [
+        *question("Add four and 5.2"),
+        routed(DEFAULT_ROUTE),
+        ToolMessage(content="9.2", tool_call_id="call_1"),
+    ]
+    assert router.plan(messages) == []
+
+
+def test_plan_ignores_routes_of_earlier_turns(router: ModelRouter) -> None:
+    """Only routes recorded in the current turn count."""
+    messages = [
+        *question("Add four and 5.2"),
+        ModelRouter.tag(AIMessage(content="9.2"), DEFAULT_ROUTE),
+        HumanMessage(content="Add 1 and 2"),
+    ]
+    assert router.plan(messages) == router.routes
+
+
+def test_router_rejects_duplicate_or_default_names() -> None:
+    """Route names identify routes in the history, so they must be unique."""
+    with pytest.raises(ValueError):
+        ModelRouter([ArithmeticRoute(), ArithmeticRoute()])
+    with pytest.raises(ValueError):
+        ModelRouter([ModelRoute(llm=ScriptedChatModel(), name=DEFAULT_ROUTE)])
+
+
+def test_route_without_respond_cannot_be_created() -> None:
+    """A route missing `respond` fails when created, not mid-turn."""
+    class Incomplete(Route):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,44 @@
+"""Tests for the session manager in `pyfunc_agent.sessions`, run offline."""
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.sessions import MemoryConversationStore, SessionManager
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+
+def manager(**kwargs: object) -> SessionManager:
+    """Return a manager of scripted agents with an in-memory store."""
+    return SessionManager(
+        MultiToolMathAgent,
+        store=MemoryConversationStore(),
+        prompt_name="calc_bot.yaml",
+        llm=ScriptedChatModel(),
+        **kwargs,
+    )
+
+
+def test_least_recently_used_session_is_dropped() -> None:
+    """Past `max_sessions`, the session used longest ago leaves memory."""
+    sessions = manager(max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        sessions.get(session_id).chat("Add 4 and 5.2.")
+    assert "a" not in sessions
+    assert len(sessions) == 2
+
+
+def test_session_with_a_running_turn_is_kept() -> None:
+    """Neither the cap nor the idle timeout drops a session mid-turn."""
+    sessions = manager(max_sessions=1, idle_ttl=0.0)
+    events = sessions.get("a").stream_chat("Add 4 and 5.2.")
+    next(events)
+
+    sessions.get("b")
+    assert "a" in sessions
+    assert "b" in sessions
+    assert sessions.evict_idle() == 1
+    assert "a" in sessions
+
+    agent = sessions.get("a")
+    assert list(events)[-1].content == "The answer is 9.2."
+    assert agent.active_turns == 0
+    assert sessions.evict_idle() == 1
+    assert "a" not in sessions
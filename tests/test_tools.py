@@ -0,0 +1,38 @@
+"""Tests for the tools in `pyfunc_agent.tools`, run offline."""
+
+import pytest
+
+from pyfunc_agent.benchmarks.fake_llm import ScriptedChatModel
+from pyfunc_agent.registry import REGISTRY
+from pyfunc_agent.simple_agents import MultiToolMathAgent
+
+MISMATCHED = [
+    ("add_array_tool", {"a": [1, 2], "b": [1, 2, 3]}),
+    ("multiply_array_tool", {"a": [1, 2], "b": [1, 2, 3]}),
+    ("dot_tool", {"a": [1, 2], "b": [1]}),
+]
+
+
+@pytest.mark.parametrize(("name", "args"), MISMATCHED)
+def test_mismatched_lengths_return_an_error_result(name: str, args: dict) -> None:
+    """Lists of different lengths come back as an error the model can read."""
+    result = REGISTRY.get(name).invoke(args)
+    assert result.startswith("Error: ")
+
+
+def test_mismatched_lengths_do_not_fail_the_turn() -> None:
+    """The turn goes on after a failed array tool call, and the history stays whole."""
+    hops = [[{"name": name, "args": args}] for name, args in MISMATCHED]
+    llm = ScriptedChatModel(tool_calls=hops, answer="Sorry.")
+    agent = MultiToolMathAgent(prompt_name="calc_bot.yaml", llm=llm)
+
+    assert agent.chat("Add [1, 2] and [1, 2, 3].") == "Sorry."
+    errors = [m for m in agent.messages if getattr(m, "status", None) == "error"]
+    assert len(errors) == len(MISMATCHED)
+
+
+def test_deeply_nested_expression_returns_an_error_result() -> None:
+    """Nesting too deep to parse is an invalid expression, not a crash."""
+    expression = "-" * 500 + "1"
+    result = REGISTRY.get("evaluate_tool").invoke({"expression": expression})
+    assert result == "Error: Expression is nested too deeply."